@@ -0,0 +1,129 @@
+import io
+import struct
+import zipfile
+from typing import Any, Dict, List, Optional
+
+# Chunk types of Android's binary XML format
+RES_STRING_POOL_TYPE = 0x0001
+RES_XML_TYPE = 0x0003
+RES_XML_START_ELEMENT_TYPE = 0x0102
+
+UTF8_FLAG = 1 << 8
+
+TYPE_STRING = 0x03
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+
+
+def read_manifest(apk: Any) -> Dict[str, Any]:
+    """
+    Read the package name and version from an APK.
+
+    Only the attributes of the root <manifest> element of the binary
+    AndroidManifest.xml are decoded.
+
+    Args:
+        apk (Any): A path, or the APK contents as a bytes-like object.
+
+    Returns:
+        Dict[str, Any]: `package`, `version_code` and `version_name`, each
+        None if not present.
+    """
+    source = open(apk, 'rb') if isinstance(apk, str) else _BufferReader(apk)
+    with source, zipfile.ZipFile(source) as archive:
+        data = archive.read('AndroidManifest.xml')
+    return _parse_manifest(data)
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable file over a bytes-like object, e.g. an mmap, without copying it."""
+
+    def __init__(self, buffer: Any):
+        self._buffer = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._buffer)
+        self._position = max(offset, 0)
+        return self._position
+
+    def readinto(self, target: Any) -> int:
+        chunk = self._buffer[self._position:self._position + len(target)]
+        target[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def close(self):
+        self._buffer.release()
+        super().close()
+
+
+def _parse_manifest(data: bytes) -> Dict[str, Any]:
+    manifest = {'package': None, 'version_code': None, 'version_name': None}
+    chunk_type, header_size, _ = struct.unpack_from('<HHI', data, 0)
+    if chunk_type != RES_XML_TYPE:
+        raise ValueError('AndroidManifest.xml is not in binary XML format')
+    strings: List[str] = []
+    offset = header_size
+    while offset + 8 <= len(data):
+        chunk_type, header_size, size = struct.unpack_from('<HHI', data, offset)
+        if chunk_type == RES_STRING_POOL_TYPE:
+            strings = _parse_string_pool(data, offset)
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            # The first element is <manifest>
+            attribute_start, attribute_size, attribute_count = struct.unpack_from('<HHH', data, offset + 24)
+            base = offset + 16 + attribute_start
+            for i in range(attribute_count):
+                _, name, raw, _, _, value_type, value = struct.unpack_from('<IIIHBBI', data, base + i * attribute_size)
+                key = {'package': 'package', 'versionCode': 'version_code', 'versionName': 'version_name'}.get(_string(strings, name))
+                if key is None:
+                    continue
+                if value_type in (TYPE_INT_DEC, TYPE_INT_HEX):
+                    manifest[key] = value
+                else:
+                    manifest[key] = _string(strings, raw if raw != 0xffffffff else value)
+            break
+        offset += size
+    return manifest
+
+
+def _parse_string_pool(data: bytes, offset: int) -> List[str]:
+    _, header_size, _, count, _, flags, strings_start, _ = struct.unpack_from('<HHIIIIII', data, offset)
+    offsets = struct.unpack_from(f'<{count}I', data, offset + header_size)
+    base = offset + strings_start
+    strings = []
+    for start in offsets:
+        position = base + start
+        if flags & UTF8_FLAG:
+            # UTF-16 length, then UTF-8 length, each one or two bytes
+            position += 2 if data[position] & 0x80 else 1
+            length = data[position]
+            if length & 0x80:
+                length = ((length & 0x7f) << 8) | data[position + 1]
+                position += 1
+            position += 1
+            strings.append(data[position:position + length].decode('utf-8', 'replace'))
+        else:
+            length, = struct.unpack_from('<H', data, position)
+            position += 2
+            if length & 0x8000:
+                length = ((length & 0x7fff) << 16) | struct.unpack_from('<H', data, position)[0]
+                position += 2
+            strings.append(data[position:position + length * 2].decode('utf-16-le', 'replace'))
+    return strings
+
+
+def _string(strings: List[str], index: int) -> Optional[str]:
+    return strings[index] if 0 <= index < len(strings) else None
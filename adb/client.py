@@ -1,28 +1,54 @@
 import asyncio
+import hashlib
 import logging
-from typing import Optional, Callable, Any, List, Dict
+import mmap
+import os
+import time
+from concurrent.futures import Executor
+from typing import Optional, Callable, Any, AsyncIterator, List, Dict, Tuple, TYPE_CHECKING
 # import monkey
-# import logcat
+import logcat as adbkit_logcat
 # debug = logging.debug
 
 from .connection import Connection
 
+from .apk import read_manifest
 from .parser import Parser
 from .proc.stat import ProcStat
+from .proc.sampler import CpuSampler
+from .proc.collector import ProcCollector
+from .proc.pidstat import PidStat
+from .framebuffer.tiles import ScreenUpdate, TileTracker
+from .screenrecord import ScreenrecordReader
+from .tracker import Tracker
+from .registry import DeviceRegistry
+from .singleflight import SingleFlight
+from .propertycache import PropertyCache
 from .common.host.version import HostVersionCommand
 from .common.host.connect import HostConnectCommand
 from .common.host.devices import HostDevicesCommand
 from .common.host.deviceswithpaths import HostDevicesWithPathsCommand
 from .common.host.disconnect import HostDisconnectCommand
 from .common.host.trackdevices import HostTrackDevicesCommand
+from .common.host.trackdeviceswithpaths import HostTrackDevicesWithPathsCommand
 from .common.host.kill import HostKillCommand
 from .common.host.transport import HostTransportCommand
+from .common.host.transportid import HostTransportIdCommand
+from .common.host.tport import HostTportCommand
 from .common.host_transport.clear import ClearCommand
+from .common.host_transport.devicesnapshot import DeviceSnapshotCommand
+from .common.host_transport.exec import ExecCommand
 from .common.host_transport.framebuffer import FrameBufferCommand
 from .common.host_transport.getfeatures import GetFeaturesCommand
 from .common.host_transport.getpackages import GetPackagesCommand
 from .common.host_transport.getproperties import GetPropertiesCommand
 from .common.host_transport.install import InstallCommand
+from .common.host_transport.streaminstall import StreamInstallCommand
+from .common.host_transport.installabandon import InstallAbandonCommand
+from .common.host_transport.installcommit import InstallCommitCommand
+from .common.host_transport.installcreate import InstallCreateCommand
+from .common.host_transport.installedapk import InstalledApkCommand
+from .common.host_transport.installwrite import InstallWriteCommand
 from .common.host_transport.isinstalled import IsInstalledCommand
 from .common.host_transport.listreverses import ListReversesCommand
 from .common.host_transport.local import LocalCommand
@@ -46,12 +72,18 @@ from .common.host_transport.usb import UsbCommand
 from .common.host_transport.waitbootcomplete import WaitBootCompleteCommand
 from .common.host_serial.forward import ForwardCommand
 from .common.host_serial.getdevicepath import GetDevicePathCommand
+from .common.host_serial.gethostfeatures import GetHostFeaturesCommand
 from .common.host_serial.getserialno import GetSerialNoCommand
 from .common.host_serial.getstate import GetStateCommand
 from .common.host_serial.listforwards import ListForwardsCommand
 from .common.host_serial.waitfordevice import WaitForDeviceCommand
 from .tcpusb.server import TcpUsbServer
 
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
 class NoUserOptionError(Exception):
     pass
 
@@ -60,6 +92,15 @@ class Client:
         self.options = options or {}
         self.options.setdefault('port', 5037)
         self.options.setdefault('bin', 'adb')
+        self.options.setdefault('registry', False)
+        self.options.setdefault('coalesce_ttl', 0.0)
+        self.options.setdefault('property_ttl', 0.0)
+        self.options.setdefault('host_features_ttl', 60.0)
+        self.options.setdefault('property_verify_interval', 5.0)
+        self._registry: Optional[DeviceRegistry] = None
+        self._flights = SingleFlight(self.options['coalesce_ttl'])
+        self._properties = PropertyCache(self._fetch_properties, self.options['property_ttl'], self._transport_id,
+                                         self._boot_id, self.options['property_verify_interval'])
 
     def create_tcp_usb_bridge(self, serial: str, options: Dict[str, Any]) -> TcpUsbServer:
         return TcpUsbServer(self, serial, options)
@@ -88,16 +129,53 @@ class Client:
         return await HostDisconnectCommand(conn).execute(host, port)
 
     async def list_devices(self) -> List[Dict[str, str]]:
+        registry = await self._live_registry()
+        if registry:
+            return registry.list_devices()
         conn = await self.connection()
         return await HostDevicesCommand(conn).execute()
 
     async def list_devices_with_paths(self) -> List[Dict[str, str]]:
+        registry = await self._live_registry()
+        if registry:
+            return registry.list_devices_with_paths()
         conn = await self.connection()
         return await HostDevicesWithPathsCommand(conn).execute()
 
-    async def track_devices(self) -> asyncio.StreamReader:
+    def track_devices(self, reconnect: bool = True) -> Tracker:
+        """
+        Track devices connecting, disconnecting and changing state.
+
+        The returned Tracker can be awaited to make sure tracking has started,
+        or iterated directly with `async for` to receive DeviceEvents.
+        """
+        return Tracker(connect=self._open_track_devices, reconnect=reconnect)
+
+    async def _open_track_devices(self) -> HostTrackDevicesCommand:
+        conn = await self.connection()
+        return await HostTrackDevicesCommand(conn).open()
+
+    async def device_registry(self) -> DeviceRegistry:
+        """
+        Get the client-wide DeviceRegistry, starting it on first use.
+
+        With the `registry` option enabled, `list_devices`, `list_devices_with_paths`
+        and `get_state` are answered by the registry whenever it is live.
+        """
+        if self._registry is None or self._registry.is_set():
+            self._registry = DeviceRegistry(self._open_track_devices_with_paths)
+            await self._registry.start()
+        return self._registry
+
+    async def _live_registry(self) -> Optional[DeviceRegistry]:
+        if not self.options['registry']:
+            return None
+        registry = await self.device_registry()
+        return registry if registry.live else None
+
+    async def _open_track_devices_with_paths(self) -> HostTrackDevicesWithPathsCommand:
         conn = await self.connection()
-        return await HostTrackDevicesCommand(conn).execute()
+        return await HostTrackDevicesWithPathsCommand(conn).open()
 
     async def kill(self) -> str:
         conn = await self.connection()
@@ -107,29 +185,92 @@ class Client:
         conn = await self.connection()
         return await GetSerialNoCommand(conn).execute(serial)
 
+    async def get_host_features(self, serial: str) -> List[str]:
+        return await self._flights.do((serial, 'host-features'), lambda: self._get_host_features(serial),
+                                      ttl=self.options['host_features_ttl'])
+
+    async def _get_host_features(self, serial: str) -> List[str]:
+        conn = await self.connection()
+        return await GetHostFeaturesCommand(conn).execute(serial)
+
     async def get_device_path(self, serial: str) -> str:
         conn = await self.connection()
         return await GetDevicePathCommand(conn).execute(serial)
 
     async def get_state(self, serial: str) -> str:
+        registry = await self._live_registry()
+        if registry:
+            return registry.get_state(serial)
         conn = await self.connection()
         return await GetStateCommand(conn).execute(serial)
 
-    async def get_properties(self, serial: str) -> Dict[str, str]:
+    async def get_properties(self, serial: str, keys: Optional[List[str]] = None) -> Dict[str, str]:
+        return await self._properties.get(serial, keys)
+
+    def watch_properties(self, serial: str, keys: List[str], interval: float = 1.0) -> AsyncIterator[Dict[str, Tuple[Optional[str], Optional[str]]]]:
+        return self._properties.watch(serial, keys, interval)
+
+    async def _fetch_properties(self, serial: str) -> Dict[str, str]:
+        return await self._flights.do((serial, 'getprop'), lambda: self._get_properties(serial))
+
+    async def _boot_id(self, serial: str) -> Optional[str]:
+        return await self._flights.do((serial, 'boot_id'), lambda: self._get_boot_id(serial))
+
+    async def _get_boot_id(self, serial: str) -> Optional[str]:
+        stream = await self.exec_out(serial, f"getprop {PropertyCache.BOOT_KEY}")
+        return (await Parser(stream).read_all()).decode().strip() or None
+
+    def _transport_id(self, serial: str) -> Optional[str]:
+        if self._registry is None or not self._registry.live:
+            return None
+        device = self._registry.device_map.get(serial)
+        return device.get('transport_id') if device else None
+
+    async def _get_properties(self, serial: str) -> Dict[str, str]:
         transport = await self.transport(serial)
         return await GetPropertiesCommand(transport).execute()
 
     async def get_features(self, serial: str) -> List[str]:
+        return await self._flights.do((serial, 'features'), lambda: self._get_features(serial))
+
+    async def _get_features(self, serial: str) -> List[str]:
         transport = await self.transport(serial)
         return await GetFeaturesCommand(transport).execute()
 
     async def get_packages(self, serial: str) -> List[str]:
+        return await self._flights.do((serial, 'packages'), lambda: self._get_packages(serial))
+
+    async def _get_packages(self, serial: str) -> List[str]:
         transport = await self.transport(serial)
         return await GetPackagesCommand(transport).execute()
 
+    async def device_snapshot(self, serial: str) -> Dict[str, Any]:
+        """
+        Collect a device inventory in a single round trip.
+
+        Returns:
+            Dict[str, Any]: `serial`, `state`, `properties`, `features`,
+            `packages` (dicts with name, path, version_code and uid),
+            `battery` (the fields of `dumpsys battery`) and `storage`
+            (size, used and available bytes by mount point).
+        """
+        transport = await self.transport(serial)
+        snapshot = await DeviceSnapshotCommand(transport).execute()
+        # The exec would have failed unless the device was online
+        return {'serial': serial, 'state': 'device', **snapshot}
+
+    def forget(self, serial: Optional[str] = None):
+        """Drop cached query results and properties, for one device or all of them."""
+        if serial is None:
+            self._flights.forget()
+        else:
+            self._flights.forget(serial)
+        self._properties.invalidate(serial)
+
     async def get_dhcp_ip_address(self, serial: str, iface: str = 'wlan0') -> str:
-        properties = await self.get_properties(serial)
-        ip = properties.get(f"dhcp.{iface}.ipaddress")
+        key = f"dhcp.{iface}.ipaddress"
+        properties = await self.get_properties(serial, [key])
+        ip = properties.get(key)
         if ip:
             return ip
         raise ValueError(f"Unable to find ipaddress for '{iface}'")
@@ -150,18 +291,35 @@ class Client:
         transport = await self.transport(serial)
         return await ListReversesCommand(transport).execute()
 
-    async def transport(self, serial: str) -> Connection:
+    async def transport(self, serial: str, transport_id: Optional[int] = None) -> Connection:
+        if transport_id is None:
+            transport_id = self._transport_id(serial)
         conn = await self.connection()
-        await HostTransportCommand(conn).execute(serial)
+        if transport_id is not None:
+            await HostTransportIdCommand(conn).execute(transport_id)
+        else:
+            await HostTransportCommand(conn).execute(serial)
         return conn
 
+    async def transport_with_id(self, serial: str) -> Tuple[Connection, int]:
+        conn = await self.connection()
+        transport_id = await HostTportCommand(conn).execute(serial)
+        return conn, transport_id
+
     async def shell(self, serial: str, command: str) -> asyncio.StreamReader:
         transport = await self.transport(serial)
         return await ShellCommand(transport).execute(command)
 
+    async def exec_out(self, serial: str, command: Any) -> asyncio.StreamReader:
+        transport = await self.transport(serial)
+        return await ExecCommand(transport).execute(command)
+
     async def reboot(self, serial: str) -> str:
         transport = await self.transport(serial)
-        return await RebootCommand(transport).execute()
+        try:
+            return await RebootCommand(transport).execute()
+        finally:
+            self.forget(serial)
 
     async def remount(self, serial: str) -> str:
         transport = await self.transport(serial)
@@ -175,9 +333,30 @@ class Client:
         transport = await self.transport(serial)
         return await TrackJdwpCommand(transport).execute()
 
-    async def framebuffer(self, serial: str, format: str = 'raw') -> Dict[str, Any]:
+    async def framebuffer(self, serial: str, format: str = 'raw', executor: Optional[Executor] = None) -> asyncio.StreamReader:
         transport = await self.transport(serial)
-        return await FrameBufferCommand(transport).execute(format)
+        return await FrameBufferCommand(transport).execute(format, executor)
+
+    async def framebuffer_array(self, serial: str) -> Tuple['np.ndarray', Dict[str, Any]]:
+        transport = await self.transport(serial)
+        try:
+            return await FrameBufferCommand(transport).execute('array')
+        finally:
+            await transport.close()
+
+    async def screen_stream(self, serial: str, fps: float = 2.0, tile: int = 32) -> AsyncIterator[ScreenUpdate]:
+        tracker = TileTracker(tile)
+        loop = asyncio.get_event_loop()
+        interval = 1 / fps
+        index = 0
+        while True:
+            started = loop.time()
+            frame, meta = await self.framebuffer_array(serial)
+            rects = await loop.run_in_executor(None, tracker.update, frame)
+            if rects:
+                yield ScreenUpdate(index, started, frame, meta, rects)
+            index += 1
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
 
     async def screencap(self, serial: str) -> bytes:
         transport = await self.transport(serial)
@@ -187,6 +366,26 @@ class Client:
             debug(f"Emulating screencap command due to '{err}'")
             return await self.framebuffer(serial, 'png')
 
+    async def screencap_raw(self, serial: str, encoder: Optional[Callable[..., bytes]] = None,
+                            executor: Optional[Executor] = None) -> Any:
+        transport = await self.transport(serial)
+        data, meta = await ScreencapCommand(transport).execute(raw=True)
+        if encoder is None:
+            return data, meta
+        return await asyncio.get_event_loop().run_in_executor(executor, encoder, bytes(data), meta)
+
+    async def open_screenrecord(self, serial: str, bitrate: int = 4000000, size: Optional[str] = None,
+                                time_limit: Optional[int] = None) -> ScreenrecordReader:
+        args = ['screenrecord', '--output-format=h264', '--bit-rate', bitrate]
+        if size:
+            args.extend(['--size', size])
+        if time_limit is not None:
+            args.extend(['--time-limit', time_limit])
+        args.append('-')
+        transport = await self.transport(serial)
+        stream = await ExecCommand(transport).execute(args)
+        return ScreenrecordReader(stream, connection=transport)
+
     async def open_local(self, serial: str, path: str) -> asyncio.StreamReader:
         transport = await self.transport(serial)
         return await LocalCommand(transport).execute(path)
@@ -220,36 +419,241 @@ class Client:
             monkey.once('end', out.close)
             return monkey
 
-    async def open_logcat(self, serial: str, options: Dict[str, Any] = None) -> 'adbkit_logcat.Logcat':
+    async def open_logcat(self, serial: str, options: Dict[str, Any] = None, batch: bool = False) -> 'adbkit_logcat.Reader':
         options = options or {}
         transport = await self.transport(serial)
-        stream = await LogcatCommand(transport).execute(options)
-        return adbkit_logcat.read_stream(stream, fix_line_feeds=False)
+        command = LogcatCommand(transport)
+        stream = await command.execute(options)
+        reader = adbkit_logcat.read_stream(stream, fix_line_feeds=command.crlf, batch=batch, connection=transport)
+        if batch:
+            reader.serial = serial
+        return reader
+
+    async def open_logcat_resilient(self, serial: str, options: Dict[str, Any] = None,
+                                    backoff: float = 0.5, max_backoff: float = 30.0) -> 'adbkit_logcat.ResilientReader':
+        options = options or {}
+
+        async def open_stream(since):
+            if since is None:
+                return await self.open_logcat(serial, dict(options))
+            return await self.open_logcat(serial, dict(options, clear=False, since=since))
+
+        return adbkit_logcat.ResilientReader(open_stream, serial=serial, backoff=backoff, max_backoff=max_backoff)
+
+    async def open_logcat_many(self, serials: List[str], options: Dict[str, Any] = None,
+                               lateness: float = 0.5, max_buffer: int = 10000) -> 'adbkit_logcat.MergedReader':
+        readers = await asyncio.gather(*[self.open_logcat(serial, dict(options or {})) for serial in serials])
+        return adbkit_logcat.MergedReader(dict(zip(serials, readers)), lateness=lateness, max_buffer=max_buffer)
 
     async def open_proc_stat(self, serial: str) -> ProcStat:
         sync = await self.sync_service(serial)
         return ProcStat(sync)
 
+    async def open_cpu_sampler(self, serial: str, capacity: int = 600) -> CpuSampler:
+        sync = await self.sync_service(serial)
+        return CpuSampler(sync, capacity)
+
+    def open_proc_collector(self, serial: str, files: Optional[List[str]] = None) -> ProcCollector:
+        return ProcCollector(self, serial, files)
+
+    def open_pid_stat(self, serial: str, page_size: int = 4096) -> PidStat:
+        return PidStat(self, serial, page_size)
+
     async def clear(self, serial: str, pkg: str) -> str:
         transport = await self.transport(serial)
         return await ClearCommand(transport).execute(pkg)
 
-    async def install(self, serial: str, apk: str) -> bool:
+    async def install(self, serial: str, apk: Any) -> bool:
+        if isinstance(apk, (str, bytes, bytearray, memoryview)):
+            features = await self.get_host_features(serial)
+            if 'abb_exec' in features or 'cmd' in features:
+                return await self.install_streamed(serial, apk, abb='abb_exec' in features)
         temp = Sync.temp(apk if isinstance(apk, str) else '_stream.apk')
         transfer = await self.push(serial, apk, temp)
         await transfer.wait_for('end')
         return await self.install_remote(serial, temp)
 
+    async def install_streamed(self, serial: str, apk: Any, abb: bool = False) -> bool:
+        transport = await self.transport(serial)
+        try:
+            return await StreamInstallCommand(transport).execute(apk, abb)
+        finally:
+            self._flights.forget(serial, 'packages')
+            await transport.close()
+
+    async def install_multiple(self, serial: str, apks: List[Any], args: Tuple[str, ...] = ('-r',),
+                               parallel: int = 4) -> bool:
+        """
+        Install a base APK and its splits in one package manager session.
+
+        Args:
+            serial (str): The serial number of the device.
+            apks (List[Any]): Local paths or bytes-like APKs, base first.
+            args (Tuple[str, ...]): Extra install-create arguments.
+            parallel (int): Maximum number of APKs streamed at once.
+
+        Raises:
+            Exception: With the package manager's failure `code`; the session
+                is abandoned if any APK could not be written.
+        """
+        features = await self.get_host_features(serial)
+        service = 'abb' if 'abb_exec' in features else 'cmd' if 'cmd' in features else 'pm'
+        size = sum(StreamInstallCommand._size(apk) for apk in apks)
+        transport = await self.transport(serial)
+        try:
+            session = await InstallCreateCommand(transport).execute(size, service, args)
+        finally:
+            await transport.close()
+
+        semaphore = asyncio.Semaphore(parallel)
+
+        async def write(index: int, apk: Any):
+            name = f"{index}_{os.path.basename(apk) if isinstance(apk, str) else 'split.apk'}"
+            async with semaphore:
+                transport = await self.transport(serial)
+                try:
+                    await InstallWriteCommand(transport).execute(session, name, apk, service)
+                finally:
+                    await transport.close()
+
+        writes = [asyncio.create_task(write(index, apk)) for index, apk in enumerate(apks)]
+        try:
+            await asyncio.gather(*writes)
+        except BaseException:
+            for task in writes:
+                task.cancel()
+            await asyncio.gather(*writes, return_exceptions=True)
+            try:
+                transport = await self.transport(serial)
+                await InstallAbandonCommand(transport).execute(session, service)
+                await transport.close()
+            except Exception as err:
+                logger.debug(f"Unable to abandon install session {session}: {err}")
+            raise
+
+        transport = await self.transport(serial)
+        try:
+            return await InstallCommitCommand(transport).execute(session, service)
+        finally:
+            self._flights.forget(serial, 'packages')
+            await transport.close()
+
+    async def install_fleet(self, serials: List[str], apk: str, parallel: int = 16,
+                            skip_unchanged: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Install one APK on many devices.
+
+        The APK is memory-mapped and hashed once and streamed from the same
+        mapping to every device. Devices whose installed base APK has the
+        same SHA-256, which also means the same versionCode and signature,
+        are skipped, and so are devices with a higher installed versionCode,
+        which the package manager would refuse to downgrade.
+
+        Args:
+            serials (List[str]): The devices to install on.
+            apk (str): Path to the APK.
+            parallel (int): Maximum number of devices handled at once.
+            skip_unchanged (bool): Whether to check the installed APK first.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: A report per serial with `status`
+            ('installed', 'skipped', 'downgrade' or 'failed'), the previously
+            installed `version_code`, the `local_version_code` of the APK,
+            the `duration` in seconds and the `error`, if any. An APK that
+            cannot be read fails every device with the same error.
+        """
+        def new_report(serial: str, local_version_code: Optional[int]) -> Dict[str, Any]:
+            return {'serial': serial, 'status': None, 'version_code': None,
+                    'local_version_code': local_version_code, 'duration': None, 'error': None}
+
+        def failed(err: Exception) -> Dict[str, Dict[str, Any]]:
+            logger.debug(f"Unable to read '{apk}': {err}")
+            reports = {serial: new_report(serial, None) for serial in serials}
+            for report in reports.values():
+                report['status'] = 'failed'
+                report['error'] = err
+            return reports
+
+        loop = asyncio.get_running_loop()
+        try:
+            with open(apk, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # mmap refuses to map an empty file
+                    raise ValueError(f"'{apk}' is empty")
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as err:
+            return failed(err)
+        view = memoryview(mapped)
+        try:
+            digest = await loop.run_in_executor(None, lambda: hashlib.sha256(view).hexdigest())
+            try:
+                manifest = read_manifest(view)
+            except Exception as err:
+                # Not a zip, no manifest or not a binary manifest
+                return failed(err)
+            package = manifest['package'] if skip_unchanged else None
+            local_version_code = manifest['version_code']
+            semaphore = asyncio.Semaphore(parallel)
+
+            async def rollout(serial: str) -> Dict[str, Any]:
+                report = new_report(serial, local_version_code)
+                async with semaphore:
+                    started = time.monotonic()
+                    try:
+                        if package:
+                            transport = await self.transport(serial)
+                            try:
+                                installed = await InstalledApkCommand(transport).execute(package)
+                            finally:
+                                await transport.close()
+                            if installed:
+                                report['version_code'] = installed['version_code']
+                                if installed['sha256'] == digest:
+                                    report['status'] = 'skipped'
+                                    return report
+                                if installed['version_code'] is not None and local_version_code is not None \
+                                        and installed['version_code'] > local_version_code:
+                                    report['status'] = 'downgrade'
+                                    return report
+                        features = await self.get_host_features(serial)
+                        if 'abb_exec' in features or 'cmd' in features:
+                            await self.install_streamed(serial, view, abb='abb_exec' in features)
+                        else:
+                            await self.install(serial, apk)
+                        report['status'] = 'installed'
+                    except Exception as err:
+                        logger.debug(f"Unable to install '{apk}' on '{serial}': {err}")
+                        report['status'] = 'failed'
+                        report['error'] = err
+                    finally:
+                        report['duration'] = time.monotonic() - started
+                return report
+
+            reports = await asyncio.gather(*(rollout(serial) for serial in serials))
+            return {report['serial']: report for report in reports}
+        finally:
+            try:
+                view.release()
+                mapped.close()
+            except BufferError:
+                # Chunks may still be referenced by transport buffers; the
+                # mapping is closed once they are collected
+                pass
+
     async def install_remote(self, serial: str, apk: str) -> bool:
         transport = await self.transport(serial)
         await InstallCommand(transport).execute(apk)
+        self._flights.forget(serial, 'packages')
         stream = await self.shell(serial, ['rm', '-f', apk])
         await Parser(stream).read_all()
         return True
 
     async def uninstall(self, serial: str, pkg: str) -> str:
         transport = await self.transport(serial)
-        return await UninstallCommand(transport).execute(pkg)
+        try:
+            return await UninstallCommand(transport).execute(pkg)
+        finally:
+            self._flights.forget(serial, 'packages')
 
     async def is_installed(self, serial: str, pkg: str) -> bool:
         transport = await self.transport(serial)
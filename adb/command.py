@@ -22,10 +22,11 @@ class Command:
         self.connection.write(encoded)
         return self
 
-    def _escape(self, arg: Union[int, str]) -> str:
+    @classmethod
+    def _escape(cls, arg: Union[int, str]) -> str:
         if isinstance(arg, int):
             return str(arg)
-        escaped_arg = self.RE_SQUOT.sub(r"'\"'\"'", str(arg))
+        escaped_arg = cls.RE_SQUOT.sub("'\"'\"'", str(arg))
         return f"'{escaped_arg}'"
 
     def _escape_compat(self, arg: Union[int, str]) -> str:
@@ -3,21 +3,21 @@ from adb.protocol import Protocol
 
 class HostDevicesCommand(Command):
 
-    def execute(self):
+    async def execute(self):
         self._send('host:devices')
-        reply = self.parser.readAscii(4)
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            return self._readDevices()
+            return await self._read_devices()
         elif reply == Protocol.FAIL:
-            return self.parser.readError()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
 
-    def _readDevices(self):
-        value = self.parser.readValue()
-        return self._parseDevices(value)
+    async def _read_devices(self):
+        value = await self.parser.read_value()
+        return self._parse_devices(value)
 
-    def _parseDevices(self, value):
+    def _parse_devices(self, value):
         devices = []
         if not value:
             return devices
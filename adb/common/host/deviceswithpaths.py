@@ -1,30 +1,52 @@
+import re
+
 from adb.command import Command
 from adb.protocol import Protocol
 
 class HostDevicesWithPathsCommand(Command):
+    # Attributes adb itself appends after the optional device path
+    ATTRIBUTES = ('product', 'model', 'device', 'transport_id')
+    RE_ATTRIBUTE = re.compile(r'^([a-z_]+):(.*)$')
 
-    def execute(self):
+    async def execute(self):
         self._send('host:devices-l')
-        reply = self.parser.readAscii(4)
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            return self._readDevices()
+            return await self._read_devices()
         elif reply == Protocol.FAIL:
-            return self.parser.readError()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
 
-    def _readDevices(self):
-        value = self.parser.readValue()
-        return self._parseDevices(value)
+    async def _read_devices(self):
+        value = await self.parser.read_value()
+        return self._parse_devices(value)
 
-    def _parseDevices(self, value):
+    def _parse_devices(self, value):
         devices = []
         if not value:
             return devices
         lines = value.decode('ascii').split('\n')
         for line in lines:
             if line:
-                parts = line.split()
-                id, type, path = parts[0], parts[1], parts[2]
-                devices.append({'id': id, 'type': type, 'path': path})
+                devices.append(self._parse_device(line))
         return devices
+
+    def _parse_device(self, line):
+        parts = line.split()
+        device = {'id': parts[0], 'type': None, 'path': None}
+        state = []
+        for part in parts[1:]:
+            match = self.RE_ATTRIBUTE.match(part)
+            # The state is usually one word, but "no permissions (...)" is not
+            if match is None or not state:
+                state.append(part)
+                continue
+            key, value = match.groups()
+            if key in self.ATTRIBUTES or len(device) > 3:
+                device[key] = value
+            else:
+                # The device path (e.g. usb:1-1) comes right after the state
+                device['path'] = part
+        device['type'] = ' '.join(state)
+        return device
@@ -0,0 +1,18 @@
+import struct
+
+from adb.command import Command
+from adb.protocol import Protocol
+
+class HostTportCommand(Command):
+    """Switches to a device's transport and reports the id the server picked."""
+
+    async def execute(self, serial):
+        self._send(f"host:tport:serial:{serial}")
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            transport_id, = struct.unpack('<Q', await self.parser.read_bytes(8))
+            return transport_id
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
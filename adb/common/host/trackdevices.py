@@ -4,12 +4,17 @@ from adb.tracker import Tracker
 
 class HostTrackDevicesCommand(HostDevicesCommand):
 
-    def execute(self):
+    async def execute(self, connect=None):
+        await self.open()
+        return Tracker(self, connect)
+
+    async def open(self):
+        """Start tracking without wrapping the connection in a Tracker."""
         self._send('host:track-devices')
-        reply = self.parser.readAscii(4)
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            return Tracker(self)
+            return self
         elif reply == Protocol.FAIL:
-            return self.parser.readError()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
@@ -0,0 +1,20 @@
+from adb.common.host.deviceswithpaths import HostDevicesWithPathsCommand
+from adb.protocol import Protocol
+from adb.tracker import Tracker
+
+class HostTrackDevicesWithPathsCommand(HostDevicesWithPathsCommand):
+
+    async def execute(self, connect=None):
+        await self.open()
+        return Tracker(self, connect)
+
+    async def open(self):
+        """Start tracking without wrapping the connection in a Tracker."""
+        self._send('host:track-devices-l')
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            return self
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
@@ -3,12 +3,12 @@ from adb.protocol import Protocol
 
 class HostTransportCommand(Command):
 
-    def execute(self, serial):
+    async def execute(self, serial):
         self._send(f"host:transport:{serial}")
-        reply = self.parser.readAscii(4)
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
             return True
         elif reply == Protocol.FAIL:
-            return self.parser.readError()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
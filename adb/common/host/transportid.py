@@ -0,0 +1,14 @@
+from adb.command import Command
+from adb.protocol import Protocol
+
+class HostTransportIdCommand(Command):
+
+    async def execute(self, transport_id):
+        self._send(f"host:transport-id:{transport_id}")
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            return True
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
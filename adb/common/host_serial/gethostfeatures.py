@@ -0,0 +1,16 @@
+from adb.command import Command
+from adb.protocol import Protocol
+
+class GetHostFeaturesCommand(Command):
+    """Reads the features shared by the ADB server and a device's adbd, e.g. cmd or abb_exec."""
+
+    async def execute(self, serial):
+        self._send(f"host-serial:{serial}:features")
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            value = await self.parser.read_value()
+            return [feature for feature in value.decode().split(',') if feature]
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
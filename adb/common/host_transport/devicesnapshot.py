@@ -0,0 +1,75 @@
+import re
+from adb.command import Command
+from adb.protocol import Protocol
+from adb.common.host_transport.getfeatures import GetFeaturesCommand
+from adb.common.host_transport.getpackages import GetPackagesCommand
+from adb.common.host_transport.getproperties import GetPropertiesCommand
+
+class DeviceSnapshotCommand(Command):
+    SEPARATOR = '\x1e'
+    SECTIONS = (
+        ('properties', 'getprop'),
+        ('features', 'pm list features 2>/dev/null'),
+        ('packages', 'pm list packages -f -U --show-versioncode 2>/dev/null || pm list packages -f -U 2>/dev/null'),
+        ('battery', 'dumpsys battery 2>/dev/null'),
+        ('storage', 'df -k 2>/dev/null'),
+    )
+    RE_BATTERY = re.compile(r'^\s+([^:\n]+):\s*(.*?)\r?$', re.MULTILINE)
+
+    def __init__(self, *args, **kwargs):
+        super(DeviceSnapshotCommand, self).__init__(*args, **kwargs)
+
+    async def execute(self):
+        self._send(f"exec:{self._script()}")
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            data = await self.parser.read_all()
+            return self._parse_snapshot(data.decode('utf-8', 'replace'))
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
+
+    def _script(self):
+        return '; '.join(f"printf '\\036{name}\\n'; {command}" for name, command in self.SECTIONS)
+
+    def _parse_snapshot(self, value):
+        sections = {}
+        for section in value.split(self.SEPARATOR)[1:]:
+            name, _, body = section.partition('\n')
+            sections[name] = body
+        return {
+            'properties': GetPropertiesCommand._parse_properties(sections.get('properties', '')),
+            'features': GetFeaturesCommand._parse_features(sections.get('features', '')),
+            'packages': GetPackagesCommand._parse_package_details(sections.get('packages', '')),
+            'battery': self._parse_battery(sections.get('battery', '')),
+            'storage': self._parse_storage(sections.get('storage', '')),
+        }
+
+    @classmethod
+    def _parse_battery(cls, value):
+        battery = {}
+        for match in cls.RE_BATTERY.finditer(value):
+            key, val = match.group(1), match.group(2)
+            if val in ('true', 'false'):
+                battery[key] = val == 'true'
+            elif val.lstrip('-').isdigit():
+                battery[key] = int(val)
+            else:
+                battery[key] = val
+        return battery
+
+    @classmethod
+    def _parse_storage(cls, value):
+        storage = {}
+        for line in value.split('\n')[1:]:
+            cols = line.split()
+            if len(cols) < 6 or not cols[1].isdigit():
+                continue
+            storage[cols[5]] = {
+                'filesystem': cols[0],
+                'size': int(cols[1]) * 1024,
+                'used': int(cols[2]) * 1024,
+                'available': int(cols[3]) * 1024,
+            }
+        return storage
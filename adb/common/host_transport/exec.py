@@ -0,0 +1,15 @@
+from adb.command import Command
+from adb.protocol import Protocol
+
+class ExecCommand(Command):
+    async def execute(self, command):
+        if isinstance(command, list):
+            command = ' '.join(map(self._escape, command))
+        self._send(f"exec:{command}")
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            return self.parser.raw()
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
@@ -1,44 +1,52 @@
+import asyncio
 import struct
-import subprocess
+import numpy as np
 from adb.command import Command
 from adb.protocol import Protocol
-from adb.framebuffer.rgbtransform import RgbTransform
+from adb.framebuffer.encoder import encode
 
 class FrameBufferCommand(Command):
     def __init__(self, *args, **kwargs):
         super(FrameBufferCommand, self).__init__(*args, **kwargs)
 
-    def execute(self, format):
+    async def execute(self, format, executor=None):
         self._send('framebuffer:')
-        reply = self.parser.read_ascii(4).result()
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            header = self.parser.read_bytes(52).result()
+            header = await self.parser.read_bytes(52)
             meta = self._parse_header(header)
             if format == 'raw':
                 stream = self.parser.raw()
                 stream.meta = meta
                 return stream
+            elif format == 'array':
+                return await self._read_array(meta), meta
             else:
-                stream = self._convert(meta, format)
+                stream = await self._convert(meta, format, executor)
                 stream.meta = meta
                 return stream
         elif reply == Protocol.FAIL:
-            return self.parser.read_error()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
 
-    def _convert(self, meta, format):
-        print(f"Converting raw framebuffer stream into {format.upper()}")
-        if meta['format'] not in ['rgb', 'rgba']:
-            print(f"Silently transforming '{meta['format']}' into 'rgb' for `gm`")
-            transform = RgbTransform(meta)
-            meta['format'] = 'rgb'
-            raw = self.parser.raw().pipe(transform)
-        else:
-            raw = self.parser.raw()
-        proc = subprocess.Popen(['gm', 'convert', '-size', f"{meta['width']}x{meta['height']}", f"{meta['format']}:-", f"{format}:-"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
-        raw.pipe(proc.stdin)
-        return proc.stdout
+    async def _convert(self, meta, format, executor=None):
+        raw = await self.parser.read_bytes(meta['size'])
+        data = await asyncio.get_event_loop().run_in_executor(executor, encode, raw, dict(meta), format)
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        return stream
+
+    async def _read_array(self, meta):
+        buffer = bytearray(meta['size'])
+        await self.parser.read_bytes_into(memoryview(buffer))
+        if meta['bpp'] == 16:
+            pixels = np.frombuffer(buffer, dtype='<u2', count=meta['width'] * meta['height'])
+            return pixels.reshape(meta['height'], meta['width'])
+        channels = meta['bpp'] // 8
+        pixels = np.frombuffer(buffer, dtype=np.uint8, count=meta['width'] * meta['height'] * channels)
+        return pixels.reshape(meta['height'], meta['width'], channels)
 
     def _parse_header(self, header):
         meta = {}
@@ -71,6 +79,8 @@ class FrameBufferCommand(Command):
         offset += 4
         meta['alpha_length'] = struct.unpack_from('<I', header, offset)[0]
         meta['format'] = 'bgr' if meta['blue_offset'] == 0 else 'rgb'
-        if meta['bpp'] == 32 or meta['alpha_length']:
+        if meta['bpp'] == 16:
+            meta['format'] = 'rgb565'
+        elif meta['bpp'] == 32 or meta['alpha_length']:
             meta['format'] += 'a'
         return meta
@@ -8,19 +8,20 @@ class GetFeaturesCommand(Command):
     def __init__(self, *args, **kwargs):
         super(GetFeaturesCommand, self).__init__(*args, **kwargs)
 
-    def execute(self):
+    async def execute(self):
         self._send('shell:pm list features 2>/dev/null')
-        reply = self.parser.read_ascii(4).result()
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            data = self.parser.read_all().result()
+            data = await self.parser.read_all()
             return self._parse_features(data.decode('utf-8'))
         elif reply == Protocol.FAIL:
-            return self.parser.read_error()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
 
-    def _parse_features(self, value):
+    @classmethod
+    def _parse_features(cls, value):
         features = {}
-        for match in self.RE_FEATURE.finditer(value):
+        for match in cls.RE_FEATURE.finditer(value):
             features[match.group(1)] = match.group(2) or True
         return features
@@ -8,19 +8,38 @@ class GetPackagesCommand(Command):
     def __init__(self, *args, **kwargs):
         super(GetPackagesCommand, self).__init__(*args, **kwargs)
 
-    def execute(self):
+    async def execute(self):
         self._send('shell:pm list packages 2>/dev/null')
-        reply = self.parser.read_ascii(4).result()
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            data = self.parser.read_all().result()
+            data = await self.parser.read_all()
             return self._parse_packages(data.decode('utf-8'))
         elif reply == Protocol.FAIL:
-            return self.parser.read_error()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
 
-    def _parse_packages(self, value):
+    @classmethod
+    def _parse_packages(cls, value):
         packages = []
-        for match in self.RE_PACKAGE.finditer(value):
+        for match in cls.RE_PACKAGE.finditer(value):
             packages.append(match.group(1))
         return packages
+
+    @classmethod
+    def _parse_package_details(cls, value):
+        """Parse the output of `pm list packages -f -U --show-versioncode`."""
+        packages = []
+        for match in cls.RE_PACKAGE.finditer(value):
+            fields = match.group(1).split(' ')
+            # The APK path may itself contain '=', package names cannot
+            path, _, name = fields[0].rpartition('=')
+            package = {'name': name, 'path': path or None, 'version_code': None, 'uid': None}
+            for field in fields[1:]:
+                key, _, val = field.partition(':')
+                if key == 'versionCode':
+                    package['version_code'] = int(val)
+                elif key == 'uid':
+                    package['uid'] = int(val.split(',')[0])
+            packages.append(package)
+        return packages
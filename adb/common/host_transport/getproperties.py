@@ -8,19 +8,20 @@ class GetPropertiesCommand(Command):
     def __init__(self, *args, **kwargs):
         super(GetPropertiesCommand, self).__init__(*args, **kwargs)
 
-    def execute(self):
+    async def execute(self):
         self._send('shell:getprop')
-        reply = self.parser.read_ascii(4).result()
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            data = self.parser.read_all().result()
+            data = await self.parser.read_all()
             return self._parse_properties(data.decode('utf-8'))
         elif reply == Protocol.FAIL:
-            return self.parser.read_error()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
 
-    def _parse_properties(self, value):
+    @classmethod
+    def _parse_properties(cls, value):
         properties = {}
-        for match in self.RE_KEYVAL.finditer(value):
+        for match in cls.RE_KEYVAL.finditer(value):
             properties[match.group(1)] = match.group(2)
         return properties
@@ -1,23 +1,35 @@
+import re
 from adb.command import Command
 from adb.protocol import Protocol
 
 class InstallCommand(Command):
+    # pm prints Success or Failure [CODE: message]; errors caught by the
+    # shell wrapper itself (bad arguments, a crashed service) print Error:
+    RE_RESULT = re.compile(r'^(?:(Success)\b.*?|Failure \[(.*)\]|Error: (.*?))\r?$', re.MULTILINE)
+
     def __init__(self, *args, **kwargs):
         super(InstallCommand, self).__init__(*args, **kwargs)
 
-    def execute(self, apk):
+    async def execute(self, apk):
         self._send(f"shell:pm install -r {self._escape_compat(apk)}")
-        reply = self.parser.read_ascii(4).result()
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            match = self.parser.search_line(r'^(Success|Failure \[(.*?)\])$').result()
-            if match[1] == 'Success':
-                return True
-            else:
-                code = match[2]
-                err = Exception(f"{apk} could not be installed [{code}]")
-                err.code = code
-                raise err
+            return await self._read_result(apk)
         elif reply == Protocol.FAIL:
-            return self.parser.read_error()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
+
+    async def _read_result(self, apk):
+        output = (await self.parser.read_all()).decode('utf-8', 'replace')
+        self._check_output(apk, output)
+        return True
+
+    def _check_output(self, what, output):
+        match = self.RE_RESULT.search(output)
+        if match and match[1]:
+            return
+        code = (match[2] or match[3]) if match else output.strip()
+        err = Exception(f"{what} could not be installed [{code}]")
+        err.code = code
+        raise err
@@ -0,0 +1,15 @@
+from adb.common.host_transport.streaminstall import StreamInstallCommand
+from adb.protocol import Protocol
+
+class InstallCommitCommand(StreamInstallCommand):
+
+    async def execute(self, session, service='cmd'):
+        self._send_package(service, 'install-commit', session)
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            await self._read_output(f"Install session {session}")
+            return True
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
@@ -0,0 +1,22 @@
+import re
+from adb.common.host_transport.streaminstall import StreamInstallCommand
+from adb.protocol import Protocol
+
+class InstallCreateCommand(StreamInstallCommand):
+    RE_SESSION = re.compile(r'\[(\d+)\]')
+
+    async def execute(self, size, service='cmd', args=('-r',)):
+        self._send_package(service, 'install-create', '-S', size, *args)
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            output = await self._read_output('Install session')
+            match = self.RE_SESSION.search(output)
+            if match is None:
+                err = Exception(f"Install session could not be created [{output.strip()}]")
+                err.code = output.strip()
+                raise err
+            return int(match.group(1))
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
@@ -0,0 +1,42 @@
+import re
+from adb.command import Command
+from adb.protocol import Protocol
+
+class InstalledApkCommand(Command):
+    """Looks up the installed base APK of a package, its SHA-256 and versionCode, in one exec."""
+
+    RE_PATH = re.compile(r'^path:(.*?)\r?$', re.MULTILINE)
+    RE_SHA256 = re.compile(r'^([0-9a-f]{64})\s', re.MULTILINE)
+    RE_VERSION_CODE = re.compile(r'versionCode=(\d+)')
+
+    def __init__(self, *args, **kwargs):
+        super(InstalledApkCommand, self).__init__(*args, **kwargs)
+
+    async def execute(self, package):
+        package = self._escape(package)
+        self._send(
+            f"exec:p=$(pm path {package} 2>/dev/null | head -n 1); p=${{p#package:}}; echo \"path:$p\"; "
+            f"[ -n \"$p\" ] && sha256sum \"$p\" 2>/dev/null; "
+            f"dumpsys package {package} 2>/dev/null | grep -m 1 versionCode"
+        )
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            data = await self.parser.read_all()
+            return self._parse_installed(data.decode('utf-8', 'replace'))
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
+
+    @classmethod
+    def _parse_installed(cls, value):
+        path = cls.RE_PATH.search(value)
+        if not path or not path.group(1):
+            return None
+        sha256 = cls.RE_SHA256.search(value)
+        version_code = cls.RE_VERSION_CODE.search(value)
+        return {
+            'path': path.group(1),
+            'sha256': sha256.group(1) if sha256 else None,
+            'version_code': int(version_code.group(1)) if version_code else None,
+        }
@@ -0,0 +1,16 @@
+from adb.common.host_transport.streaminstall import StreamInstallCommand
+from adb.protocol import Protocol
+
+class InstallWriteCommand(StreamInstallCommand):
+
+    async def execute(self, session, name, apk, service='cmd'):
+        self._send_package(service, 'install-write', '-S', self._size(apk), session, name, '-')
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            await self._write_apk(apk)
+            await self._read_output(name)
+            return True
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
@@ -1,22 +1,29 @@
 from adb.command import Command
 from adb.protocol import Protocol
-from adb.linetransform import LineTransform
 
 class LogcatCommand(Command):
     def __init__(self, *args, **kwargs):
         super(LogcatCommand, self).__init__(*args, **kwargs)
+        self.crlf = False
 
-    def execute(self, options=None):
+    async def execute(self, options=None):
         if options is None:
             options = {}
         cmd = 'logcat -B *:I 2>/dev/null'
+        if options.get('since'):
+            sec, nsec = options['since']
+            cmd = f"logcat -B -T {self._escape(f'{sec}.{nsec:09d}')} *:I 2>/dev/null"
         if options.get('clear'):
             cmd = f"logcat -c 2>/dev/null && {cmd}"
         self._send(f"shell:echo && {cmd}")
-        reply = self.parser.read_ascii(4).result()
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
-            return self.parser.raw().pipe(LineTransform(auto_detect=True))
+            # The leading echo tells us whether the shell went through a PTY,
+            # which turns every LF of the binary stream into CRLF.
+            line = await self.parser.read_until(0x0a)
+            self.crlf = line.endswith(b'\r')
+            return self.parser.raw()
         elif reply == Protocol.FAIL:
-            return self.parser.read_error()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
@@ -1,21 +1,75 @@
+import struct
 from adb.command import Command
 from adb.protocol import Protocol
 from adb.parser import Parser, PrematureEOFError
 from adb.linetransform import LineTransform
 
 class ScreencapCommand(Command):
-    def execute(self):
+    # PixelFormat value -> (format, bpp, red, green, blue, alpha) as (offset, length) pairs
+    PIXEL_FORMATS = {
+        1: ('rgba', 32, (0, 8), (8, 8), (16, 8), (24, 8)),
+        2: ('rgbx', 32, (0, 8), (8, 8), (16, 8), (24, 0)),
+        3: ('rgb', 24, (0, 8), (8, 8), (16, 8), (0, 0)),
+        4: ('rgb565', 16, (11, 5), (5, 6), (0, 5), (0, 0)),
+        5: ('bgra', 32, (16, 8), (8, 8), (0, 8), (24, 8)),
+    }
+
+    async def execute(self, raw=False):
+        if raw:
+            return await self._execute_raw()
         self._send('shell:echo && screencap -p 2>/dev/null')
-        reply = self.parser.readAscii(4)
+        reply = await self.parser.read_ascii(4)
         if reply == Protocol.OKAY:
             try:
                 transform = LineTransform(autoDetect=True)
-                chunk = self.parser.readBytes(1)
+                chunk = await self.parser.read_bytes(1)
                 transform.write(chunk)
                 return self.parser.raw().pipe(transform)
             except PrematureEOFError:
                 raise Exception('No support for the screencap common')
         elif reply == Protocol.FAIL:
-            return self.parser.readError()
+            return await self.parser.read_error()
         else:
-            return self.parser.unexpected(reply, 'OKAY or FAIL')
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
+
+    async def _execute_raw(self):
+        # exec: has no PTY, so the pixels arrive untouched and need no
+        # CRLF fixing, and without -p the device skips PNG compression.
+        self._send('exec:screencap 2>/dev/null')
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            try:
+                header = await self.parser.read_bytes(12)
+            except PrematureEOFError:
+                raise Exception('No support for the screencap common')
+            meta = self._parse_header(header)
+            data = memoryview(await self.parser.read_all())
+            # Android 9+ writes the dataspace as a fourth header field.
+            if len(data) >= meta['size'] + 4:
+                data = data[4:]
+            return data[:meta['size']], meta
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
+
+    def _parse_header(self, header):
+        width, height, pixel_format = struct.unpack_from('<III', header, 0)
+        if pixel_format not in self.PIXEL_FORMATS:
+            raise Exception(f"Unsupported screencap pixel format {pixel_format}")
+        format, bpp, red, green, blue, alpha = self.PIXEL_FORMATS[pixel_format]
+        return {
+            'width': width,
+            'height': height,
+            'bpp': bpp,
+            'size': width * height * bpp // 8,
+            'red_offset': red[0],
+            'red_length': red[1],
+            'green_offset': green[0],
+            'green_length': green[1],
+            'blue_offset': blue[0],
+            'blue_length': blue[1],
+            'alpha_offset': alpha[0],
+            'alpha_length': alpha[1],
+            'format': format,
+        }
@@ -0,0 +1,65 @@
+import os
+
+import aiofiles
+
+from adb.common.host_transport.install import InstallCommand
+from adb.protocol import Protocol
+
+class StreamInstallCommand(InstallCommand):
+    """
+    Installs an APK by streaming it into the package manager.
+
+    Uses `cmd package install -S <size>` over `exec:`, or the `abb_exec`
+    service when the device supports it, so the APK is never written to
+    /data/local/tmp first. `apk` is a local path or a bytes-like object.
+    """
+
+    CHUNK_SIZE = 65536
+
+    # How the package manager is reached: abb_exec (Android 10+), the cmd
+    # binary over exec: (Android 7+), or the pm script on older devices
+    SERVICES = {
+        'abb': 'abb_exec:package',
+        'cmd': 'exec:cmd package',
+        'pm': 'exec:pm',
+    }
+
+    async def execute(self, apk, abb=False, args=('-r',)):
+        self._send_package('abb' if abb else 'cmd', 'install', '-S', self._size(apk), *args)
+        reply = await self.parser.read_ascii(4)
+        if reply == Protocol.OKAY:
+            await self._write_apk(apk)
+            return await self._read_result(apk if isinstance(apk, str) else 'APK')
+        elif reply == Protocol.FAIL:
+            return await self.parser.read_error()
+        else:
+            return await self.parser.unexpected(reply, 'OKAY or FAIL')
+
+    def _send_package(self, service, *args):
+        args = [str(arg) for arg in args]
+        if service == 'abb':
+            self._send('\0'.join([self.SERVICES[service], *args]))
+        else:
+            self._send(' '.join([self.SERVICES[service], *map(self._escape, args)]))
+
+    @staticmethod
+    def _size(apk):
+        return os.path.getsize(apk) if isinstance(apk, str) else len(memoryview(apk).cast('B'))
+
+    async def _read_output(self, what):
+        output = (await self.parser.read_all()).decode('utf-8', 'replace')
+        self._check_output(what, output)
+        return output
+
+    async def _write_apk(self, apk):
+        if isinstance(apk, str):
+            async with aiofiles.open(apk, 'rb') as f:
+                while True:
+                    chunk = await f.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await self.connection.write(chunk)
+        else:
+            view = memoryview(apk).cast('B')
+            for offset in range(0, len(view), self.CHUNK_SIZE):
+                await self.connection.write(view[offset:offset + self.CHUNK_SIZE])
@@ -0,0 +1,85 @@
+import io
+import struct
+import zlib
+
+import numpy as np
+
+from .rgbtransform import to_rgb
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def encode(data, meta, format: str = 'png', backend: str = None, level: int = 6, quality: int = 90) -> bytes:
+    """
+    Encode raw framebuffer pixels in-process.
+
+    This is a plain function of bytes and a metadata dict, so it can be
+    handed to a `ProcessPoolExecutor` as well as a thread pool.
+
+    Args:
+        data: A bytes-like object with the raw pixels.
+        meta (dict): Header metadata from `FrameBufferCommand._parse_header`.
+        format (str): Output format, e.g. 'png' or 'jpeg'.
+        backend (str): 'zlib' for the built-in PNG writer or 'pillow'.
+            Defaults to 'zlib' for PNG and 'pillow' for anything else.
+        level (int): zlib compression level for PNG.
+        quality (int): JPEG quality for the Pillow backend.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    format = format.lower()
+    if backend is None:
+        backend = 'zlib' if format == 'png' else 'pillow'
+    if backend == 'zlib':
+        if format != 'png':
+            raise ValueError(f"The zlib backend cannot encode '{format}'")
+        return encode_png(data, meta, level)
+    if backend == 'pillow':
+        return _encode_pillow(data, meta, format, quality)
+    raise ValueError(f"Unknown encoder backend '{backend}'")
+
+
+def encode_png(data, meta, level: int = 6) -> bytes:
+    """
+    Encode raw framebuffer pixels as PNG using only zlib.
+
+    Args:
+        data: A bytes-like object with the raw pixels.
+        meta (dict): Header metadata.
+        level (int): zlib compression level.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    width, height = meta['width'], meta['height']
+    alpha = bool(meta['alpha_length'])
+    channels = 4 if alpha else 3
+    pixels = to_rgb(data, meta, alpha=alpha)[:width * height].reshape(height, width * channels)
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels
+    header = struct.pack('>IIBBBBB', width, height, 8, 6 if alpha else 2, 0, 0, 0)
+    return b''.join([
+        PNG_SIGNATURE,
+        _chunk(b'IHDR', header),
+        _chunk(b'IDAT', zlib.compress(rows.tobytes(), level)),
+        _chunk(b'IEND', b''),
+    ])
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body) & 0xffffffff)
+
+
+def _encode_pillow(data, meta, format: str, quality: int) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError(f"Encoding '{format}' requires Pillow to be installed")
+    alpha = bool(meta['alpha_length']) and format != 'jpeg' and format != 'jpg'
+    pixels = to_rgb(data, meta, alpha=alpha)[:meta['width'] * meta['height']]
+    image = Image.frombuffer('RGBA' if alpha else 'RGB', (meta['width'], meta['height']),
+                             pixels.tobytes(), 'raw', 'RGBA' if alpha else 'RGB', 0, 1)
+    out = io.BytesIO()
+    image.save(out, format='JPEG' if format in ('jpeg', 'jpg') else format.upper(), quality=quality)
+    return out.getvalue()
@@ -0,0 +1,208 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .rgbtransform import to_rgb
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+_DCT: Dict[int, np.ndarray] = {}
+
+
+def to_gray(frame: np.ndarray, meta: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """
+    Convert a frame to float32 luma.
+
+    Args:
+        frame (np.ndarray): A (height, width, channels) frame, or (height,
+            width) for RGB565 as returned by `Client.framebuffer_array()`.
+        meta (Optional[Dict[str, Any]]): Header metadata describing the
+            channel layout. Without it, channels are taken to be RGB(A).
+
+    Returns:
+        np.ndarray: A (height, width) float32 array.
+    """
+    height, width = frame.shape[:2]
+    if meta is not None:
+        rgb = to_rgb(np.ascontiguousarray(frame).reshape(-1).view(np.uint8), meta).reshape(height, width, 3)
+    else:
+        rgb = frame[..., :3]
+    return rgb[..., 0] * np.float32(0.299) + rgb[..., 1] * np.float32(0.587) + rgb[..., 2] * np.float32(0.114)
+
+
+def downsample(gray: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    Shrink a luma image by averaging equal blocks. Rows and columns that do
+    not fill a whole block are dropped.
+
+    Args:
+        gray (np.ndarray): A (H, W) array.
+        height (int): Output height.
+        width (int): Output width.
+
+    Returns:
+        np.ndarray: A (height, width) float32 array.
+
+    Raises:
+        ValueError: If the image is smaller than the output.
+    """
+    if gray.shape[0] < height or gray.shape[1] < width:
+        raise ValueError(f"Image of {gray.shape[1]}x{gray.shape[0]} is smaller than {width}x{height}")
+    block_y = gray.shape[0] // height
+    block_x = gray.shape[1] // width
+    cropped = gray[:block_y * height, :block_x * width]
+    return cropped.reshape(height, block_y, width, block_x).mean(axis=(1, 3), dtype=np.float32)
+
+
+def ahash(frame: np.ndarray, meta: Optional[Dict[str, Any]] = None, size: int = 8) -> int:
+    """Average hash: one bit per block, set when brighter than the mean."""
+    small = downsample(to_gray(frame, meta), size, size)
+    return _pack(small > small.mean())
+
+
+def dhash(frame: np.ndarray, meta: Optional[Dict[str, Any]] = None, size: int = 8) -> int:
+    """Difference hash: one bit per block, set when brighter than its right neighbour."""
+    small = downsample(to_gray(frame, meta), size, size + 1)
+    return _pack(small[:, :-1] > small[:, 1:])
+
+
+def phash(frame: np.ndarray, meta: Optional[Dict[str, Any]] = None, size: int = 8, factor: int = 4) -> int:
+    """Perceptual hash: low DCT frequencies of a downsampled image against their median."""
+    n = size * factor
+    small = downsample(to_gray(frame, meta), n, n)
+    dct = _dct_matrix(n)
+    low = (dct @ small @ dct.T)[:size, :size]
+    return _pack(low > np.median(low.ravel()[1:]))
+
+
+HASHES = {'ahash': ahash, 'dhash': dhash, 'phash': phash}
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count('1')
+
+
+def diff_mask(a: np.ndarray, b: np.ndarray, tolerance: int = 0) -> np.ndarray:
+    """
+    Find the pixels that differ between two frames of the same layout.
+
+    Args:
+        a (np.ndarray): First frame.
+        b (np.ndarray): Second frame.
+        tolerance (int): Largest per-channel difference still considered equal.
+
+    Returns:
+        np.ndarray: A (height, width) boolean mask of differing pixels.
+    """
+    if a.shape != b.shape:
+        raise ValueError(f"Frame shapes differ: {a.shape} != {b.shape}")
+    delta = np.abs(a.astype(np.int16) - b.astype(np.int16))
+    if delta.ndim == 3:
+        delta = delta.max(axis=2)
+    return delta > tolerance
+
+
+def diff_ratio(a: np.ndarray, b: np.ndarray, tolerance: int = 0) -> float:
+    """Fraction of pixels that differ between two frames."""
+    return float(diff_mask(a, b, tolerance).mean())
+
+
+class GoldenIndex:
+    """
+    In-memory index of golden image hashes with nearest-match lookup.
+
+    Hashes live in one uint64 array; a lookup XORs the query against all of
+    them at once and counts bits with a byte lookup table. Only 64-bit hashes,
+    i.e. the default `size=8`, fit.
+    """
+
+    def __init__(self, kind: str = 'phash'):
+        """
+        Initialize a GoldenIndex.
+
+        Args:
+            kind (str): Hash used for frames: 'ahash', 'dhash' or 'phash'.
+        """
+        if kind not in HASHES:
+            raise ValueError(f"Unknown hash '{kind}'")
+        self.kind = kind
+        self.keys: List[Hashable] = []
+        self._hashes = np.zeros(16, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def hash(self, frame: np.ndarray, meta: Optional[Dict[str, Any]] = None) -> int:
+        """Hash a frame with the index's hash function."""
+        return HASHES[self.kind](frame, meta)
+
+    def add(self, key: Hashable, value: int) -> None:
+        """
+        Add a golden hash.
+
+        Args:
+            key (Hashable): Identifier of the golden image.
+            value (int): Its hash.
+
+        Raises:
+            ValueError: If the hash does not fit in 64 bits.
+        """
+        if not 0 <= value < 1 << 64:
+            raise ValueError(f"Hash {value:#x} does not fit in 64 bits")
+        count = len(self.keys)
+        if count == len(self._hashes):
+            self._hashes = np.concatenate([self._hashes, np.zeros(count, dtype=np.uint64)])
+        self._hashes[count] = value
+        self.keys.append(key)
+
+    def add_frame(self, key: Hashable, frame: np.ndarray, meta: Optional[Dict[str, Any]] = None) -> int:
+        """Hash a golden frame and add it. Returns the hash."""
+        value = self.hash(frame, meta)
+        self.add(key, value)
+        return value
+
+    def remove(self, key: Hashable) -> None:
+        """Remove a golden image."""
+        index = self.keys.index(key)
+        count = len(self.keys)
+        self._hashes[index:count - 1] = self._hashes[index + 1:count]
+        del self.keys[index]
+
+    def nearest(self, value: int, k: int = 1, max_distance: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """
+        Find the golden images closest to a hash.
+
+        Args:
+            value (int): The hash to look up.
+            k (int): Maximum number of results.
+            max_distance (Optional[int]): Largest Hamming distance to accept.
+
+        Returns:
+            List[Tuple[Hashable, int]]: (key, distance) pairs, closest first.
+        """
+        if not self.keys:
+            return []
+        distances = self.distances(value)
+        order = np.argsort(distances, kind='stable')[:k]
+        return [(self.keys[i], int(distances[i])) for i in order
+                if max_distance is None or distances[i] <= max_distance]
+
+    def distances(self, value: int) -> np.ndarray:
+        """Hamming distances from a hash to every golden hash, in insertion order."""
+        xor = self._hashes[:len(self.keys)] ^ np.uint64(value)
+        return _POPCOUNT[xor.view(np.uint8).reshape(-1, 8)].sum(axis=1, dtype=np.int32)
+
+
+def _pack(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), 'big')
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    matrix = _DCT.get(n)
+    if matrix is None:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)).astype(np.float32) * np.float32(np.sqrt(2 / n))
+        matrix[0] /= np.float32(np.sqrt(2))
+        _DCT[n] = matrix
+    return matrix
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..common.host_transport.framebuffer import FrameBufferCommand
+from ..parser import Parser
+from .encoder import encode
+
+logger = logging.getLogger(__name__)
+
+Sink = Callable[[str, bytes, Dict[str, Any]], Awaitable[None]]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # The parent owns the segment, workers must not track it.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the segment with the worker's resource
+    # tracker, which unlinks it and warns about a leak when the worker exits.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def encode_shared(name: str, meta: Dict[str, Any], format: str) -> bytes:
+    """
+    Encode a frame held in shared memory. Runs in a worker process.
+
+    Args:
+        name (str): Name of the shared memory block with the raw pixels.
+        meta (Dict[str, Any]): Framebuffer header metadata.
+        format (str): Output format.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    shm = _attach(name)
+    try:
+        view = shm.buf[:meta['size']]
+        try:
+            return encode(view, meta, format)
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+class CapturePipeline:
+    """
+    Captures screenshots from many devices in three stages.
+
+    Network reads run on the event loop and land in shared memory blocks.
+    Pixel conversion and encoding run in a process pool that attaches to
+    those blocks, so frames are never pickled and CPU work never stalls the
+    loop. Released blocks are kept for the next frames that fit them instead
+    of creating a segment per frame. Encoded images are then handed to an async sink. Bounded queues
+    between the stages cap the frames in flight.
+    """
+
+    def __init__(self, client: Any, sink: Sink, format: str = 'png', workers: Optional[int] = None,
+                 readers: int = 8, queue_size: int = 16, executor: Optional[Executor] = None):
+        """
+        Initialize a CapturePipeline.
+
+        Args:
+            client (Any): The Client to capture with.
+            sink (Sink): Coroutine function called with (serial, data, meta)
+                for every encoded image.
+            format (str): Output format passed to the encoder.
+            workers (Optional[int]): Encoding processes; defaults to the CPU count.
+            readers (int): Concurrent framebuffer reads.
+            queue_size (int): Capacity of each queue between stages.
+            executor (Optional[Executor]): Executor to encode in instead of
+                a private ProcessPoolExecutor.
+        """
+        self.client = client
+        self.sink = sink
+        self.format = format
+        self.workers = workers or os.cpu_count() or 1
+        self.readers = readers
+        self.queue_size = queue_size
+        self.executor = executor
+        self.errors: List[Tuple[str, Exception]] = []
+        self._own_executor = executor is None
+        self._requests: Optional[asyncio.Queue] = None
+        self._frames: Optional[asyncio.Queue] = None
+        self._images: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._outstanding = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._pool: List[shared_memory.SharedMemory] = []
+        self.pool_size = readers + self.workers + queue_size
+
+    async def start(self) -> None:
+        """Start the stage workers."""
+        if self._tasks:
+            return
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._requests = asyncio.Queue(maxsize=self.queue_size)
+        self._frames = asyncio.Queue(maxsize=self.queue_size)
+        self._images = asyncio.Queue(maxsize=self.queue_size)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = [asyncio.ensure_future(self._read()) for _ in range(self.readers)]
+        self._tasks += [asyncio.ensure_future(self._convert()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._deliver()))
+
+    async def capture(self, serial: str) -> None:
+        """
+        Queue a capture. Waits while the first queue is full.
+
+        Args:
+            serial (str): Device to capture.
+        """
+        if not self._tasks:
+            await self.start()
+        self._outstanding += 1
+        self._idle.clear()
+        await self._requests.put(serial)
+
+    async def join(self) -> None:
+        """Wait until every queued capture reached the sink or failed."""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def run(self, serials: List[str]) -> List[Tuple[str, Exception]]:
+        """
+        Capture every device once and wait for the results.
+
+        Args:
+            serials (List[str]): Devices to capture.
+
+        Returns:
+            List[Tuple[str, Exception]]: Failures of this run.
+        """
+        failed = len(self.errors)
+        for serial in serials:
+            await self.capture(serial)
+        await self.join()
+        return self.errors[failed:]
+
+    async def close(self) -> None:
+        """Stop the stage workers and the private process pool."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._frames is not None:
+            while not self._frames.empty():
+                _, shm, _ = self._frames.get_nowait()
+                self._release(shm)
+        while self._pool:
+            self._unlink(self._pool.pop())
+        if self._own_executor and self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def _read(self) -> None:
+        while True:
+            serial = await self._requests.get()
+            shm = None
+            try:
+                connection = await self.client.transport(serial)
+                try:
+                    stream = await FrameBufferCommand(connection).execute('raw')
+                    meta = dict(stream.meta)
+                    shm = self._acquire(meta['size'])
+                    await Parser(stream).read_bytes_into(shm.buf[:meta['size']])
+                finally:
+                    await connection.close()
+                await self._frames.put((serial, shm, meta))
+            except asyncio.CancelledError:
+                self._release(shm)
+                raise
+            except Exception as err:
+                self._release(shm)
+                self._fail(serial, err)
+
+    async def _convert(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            serial, shm, meta = await self._frames.get()
+            try:
+                data = await loop.run_in_executor(self.executor, encode_shared, shm.name, meta, self.format)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                self._fail(serial, err)
+                continue
+            finally:
+                self._release(shm)
+            await self._images.put((serial, data, meta))
+
+    async def _deliver(self) -> None:
+        while True:
+            serial, data, meta = await self._images.get()
+            try:
+                await self.sink(serial, data, meta)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                self._fail(serial, err)
+                continue
+            self._done()
+
+    def _fail(self, serial: str, err: Exception) -> None:
+        logger.debug(f"Capture of '{serial}' failed: {err}")
+        self.errors.append((serial, err))
+        self._done()
+
+    def _done(self) -> None:
+        self._outstanding -= 1
+        if self._outstanding <= 0:
+            self._outstanding = 0
+            self._idle.set()
+
+    def _acquire(self, size: int) -> shared_memory.SharedMemory:
+        fits = [shm for shm in self._pool if shm.size >= size]
+        if fits:
+            shm = min(fits, key=lambda shm: shm.size)
+            self._pool.remove(shm)
+            return shm
+        return shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+    def _release(self, shm: Optional[shared_memory.SharedMemory]) -> None:
+        if shm is None:
+            return
+        if self._tasks and len(self._pool) < self.pool_size:
+            self._pool.append(shm)
+        else:
+            self._unlink(shm)
+
+    @staticmethod
+    def _unlink(shm: shared_memory.SharedMemory) -> None:
+        try:
+            shm.close()
+            shm.unlink()
+        except (BufferError, FileNotFoundError) as err:
+            logger.debug(f"Unable to release shared memory '{shm.name}': {err}")
@@ -1,41 +1,78 @@
-import struct
-import io
 import assertpy
+import numpy as np
 from streamz import Stream
 
+
+def pixel_count(data, meta) -> int:
+    """Number of whole pixels in `data` for the layout described by `meta`."""
+    return len(data) // (meta['bpp'] // 8)
+
+
+def to_rgb(data, meta, alpha: bool = False) -> np.ndarray:
+    """
+    Convert raw framebuffer pixels to packed RGB or RGBA.
+
+    The source layout comes from the framebuffer header: 24/32 bpp formats
+    such as RGBA, BGRA and RGBX are reordered by indexing the channel byte
+    offsets, and 16 bpp RGB565 is unpacked with shifts and masks and scaled to
+    eight bits per channel. Trailing partial pixels are ignored.
+
+    Args:
+        data: A bytes-like object with the raw pixels.
+        meta (dict): Header metadata from `FrameBufferCommand._parse_header`.
+        alpha (bool): Whether to output a fourth, alpha channel. Formats
+            without alpha get an opaque one.
+
+    Returns:
+        np.ndarray: A (N, 3) or (N, 4) uint8 array.
+    """
+    bpp = meta['bpp']
+    count = pixel_count(data, meta)
+    if bpp == 16:
+        pixels = np.frombuffer(data, dtype='<u2', count=count)
+        channels = [_unpack_channel(pixels, meta[f'{name}_offset'], meta[f'{name}_length'])
+                    for name in ('red', 'green', 'blue')]
+        if alpha:
+            if meta['alpha_length']:
+                channels.append(_unpack_channel(pixels, meta['alpha_offset'], meta['alpha_length']))
+            else:
+                channels.append(np.full(count, 255, dtype=np.uint8))
+        return np.stack(channels, axis=1)
+
+    pixel_bytes = bpp // 8
+    pixels = np.frombuffer(data, dtype=np.uint8, count=count * pixel_bytes).reshape(count, pixel_bytes)
+    order = [meta['red_offset'] // 8, meta['green_offset'] // 8, meta['blue_offset'] // 8]
+    if alpha and meta['alpha_length']:
+        order.append(meta['alpha_offset'] // 8)
+    out = np.empty((count, 4 if alpha else 3), dtype=np.uint8)
+    # One strided copy per channel is several times faster than a single
+    # fancy-indexed gather over the (N, bpp) view.
+    for target, source in enumerate(order):
+        out[:, target] = pixels[:, source]
+    if alpha and not meta['alpha_length']:
+        out[:, 3] = 255
+    return out
+
+
+def _unpack_channel(pixels: np.ndarray, offset: int, length: int) -> np.ndarray:
+    value = (pixels >> offset) & ((1 << length) - 1)
+    if length >= 8:
+        return (value >> (length - 8)).astype(np.uint8)
+    return ((value << (8 - length)) | (value >> max(2 * length - 8, 0))).astype(np.uint8)
+
+
 class RgbTransform(Stream.Transform):
     def __init__(self, meta, options=None):
         super().__init__(options)
         self.meta = meta
-        self._buffer = io.BytesIO()
-        assertpy.assert_that(self.meta['bpp']).is_equal_to(24).or_is_equal_to(32)
-        self._r_pos = self.meta['red_offset'] // 8
-        self._g_pos = self.meta['green_offset'] // 8
-        self._b_pos = self.meta['blue_offset'] // 8
-        self._a_pos = self.meta['alpha_offset'] // 8
+        assertpy.assert_that(self.meta['bpp']).is_in(16, 24, 32)
         self._pixel_bytes = self.meta['bpp'] // 8
+        self._remainder = b''
 
     def _transform(self, chunk, encoding, done):
-        self._buffer.write(chunk)
-        source_cursor = 0
-        target_cursor = 0
-        buffer_data = self._buffer.getvalue()
-        buffer_length = len(buffer_data)
-        target = io.BytesIO()
-        
-        while buffer_length - source_cursor >= self._pixel_bytes:
-            r = buffer_data[source_cursor + self._r_pos]
-            g = buffer_data[source_cursor + self._g_pos]
-            b = buffer_data[source_cursor + self._b_pos]
-            target.write(struct.pack('BBB', r, g, b))
-            source_cursor += self._pixel_bytes
-            target_cursor += 3
-        
-        if target_cursor:
-            self.push(target.getvalue()[:target_cursor])
-            remaining_buffer = buffer_data[source_cursor:]
-            self._buffer.seek(0)
-            self._buffer.truncate(0)
-            self._buffer.write(remaining_buffer)
-        
+        data = self._remainder + chunk if self._remainder else chunk
+        usable = len(data) - len(data) % self._pixel_bytes
+        if usable:
+            self.push(to_rgb(memoryview(data)[:usable], self.meta).tobytes())
+        self._remainder = bytes(data[usable:])
         done()
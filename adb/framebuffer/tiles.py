@@ -0,0 +1,153 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+Rect = Tuple[int, int, int, int]
+
+
+class ScreenUpdate:
+    """
+    The regions of a frame that changed since the previous one.
+    """
+
+    __slots__ = ('index', 'time', 'frame', 'meta', 'rects')
+
+    def __init__(self, index: int, time: float, frame: np.ndarray, meta: Dict[str, Any], rects: List[Rect]):
+        """
+        Initialize a ScreenUpdate.
+
+        Args:
+            index (int): Sequence number of the frame.
+            time (float): Event loop time at which the frame was read.
+            frame (np.ndarray): The full frame.
+            meta (Dict[str, Any]): Framebuffer header metadata.
+            rects (List[Rect]): Changed (x, y, width, height) rectangles.
+        """
+        self.index = index
+        self.time = time
+        self.frame = frame
+        self.meta = meta
+        self.rects = rects
+
+    def regions(self) -> Iterator[Tuple[Rect, np.ndarray]]:
+        """Yield every changed rectangle with a view of its pixels."""
+        for rect in self.rects:
+            x, y, w, h = rect
+            yield rect, self.frame[y:y + h, x:x + w]
+
+    def __repr__(self) -> str:
+        return f"ScreenUpdate(index={self.index}, rects={len(self.rects)})"
+
+
+class TileTracker:
+    """
+    Finds the tiles of a frame that changed since the previous frame.
+
+    Each tile is reduced to a 64-bit hash: the frame is viewed as 64-bit
+    words, multiplied by fixed random odd weights and summed per tile, all
+    with wrapping integer arithmetic. Only the hashes of the previous frame
+    are kept, not its pixels.
+    """
+
+    def __init__(self, tile: int = 32, seed: int = 0x5eed):
+        """
+        Initialize a TileTracker.
+
+        Args:
+            tile (int): Tile edge in pixels.
+            seed (int): Seed for the hash weights.
+        """
+        self.tile = tile
+        self.seed = seed
+        self._hashes: Optional[np.ndarray] = None
+        self._weights: Optional[np.ndarray] = None
+        self._padded: Optional[np.ndarray] = None
+        self._padded_row_bytes = 0
+
+    def reset(self) -> None:
+        """Forget the previous frame, so the next one is reported in full."""
+        self._hashes = None
+
+    def update(self, frame: np.ndarray) -> List[Rect]:
+        """
+        Hash a new frame and compare it with the previous one.
+
+        Args:
+            frame (np.ndarray): A (height, width[, channels]) pixel array.
+
+        Returns:
+            List[Rect]: Changed (x, y, width, height) rectangles, with
+            horizontally adjacent tiles merged and clipped to the frame.
+        """
+        hashes = self.hash(frame)
+        if self._hashes is None or self._hashes.shape != hashes.shape:
+            changed = np.ones(hashes.shape, dtype=bool)
+        else:
+            changed = hashes != self._hashes
+        self._hashes = hashes
+        return self._rects(changed, frame.shape[1], frame.shape[0])
+
+    def hash(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Compute the tile hashes of a frame.
+
+        Args:
+            frame (np.ndarray): A (height, width[, channels]) pixel array.
+
+        Returns:
+            np.ndarray: A (tiles_y, tiles_x) uint64 array.
+        """
+        tile = self.tile
+        height, width = frame.shape[:2]
+        row_bytes = frame[0].nbytes
+        pixel_bytes = row_bytes // width
+        tiles_y = -(-height // tile)
+        tiles_x = -(-width // tile)
+        tile_bytes = tile * pixel_bytes
+        words = -(-tile_bytes // 8)
+        data = self._pad(frame, tiles_y * tile, tiles_x, tile_bytes, words * 8, row_bytes)
+        grid = data.view('<u8').reshape(tiles_y, tile, tiles_x, words)
+        weights = self._tile_weights(tile, words)
+        return (grid * weights[None, :, None, :]).sum(axis=(1, 3), dtype=np.uint64)
+
+    def _pad(self, frame: np.ndarray, height: int, tiles_x: int, tile_bytes: int, stride: int,
+             row_bytes: int) -> np.ndarray:
+        """Lay out the rows as (height, tiles_x, stride), each tile column padded on its own."""
+        rows = np.ascontiguousarray(frame).view(np.uint8).reshape(frame.shape[0], row_bytes)
+        if frame.shape[0] == height and tile_bytes == stride and row_bytes == tiles_x * stride:
+            return rows.reshape(height, tiles_x, stride)
+        shape = (height, tiles_x, stride)
+        if self._padded is None or self._padded.shape != shape or self._padded_row_bytes != row_bytes:
+            self._padded = np.zeros(shape, dtype=np.uint8)
+            self._padded_row_bytes = row_bytes
+        full, rest = divmod(row_bytes, tile_bytes)
+        self._padded[:frame.shape[0], :full, :tile_bytes] = \
+            rows[:, :full * tile_bytes].reshape(-1, full, tile_bytes)
+        if rest:
+            self._padded[:frame.shape[0], full, :rest] = rows[:, full * tile_bytes:]
+        return self._padded
+
+    def _tile_weights(self, tile: int, words: int) -> np.ndarray:
+        if self._weights is None or self._weights.shape != (tile, words):
+            rng = np.random.default_rng(self.seed)
+            self._weights = rng.integers(0, 2 ** 63, size=(tile, words), dtype=np.uint64) * 2 + 1
+        return self._weights
+
+    def _rects(self, changed: np.ndarray, width: int, height: int) -> List[Rect]:
+        tile = self.tile
+        rects = []
+        for ty, tx_start, tx_end in _runs(changed):
+            x = tx_start * tile
+            y = ty * tile
+            rects.append((x, y, min(tx_end * tile, width) - x, min(y + tile, height) - y))
+        return rects
+
+
+def _runs(mask: np.ndarray) -> Iterator[Tuple[int, int, int]]:
+    """Yield (row, start, end) for each horizontal run of True values."""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return zip(rows.tolist(), starts.tolist(), ends.tolist())
@@ -48,6 +48,18 @@ class Parser:
 
         return chunk
 
+    async def read_bytes_into(self, buffer: memoryview) -> None:
+        """Fill a preallocated buffer with exactly len(buffer) bytes."""
+        offset = 0
+        total = len(buffer)
+        while offset < total:
+            chunk = await self.stream.read(total - offset)
+            if not chunk:
+                self.ended = True
+                raise PrematureEOFError(total - offset)
+            buffer[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+
     async def read_byte_flow(self, how_many: int, target_stream: asyncio.StreamWriter) -> None:
         """Read bytes and write them to another stream."""
         remaining = how_many
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..command import Command
+from ..parser import Parser
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = b'\x1e'
+
+
+def parse_meminfo(data: bytes) -> Dict[str, int]:
+    """Parse /proc/meminfo into a dict of values in kB (or plain counts)."""
+    info = {}
+    for line in data.split(b'\n'):
+        key, sep, rest = line.partition(b':')
+        if not sep:
+            continue
+        value = rest.split(None, 1)
+        if value:
+            info[key.decode()] = int(value[0])
+    return info
+
+
+def parse_loadavg(data: bytes) -> Dict[str, Any]:
+    """Parse /proc/loadavg."""
+    cols = data.split()
+    running, _, total = cols[3].partition(b'/')
+    return {
+        '1m': float(cols[0]),
+        '5m': float(cols[1]),
+        '15m': float(cols[2]),
+        'running': int(running),
+        'total': int(total),
+        'last_pid': int(cols[4]),
+    }
+
+
+NET_DEV_FIELDS = (
+    'rx_bytes', 'rx_packets', 'rx_errs', 'rx_drop', 'rx_fifo', 'rx_frame', 'rx_compressed', 'rx_multicast',
+    'tx_bytes', 'tx_packets', 'tx_errs', 'tx_drop', 'tx_fifo', 'tx_colls', 'tx_carrier', 'tx_compressed',
+)
+
+
+def parse_net_dev(data: bytes) -> Dict[str, Dict[str, int]]:
+    """Parse /proc/net/dev into per-interface counters."""
+    interfaces = {}
+    # The first two lines are column headers
+    for line in data.split(b'\n')[2:]:
+        name, sep, rest = line.partition(b':')
+        if not sep:
+            continue
+        interfaces[name.strip().decode()] = dict(zip(NET_DEV_FIELDS, map(int, rest.split())))
+    return interfaces
+
+
+def parse_stat(data: bytes) -> Dict[str, Any]:
+    """
+    Parse /proc/stat.
+
+    CPU lines map to lists of tick counters, `intr` and `softirq` to their
+    totals, and everything else to a single integer.
+    """
+    stat = {}
+    for line in data.split(b'\n'):
+        cols = line.split()
+        if len(cols) < 2:
+            continue
+        key = cols[0].decode()
+        if key.startswith('cpu'):
+            stat[key] = [int(col) for col in cols[1:]]
+        else:
+            stat[key] = int(cols[1])
+    return stat
+
+
+def parse_raw(data: bytes) -> bytes:
+    """Fallback parser, returns the file contents without trailing whitespace."""
+    return data.rstrip()
+
+
+class ProcCollector(asyncio.Event):
+    """
+    Collects several /proc and /sys files in a single round trip.
+
+    All files are read by one `exec:` call that prints each one behind a
+    record separator, so a snapshot of N sources costs one connection rather
+    than N sync pulls. The collector follows the ProcStat model: `start()`
+    samples every `interval` milliseconds, `snapshot` holds the latest result
+    and the event is set whenever a new one is available.
+    """
+
+    DEFAULT_FILES = ('/proc/stat', '/proc/meminfo', '/proc/loadavg', '/proc/net/dev')
+
+    PARSERS: Dict[str, Callable[[bytes], Any]] = {
+        '/proc/stat': parse_stat,
+        '/proc/meminfo': parse_meminfo,
+        '/proc/loadavg': parse_loadavg,
+        '/proc/net/dev': parse_net_dev,
+    }
+
+    def __init__(self, client, serial: str, files: Optional[Iterable[str]] = None):
+        """
+        Initialize a ProcCollector.
+
+        Args:
+            client: The Client to run commands with.
+            serial (str): The serial number of the device.
+            files (Optional[Iterable[str]]): Paths to collect; defaults to DEFAULT_FILES.
+        """
+        super().__init__()
+        self.client = client
+        self.serial = serial
+        self.files: List[str] = list(files or self.DEFAULT_FILES)
+        self.parsers = dict(self.PARSERS)
+        self.interval = 1000
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._timer = None
+
+    def command(self) -> str:
+        """Build the device-side command that prints all files."""
+        paths = ' '.join(map(Command._escape, self.files))
+        return f"for f in {paths}; do printf '\\036%s\\n' \"$f\"; cat \"$f\" 2>/dev/null; done"
+
+    async def start(self):
+        self._timer = asyncio.create_task(self._update_loop())
+
+    async def _update_loop(self):
+        while True:
+            await self.update()
+            await asyncio.sleep(self.interval / 1000)
+
+    async def end(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    async def collect(self) -> Dict[str, Any]:
+        """
+        Take a single snapshot.
+
+        Returns:
+            Dict[str, Any]: The wall clock `time` of the request, its `duration`
+            in seconds and the parsed `files`, keyed by path. Files that could
+            not be read are left out.
+        """
+        started = time.time()
+        stream = await self.client.exec_out(self.serial, self.command())
+        out = await Parser(stream).read_all()
+        return {
+            'time': started,
+            'duration': time.time() - started,
+            'files': self._parse(out),
+        }
+
+    async def update(self):
+        try:
+            self.snapshot = await self.collect()
+        except Exception as err:
+            await self._error(err)
+            return
+        self.set()
+        self.clear()
+
+    def _parse(self, out: bytes) -> Dict[str, Any]:
+        files = {}
+        for record in out.split(SEPARATOR)[1:]:
+            path, _, data = record.partition(b'\n')
+            if not data:
+                continue
+            path = path.decode()
+            files[path] = self.parsers.get(path, parse_raw)(data)
+        return files
+
+    async def _error(self, err):
+        # A failed round trip, e.g. while the device reboots, must not end
+        # the sampling loop; the next tick simply tries again.
+        logger.warning(f"Unable to collect /proc files of '{self.serial}': {err}")
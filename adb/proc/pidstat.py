@@ -0,0 +1,231 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..parser import Parser
+
+SEPARATOR = b'\x1e'
+
+# Bits reserved for the pid in a process key; matches the kernel's PID_MAX_LIMIT
+PID_BITS = 22
+
+
+class ProcessTable:
+    """
+    One sample of all processes, stored as columns.
+
+    Every attribute except `time`, `comm` and `ncpu` is a NumPy array with
+    one row per process. `cpu` is the share of one core used since the
+    previous sample, so multi-threaded processes can exceed 100. `rss` and
+    `vsize` are in bytes.
+    """
+
+    def __init__(self, time: float, pid: np.ndarray, ppid: np.ndarray, comm: List[str], state: np.ndarray,
+                 threads: np.ndarray, starttime: np.ndarray, ticks: np.ndarray, vsize: np.ndarray,
+                 rss: np.ndarray, cpu: np.ndarray, ncpu: int):
+        self.time = time
+        self.pid = pid
+        self.ppid = ppid
+        self.comm = comm
+        self.state = state
+        self.threads = threads
+        self.starttime = starttime
+        self.ticks = ticks
+        self.vsize = vsize
+        self.rss = rss
+        self.cpu = cpu
+        self.ncpu = ncpu
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    @property
+    def key(self) -> np.ndarray:
+        """Keys identifying a process across samples, even when its pid is reused."""
+        return (self.starttime << PID_BITS) | self.pid
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Get the i-th process as a dict."""
+        return {
+            'pid': int(self.pid[i]),
+            'ppid': int(self.ppid[i]),
+            'comm': self.comm[i],
+            'state': self.state[i].decode(),
+            'threads': int(self.threads[i]),
+            'cpu': float(self.cpu[i]),
+            'rss': int(self.rss[i]),
+            'vsize': int(self.vsize[i]),
+        }
+
+    def top(self, n: int = 10, by: str = 'cpu') -> List[Dict[str, Any]]:
+        """
+        Get the processes with the highest value of a column.
+
+        Args:
+            n (int): Number of processes to return.
+            by (str): Column to sort by, e.g. 'cpu' or 'rss'.
+
+        Returns:
+            List[Dict[str, Any]]: Processes as dicts, highest first.
+        """
+        order = np.argsort(getattr(self, by), kind='stable')[::-1][:n]
+        return [self.row(i) for i in order]
+
+
+class PidStat(asyncio.Event):
+    """
+    Samples CPU and memory usage of every process on a device.
+
+    Each update runs a single device-side command that prints the cpu lines
+    of /proc/stat, every /proc/[pid]/stat and every /proc/[pid]/statm. The
+    output is split into columns with a handful of NumPy conversions rather
+    than per-field Python parsing, and CPU usage is computed against the
+    previous sample. Follows the ProcStat model: `start()` samples every
+    `interval` milliseconds, `table` holds the latest ProcessTable and the
+    event is set whenever a new one is available.
+    """
+
+    COMMAND = (
+        "grep '^cpu' /proc/stat; printf '\\036'; "
+        "cat /proc/[0-9]*/stat 2>/dev/null; printf '\\036'; "
+        "grep -H '' /proc/[0-9]*/statm 2>/dev/null"
+    )
+    # Fields after comm up to vsize, the last column we read
+    MIN_FIELDS = 21
+
+    def __init__(self, client, serial: str, page_size: int = 4096):
+        """
+        Initialize a PidStat.
+
+        Args:
+            client: The Client to run commands with.
+            serial (str): The serial number of the device.
+            page_size (int): Page size of the device, used to convert statm to bytes.
+        """
+        super().__init__()
+        self.client = client
+        self.serial = serial
+        self.page_size = page_size
+        self.interval = 1000
+        self.table: Optional[ProcessTable] = None
+        self._total = None
+        self._timer = None
+
+    async def start(self):
+        self._timer = asyncio.create_task(self._update_loop())
+
+    async def _update_loop(self):
+        while True:
+            await self.update()
+            await asyncio.sleep(self.interval / 1000)
+
+    async def end(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    async def update(self):
+        try:
+            started = time.time()
+            stream = await self.client.exec_out(self.serial, self.COMMAND)
+            out = await Parser(stream).read_all()
+            self.table = self._parse(out, started)
+        except Exception as err:
+            await self._error(err)
+            return
+        self.set()
+        self.clear()
+
+    def _parse(self, out: bytes, started: float) -> ProcessTable:
+        cpu_part, stat_part, statm_part = out.split(SEPARATOR, 2)
+        cpu_lines = cpu_part.split(b'\n')
+        total = sum(map(int, cpu_lines[0].split()[1:]))
+        ncpu = max(sum(1 for line in cpu_lines if line[3:4].isdigit()), 1)
+
+        pid, comm, tail = self._split_stat(stat_part)
+        rows = [line.split() for line in tail]
+        # A process exiting while cat reads it can leave a truncated line
+        keep = [i for i, row in enumerate(rows) if len(row) >= self.MIN_FIELDS]
+        if len(keep) < len(rows):
+            pid = pid[keep]
+            comm = [comm[i] for i in keep]
+            rows = [rows[i] for i in keep]
+        widths = set(map(len, rows))
+        if len(widths) == 1:
+            fields = np.array(rows, dtype='S')
+        else:
+            # Uneven lines (or none at all), trim every row to the shortest one
+            width = min(widths, default=self.MIN_FIELDS)
+            fields = np.array([row[:width] for row in rows], dtype='S').reshape(len(rows), width)
+        # Columns after comm start at field 3 (state) of proc(5)
+        state = fields[:, 0].astype('S1')
+        numbers = fields[:, [1, 11, 12, 17, 19, 20]].astype(np.int64)
+        ppid, utime, stime, threads, starttime, vsize = numbers.T
+        ticks = utime + stime
+        rss = self._statm_rss(statm_part, pid) * self.page_size
+
+        table = ProcessTable(started, pid, ppid, comm, state, threads, starttime, ticks, vsize, rss,
+                             np.zeros(len(pid)), ncpu)
+        if self.table is not None and total > self._total:
+            table.cpu = self._cpu(self.table, table, (total - self._total) / ncpu)
+        self._total = total
+        return table
+
+    @staticmethod
+    def _split_stat(data: bytes):
+        pids = []
+        comms = []
+        tails = []
+        for line in data.split(b'\n'):
+            # comm may contain spaces and parentheses, so find the last one
+            close = line.rfind(b')')
+            if close < 0:
+                continue
+            open_ = line.find(b' (')
+            pids.append(line[:open_])
+            comms.append(line[open_ + 2:close].decode('utf-8', 'replace'))
+            tails.append(line[close + 2:])
+        return np.array(pids, dtype=np.int64), comms, tails
+
+    @staticmethod
+    def _statm_rss(data: bytes, pid: np.ndarray) -> np.ndarray:
+        keys = []
+        values = []
+        for line in data.split(b'\n'):
+            path, sep, rest = line.partition(b':')
+            if not sep:
+                continue
+            # /proc/<pid>/statm
+            keys.append(path[6:-6])
+            values.append(rest.split(None, 2)[1])
+        rss = np.zeros(len(pid), dtype=np.int64)
+        if not keys:
+            return rss
+        keys = np.array(keys).astype(np.int64)
+        values = np.array(values).astype(np.int64)
+        order = np.argsort(keys)
+        keys, values = keys[order], values[order]
+        index = np.minimum(np.searchsorted(keys, pid), len(keys) - 1)
+        found = keys[index] == pid
+        rss[found] = values[index[found]]
+        return rss
+
+    @staticmethod
+    def _cpu(old: ProcessTable, new: ProcessTable, ticks_per_cpu: float) -> np.ndarray:
+        old_key = old.key
+        order = np.argsort(old_key)
+        old_key, old_ticks = old_key[order], old.ticks[order]
+        key = new.key
+        delta = new.ticks.copy()
+        if len(old_key):
+            index = np.minimum(np.searchsorted(old_key, key), len(old_key) - 1)
+            found = old_key[index] == key
+            # Processes missing from the previous sample started since then,
+            # so all of their ticks fall into this interval
+            delta[found] -= old_ticks[index[found]]
+        return np.maximum(delta, 0) * 100.0 / ticks_per_cpu
+
+    async def _error(self, err):
+        raise err
@@ -0,0 +1,176 @@
+import logging
+import time
+import warnings
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .stat import ProcStat
+
+logger = logging.getLogger(__name__)
+
+
+class CpuSampler(ProcStat):
+    """
+    ProcStat that keeps a history of CPU tick counters.
+
+    Every update stores the counters of all cores in a fixed-size NumPy ring
+    buffer of shape (capacity, cpus, fields), with the aggregate of all cores
+    in row 0. `cpus` holds every core seen so far, so the history survives
+    cores going offline: the counters of a core missing from a sample are
+    NaN, and so is its load over any span that starts or ends there. `load`
+    is kept up to date in the same shape as ProcStat's, and loads over any
+    window are computed from vectorized differences of that buffer, so
+    sampling many devices costs one array write per tick.
+    """
+
+    FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal', 'guest', 'guestnice')
+    IDLE = 3
+    IOWAIT = 4
+
+    def __init__(self, sync, capacity: int = 600):
+        """
+        Initialize a CpuSampler.
+
+        Args:
+            sync: The Sync service to pull /proc/stat with.
+            capacity (int): Number of samples kept; with the default 1 s
+                interval, 600 covers ten minutes.
+        """
+        super().__init__(sync)
+        self.capacity = capacity
+        self.cpus: List[str] = []
+        self._columns: Dict[str, int] = {}
+        self._ticks = np.zeros((capacity, 0, len(self.FIELDS)), dtype=np.float64)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    async def _parse(self, out: bytes):
+        cpus, ticks = self._parse_ticks(out)
+        new = [cpu for cpu in cpus if cpu not in self._columns]
+        if new:
+            if self.cpus:
+                logger.debug(f"CPUs {new} came online")
+            for cpu in new:
+                self._columns[cpu] = len(self.cpus)
+                self.cpus.append(cpu)
+            grown = np.full((self.capacity, len(self.cpus), len(self.FIELDS)), np.nan)
+            grown[:, :self._ticks.shape[1]] = self._ticks
+            self._ticks = grown
+        slot = self._count % self.capacity
+        self._ticks[slot] = np.nan
+        self._ticks[slot, [self._columns[cpu] for cpu in cpus]] = ticks
+        self._times[slot] = time.monotonic()
+        self._count += 1
+        if self._count > 1:
+            loads = self.loads()
+            self.load = {cpu: dict(zip(self.FIELDS, row.tolist()), total=100)
+                         for cpu, row in zip(self.cpus, loads) if not np.isnan(row).any()}
+            self.set()
+            self.clear()
+
+    def _parse_ticks(self, out: bytes):
+        if isinstance(out, str):
+            out = out.encode()
+        names = []
+        values = []
+        for line in out.split(b'\n'):
+            if not line.startswith(b'cpu'):
+                continue
+            cols = line.split()
+            names.append(cols[0].decode())
+            cols = cols[1:len(self.FIELDS) + 1]
+            values.extend(cols + [b'0'] * (len(self.FIELDS) - len(cols)))
+        ticks = np.array(values).astype(np.int64).reshape(len(names), len(self.FIELDS))
+        return names, ticks
+
+    def samples(self, window: Optional[float] = None):
+        """
+        Get the stored samples, oldest first.
+
+        Args:
+            window (Optional[float]): Only samples from the last `window`
+                seconds, plus the one just before it as a baseline.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Sample times and a
+            (samples, cpus, fields) float array of tick counters, NaN for
+            cores that were offline.
+        """
+        count = len(self)
+        order = np.arange(self._count - count, self._count) % self.capacity
+        times = self._times[order]
+        if window is not None and count:
+            first = max(int(np.searchsorted(times, times[-1] - window, side='left')) - 1, 0)
+            order = order[first:]
+            times = times[first:]
+        return times, self._ticks[order]
+
+    def loads(self, window: Optional[float] = None) -> np.ndarray:
+        """
+        Average load per CPU over a window.
+
+        Args:
+            window (Optional[float]): Window in seconds; defaults to the last interval.
+
+        Returns:
+            np.ndarray: A (cpus, fields) array of percentages, row order as
+            in `cpus`, NaN for cores offline at either end of the window.
+        """
+        if window is None:
+            _, ticks = self.samples()
+            ticks = ticks[-2:]
+        else:
+            _, ticks = self.samples(window)
+        if len(ticks) < 2:
+            return np.zeros((len(self.cpus), len(self.FIELDS)))
+        return self._percent(ticks[-1] - ticks[0])
+
+    def intervals(self, window: Optional[float] = None) -> np.ndarray:
+        """
+        Load of every interval in a window.
+
+        Returns:
+            np.ndarray: A (intervals, cpus, fields) array of percentages,
+            NaN where a core was offline.
+        """
+        _, ticks = self.samples(window)
+        if len(ticks) < 2:
+            return np.zeros((0, len(self.cpus), len(self.FIELDS)))
+        return self._percent(np.diff(ticks, axis=0))
+
+    def percentiles(self, window: Optional[float] = None, q: Sequence[float] = (50, 95)) -> Dict[str, np.ndarray]:
+        """
+        Percentiles of busy time and iowait over the intervals of a window.
+
+        Args:
+            window (Optional[float]): Window in seconds; defaults to the whole history.
+            q (Sequence[float]): Percentiles to compute.
+
+        Returns:
+            Dict[str, np.ndarray]: 'load' and 'iowait', each a (len(q), cpus)
+            array, where load is everything but idle and iowait. Intervals
+            in which a core was offline are left out for that core.
+        """
+        loads = self.intervals(window)
+        if not len(loads):
+            empty = np.zeros((len(q), len(self.cpus)))
+            return {'load': empty, 'iowait': empty.copy()}
+        busy = 100 - loads[..., self.IDLE] - loads[..., self.IOWAIT]
+        with warnings.catch_warnings():
+            # Cores that were offline for the whole window are all-NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return {
+                'load': np.nanpercentile(busy, q, axis=0),
+                'iowait': np.nanpercentile(loads[..., self.IOWAIT], q, axis=0),
+            }
+
+    @staticmethod
+    def _percent(delta: np.ndarray) -> np.ndarray:
+        total = delta.sum(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(total > 0, delta * 100.0 / np.maximum(total, 1), 0.0)
+        return np.where(np.isnan(total), np.nan, percent)
@@ -15,7 +15,6 @@ class ProcStat(asyncio.Event):
         self.stats = self._empty_stats()
         self._ignore = {}
         self._timer = None
-        self.update()
 
     async def start(self):
         self._timer = asyncio.create_task(self._update_loop())
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PropertyCache:
+    """
+    Per-device cache of system properties in two tiers.
+
+    Read-only `ro.*` properties cannot change until the device reboots, so
+    once the device has finished booting they are kept until the cache is
+    invalidated or the device reboots. Everything else is refreshed with a
+    full `getprop` once it is older than `ttl` seconds. A reboot is noticed
+    through `device_key` changing (e.g. the transport id reported by the
+    device tracker), through `boot_id` no longer matching
+    `ro.runtime.firstboot`, or on a full refresh. Lookups of only read-only
+    keys run no command while `device_key` is known and unchanged, since a
+    reboot always drops the transport; otherwise they cost at most one
+    `boot_id` check per `verify_interval`.
+    """
+
+    STATIC_PREFIX = 'ro.'
+    BOOT_KEY = 'ro.runtime.firstboot'
+
+    def __init__(self, fetch: Callable[[str], Awaitable[Dict[str, str]]], ttl: float = 0.0,
+                 device_key: Optional[Callable[[str], Optional[Hashable]]] = None,
+                 boot_id: Optional[Callable[[str], Awaitable[Optional[str]]]] = None,
+                 verify_interval: float = 5.0):
+        """
+        Initialize a PropertyCache.
+
+        Args:
+            fetch (Callable[[str], Awaitable[Dict[str, str]]]): Reads all properties of a device.
+            ttl (float): Seconds to reuse dynamic properties for.
+            device_key (Optional[Callable[[str], Optional[Hashable]]]): Identifies the
+                current connection of a device, or returns None if unknown.
+            boot_id (Optional[Callable[[str], Awaitable[Optional[str]]]]): Cheaply reads
+                the current `ro.runtime.firstboot` of a device. Without it, lookups of
+                read-only keys do a full refresh once dynamic properties are stale.
+            verify_interval (float): Seconds to trust a `boot_id` check for.
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.device_key = device_key
+        self.boot_id = boot_id
+        self.verify_interval = verify_interval
+        self._static: Dict[str, Dict[str, str]] = {}
+        self._dynamic: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self._keys: Dict[str, Hashable] = {}
+        self._verified: Dict[str, float] = {}
+
+    @classmethod
+    def is_static(cls, key: str) -> bool:
+        return key.startswith(cls.STATIC_PREFIX)
+
+    async def get(self, serial: str, keys: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Get the properties of a device.
+
+        Args:
+            serial (str): The serial number of the device.
+            keys (Optional[Iterable[str]]): Only return these properties.
+
+        Returns:
+            Dict[str, str]: The properties, leaving out keys that are not set.
+        """
+        tracked = self._check_device(serial)
+        if keys is not None:
+            keys = list(keys)
+            static = self._static.get(serial)
+            if static is not None and all(map(self.is_static, keys)) \
+                    and (tracked or await self._same_boot(serial, static)):
+                return {key: static[key] for key in keys if key in static}
+        properties = await self._load(serial)
+        if keys is None:
+            return properties
+        return {key: properties[key] for key in keys if key in properties}
+
+    async def _load(self, serial: str, force: bool = False) -> Dict[str, str]:
+        dynamic = self._dynamic.get(serial)
+        if not force and dynamic is not None and dynamic[0] > time.monotonic():
+            return {**self._static.get(serial, {}), **dynamic[1]}
+        properties = await self.fetch(serial)
+        static = {}
+        dynamic = {}
+        for key, value in properties.items():
+            (static if self.is_static(key) else dynamic)[key] = value
+        old = self._static.get(serial)
+        if old is not None and old.get(self.BOOT_KEY) != static.get(self.BOOT_KEY):
+            logger.debug(f"Device '{serial}' rebooted, replacing its read-only properties")
+        if dynamic.get('sys.boot_completed') == '1':
+            self._static[serial] = static
+        else:
+            # Some ro.* properties are only set late during boot, so keep
+            # them with the dynamic ones until it has completed
+            self._static.pop(serial, None)
+            dynamic = dict(properties)
+        self._dynamic[serial] = (time.monotonic() + self.ttl, dynamic)
+        return dict(properties)
+
+    async def _same_boot(self, serial: str, static: Dict[str, str]) -> bool:
+        """Whether the read-only properties of a device are still from its current boot."""
+        now = time.monotonic()
+        dynamic = self._dynamic.get(serial)
+        if (dynamic is not None and dynamic[0] > now) or self._verified.get(serial, 0.0) > now:
+            return True
+        if self.boot_id is None:
+            return False
+        boot = await self.boot_id(serial)
+        if boot != static.get(self.BOOT_KEY):
+            logger.debug(f"Device '{serial}' rebooted, invalidating its properties")
+            self._static.pop(serial, None)
+            self._dynamic.pop(serial, None)
+            self._verified.pop(serial, None)
+            return False
+        self._verified[serial] = now + self.verify_interval
+        return True
+
+    def _check_device(self, serial: str) -> bool:
+        """Invalidate a reconnected device. Returns whether it is known to be on the same connection."""
+        if self.device_key is None:
+            return False
+        key = self.device_key(serial)
+        if key is None:
+            return False
+        if serial in self._keys and self._keys[serial] != key:
+            logger.debug(f"Device '{serial}' reconnected, invalidating its properties")
+            self.invalidate(serial)
+            self._keys[serial] = key
+            return False
+        same = serial in self._keys
+        self._keys[serial] = key
+        return same
+
+    def invalidate(self, serial: Optional[str] = None):
+        """Forget the properties of one device, or of all devices."""
+        if serial is None:
+            self._static.clear()
+            self._dynamic.clear()
+            self._keys.clear()
+            self._verified.clear()
+        else:
+            self._static.pop(serial, None)
+            self._dynamic.pop(serial, None)
+            self._keys.pop(serial, None)
+            self._verified.pop(serial, None)
+
+    async def watch(self, serial: str, keys: Iterable[str], interval: float = 1.0) -> AsyncIterator[Dict[str, Tuple[Optional[str], Optional[str]]]]:
+        """
+        Stream changes of some properties.
+
+        The first diff holds the current value of every key, later ones only
+        the keys that changed.
+
+        Args:
+            serial (str): The serial number of the device.
+            keys (Iterable[str]): The properties to watch.
+            interval (float): Seconds between refreshes.
+
+        Yields:
+            Dict[str, Tuple[Optional[str], Optional[str]]]: (old, new) values
+            keyed by property, None meaning unset.
+        """
+        keys = list(keys)
+        values: Dict[str, Any] = dict.fromkeys(keys)
+        first = True
+        while True:
+            self._check_device(serial)
+            properties = await self._load(serial, force=True)
+            diff = {}
+            for key in keys:
+                value = properties.get(key)
+                if first or value != values[key]:
+                    diff[key] = (values[key], value)
+                    values[key] = value
+            if diff:
+                yield diff
+            first = False
+            await asyncio.sleep(interval)
@@ -1,10 +1,14 @@
+from typing import Union
+
+
 class Protocol:
     """
     Protocol class containing ADB protocol constants and utility methods.
     """
 
-    OKAY = b'OKAY'
-    FAIL = b'FAIL'
+    # Replies are read with Parser.read_ascii, so these compare as str
+    OKAY = 'OKAY'
+    FAIL = 'FAIL'
     STAT = b'STAT'
     LIST = b'LIST'
     DENT = b'DENT'
@@ -41,16 +45,18 @@ class Protocol:
         return f'{length:04X}'
 
     @classmethod
-    def encode_data(cls, data: bytes) -> bytes:
+    def encode_data(cls, data: Union[bytes, str]) -> bytes:
         """
         Encode data with its length prefix.
 
         Args:
-            data (bytes): Data to encode.
+            data (Union[bytes, str]): Data to encode.
 
         Returns:
             bytes: Encoded data with length prefix.
         """
+        if isinstance(data, str):
+            data = data.encode()
         return cls.encode_length(len(data)).encode() + data
 
 
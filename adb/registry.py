@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from .parser import FailError
+from .tracker import DeviceEvent, Tracker
+
+
+class DeviceRegistry(Tracker):
+    """
+    In-memory view of the devices known to the ADB server.
+
+    The registry follows `host:track-devices-l` and answers device list and
+    state queries without opening a connection. It does not queue
+    DeviceEvents; use `Client.track_devices()` to receive those. While the
+    tracking connection is down the registry is not `live`, and callers
+    should fall back to asking the server.
+    """
+
+    def __init__(self, connect, reconnect: bool = True, **kwargs):
+        super().__init__(connect=connect, reconnect=reconnect, **kwargs)
+        self.synced = False
+        self._changed = asyncio.Event()
+
+    @property
+    def live(self) -> bool:
+        """Whether the registry reflects the current state of the server."""
+        return self.synced and self.command is not None
+
+    def update(self, new_list: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        change_set = super().update(new_list)
+        self.synced = True
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return change_set
+
+    def _emit(self, event: DeviceEvent):
+        pass
+
+    async def _close(self):
+        self.synced = False
+        await super()._close()
+
+    def list_devices(self) -> List[Dict[str, str]]:
+        """Get the devices in the same form as `Client.list_devices`."""
+        return [{'id': device['id'], 'type': device['type']} for device in self.device_list]
+
+    def list_devices_with_paths(self) -> List[Dict[str, str]]:
+        """Get the devices with all attributes reported by `host:devices-l`."""
+        return [dict(device) for device in self.device_list]
+
+    def get_state(self, serial: str) -> str:
+        """
+        Get the state of a device.
+
+        Raises:
+            FailError: If the device is not known, like `host-serial:<serial>:get-state`.
+        """
+        device = self.device_map.get(serial)
+        if device is None:
+            raise FailError(f"device '{serial}' not found")
+        return device['type']
+
+    def is_online(self, serial: str) -> bool:
+        """Whether the device is connected and in the `device` state."""
+        device = self.device_map.get(serial)
+        return device is not None and device['type'] == 'device'
+
+    async def wait_synced(self, timeout: Optional[float] = None):
+        """Wait until the registry has received a device list."""
+        await asyncio.wait_for(self._wait(lambda: self.synced), timeout)
+
+    async def wait_for(self, serial: str, state: Optional[str] = 'device', timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait until a device is in a given state.
+
+        Args:
+            serial (str): The serial number of the device.
+            state (Optional[str]): The state to wait for, or None to wait
+                until the device is gone.
+            timeout (Optional[float]): Maximum time to wait in seconds.
+
+        Returns:
+            Optional[Dict[str, Any]]: The device, or None when waiting for removal.
+
+        Raises:
+            asyncio.TimeoutError: If the timeout expires first.
+        """
+        def reached():
+            device = self.device_map.get(serial)
+            if state is None:
+                return device is None
+            return device is not None and device['type'] == state
+
+        await asyncio.wait_for(self._wait(reached), timeout)
+        return self.device_map.get(serial)
+
+    async def _wait(self, predicate):
+        await self.start()
+        while not predicate():
+            if self.is_set():
+                raise self.error or ConnectionError('Device tracking ended')
+            changed = asyncio.create_task(self._changed.wait())
+            ended = asyncio.create_task(self.wait())
+            try:
+                await asyncio.wait((changed, ended), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                changed.cancel()
+                ended.cancel()
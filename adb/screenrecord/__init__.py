@@ -0,0 +1,10 @@
+from .h264 import AccessUnit, NalSplitter, NalUnit, ScreenrecordReader
+from .segmentwriter import SegmentWriter
+
+__all__ = [
+    'AccessUnit',
+    'NalSplitter',
+    'NalUnit',
+    'ScreenrecordReader',
+    'SegmentWriter'
+]
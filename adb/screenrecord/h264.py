@@ -0,0 +1,220 @@
+import asyncio
+from typing import Any, AsyncIterator, List, Optional
+
+START_CODE = b'\x00\x00\x01'
+
+NAL_SLICE = 1
+NAL_IDR = 5
+NAL_SEI = 6
+NAL_SPS = 7
+NAL_PPS = 8
+NAL_AUD = 9
+
+
+class NalUnit:
+    """
+    A single H.264 NAL unit, without its start code.
+    """
+
+    __slots__ = ('data', 'time')
+
+    def __init__(self, data: bytes, time: float):
+        """
+        Initialize a NalUnit.
+
+        Args:
+            data (bytes): The NAL unit, starting with its header byte.
+            time (float): Event loop time at which the unit was received.
+        """
+        self.data = data
+        self.time = time
+
+    @property
+    def type(self) -> int:
+        return self.data[0] & 0x1f if self.data else 0
+
+    @property
+    def is_vcl(self) -> bool:
+        return 1 <= self.type <= 5
+
+    @property
+    def first_slice(self) -> bool:
+        """Whether this slice starts a picture (first_mb_in_slice == 0)."""
+        return self.is_vcl and len(self.data) > 1 and bool(self.data[1] & 0x80)
+
+    def __repr__(self) -> str:
+        return f"NalUnit(type={self.type}, size={len(self.data)})"
+
+
+class AccessUnit:
+    """
+    The NAL units making up one coded picture.
+    """
+
+    __slots__ = ('units', 'time')
+
+    def __init__(self, units: List[NalUnit]):
+        self.units = units
+        self.time = units[0].time
+
+    @property
+    def keyframe(self) -> bool:
+        """Whether the picture is an IDR picture."""
+        return any(unit.type == NAL_IDR for unit in self.units)
+
+    @property
+    def config(self) -> List[NalUnit]:
+        """The SPS and PPS units carried by this access unit."""
+        return [unit for unit in self.units if unit.type in (NAL_SPS, NAL_PPS)]
+
+    def to_annexb(self) -> bytes:
+        """Serialize the access unit as an Annex B byte stream."""
+        return b''.join(b'\x00\x00\x00\x01' + unit.data for unit in self.units)
+
+    def __repr__(self) -> str:
+        return f"AccessUnit(time={self.time}, keyframe={self.keyframe}, units={[u.type for u in self.units]})"
+
+
+class NalSplitter:
+    """
+    Splits an Annex B byte stream into NAL units by scanning for start codes.
+
+    The scan uses `bytearray.find`, so every byte is inspected once in C,
+    and consumed data is dropped from the buffer as units complete.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._start: Optional[int] = None
+        self._scan = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Feed a chunk of the stream.
+
+        Args:
+            chunk (bytes): Raw stream data.
+
+        Returns:
+            List[bytes]: The NAL units completed by the chunk.
+        """
+        buffer = self._buffer
+        buffer.extend(chunk)
+        units = []
+        position = self._scan
+        while True:
+            found = buffer.find(START_CODE, position)
+            if found == -1:
+                break
+            if self._start is not None:
+                units.append(self._unit(self._start, found))
+            self._start = position = found + 3
+        consumed = self._start if self._start is not None else max(len(buffer) - 2, 0)
+        if consumed:
+            del buffer[:consumed]
+            if self._start is not None:
+                self._start = 0
+        # A start code may straddle the next chunk boundary.
+        self._scan = max(len(buffer) - 2, self._start or 0)
+        return units
+
+    def flush(self) -> List[bytes]:
+        """Return the last, unterminated unit at the end of the stream."""
+        units = []
+        if self._start is not None and len(self._buffer) > self._start:
+            units.append(self._unit(self._start, len(self._buffer)))
+        self._buffer = bytearray()
+        self._start = None
+        self._scan = 0
+        return units
+
+    def _unit(self, start: int, end: int) -> bytes:
+        buffer = self._buffer
+        # Drop trailing zero bytes: the first byte of a 4-byte start code or
+        # trailing_zero_8bits.
+        while end > start and buffer[end - 1] == 0:
+            end -= 1
+        return bytes(buffer[start:end])
+
+
+class ScreenrecordReader:
+    """
+    Async iterator over the access units of an H.264 `screenrecord` stream.
+
+    Raw H.264 carries no timestamps, so every unit is stamped with the event
+    loop time at which its data arrived.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, stream: Any, connection: Any = None):
+        """
+        Initialize a ScreenrecordReader.
+
+        Args:
+            stream (Any): A stream with an async `read(n)` method.
+            connection (Any): The connection the stream belongs to, closed
+                by `end()` so the device-side screenrecord process exits.
+        """
+        self.stream = stream
+        self.connection = connection
+        self._closing = None
+        self.splitter = NalSplitter()
+        self.ended = False
+        self._current: List[NalUnit] = []
+        self._ready: List[AccessUnit] = []
+
+    def __aiter__(self) -> AsyncIterator[AccessUnit]:
+        return self
+
+    async def __anext__(self) -> AccessUnit:
+        loop = asyncio.get_event_loop()
+        while not self._ready:
+            if self.ended:
+                raise StopAsyncIteration
+            chunk = await self.stream.read(self.CHUNK_SIZE)
+            now = loop.time()
+            if chunk:
+                units = self.splitter.feed(chunk)
+            else:
+                self.ended = True
+                units = self.splitter.flush()
+            for data in units:
+                self._add(NalUnit(data, now))
+            if self.ended and self._current:
+                self._ready.append(AccessUnit(self._current))
+                self._current = []
+        return self._ready.pop(0)
+
+    async def nal_units(self) -> AsyncIterator[NalUnit]:
+        """Iterate over single NAL units instead of access units."""
+        async for access_unit in self:
+            for unit in access_unit.units:
+                yield unit
+
+    def end(self) -> None:
+        """Stop reading and close the connection, if the reader was given one."""
+        self.ended = True
+        self._ready = []
+        if self.connection is not None and self._closing is None:
+            self._closing = asyncio.ensure_future(self.connection.close())
+
+    async def close(self) -> None:
+        """Like `end()`, but waits until the connection is closed."""
+        self.end()
+        if self._closing is not None:
+            await self._closing
+
+    def _add(self, unit: NalUnit) -> None:
+        if self._current and self._starts_access_unit(unit):
+            self._ready.append(AccessUnit(self._current))
+            self._current = []
+        self._current.append(unit)
+
+    def _starts_access_unit(self, unit: NalUnit) -> bool:
+        # H.264 7.4.1.2.3: these units, or the first slice of a new picture,
+        # begin a new access unit once the current one holds a picture.
+        if not any(current.is_vcl for current in self._current):
+            return False
+        kind = unit.type
+        return kind in (NAL_SEI, NAL_SPS, NAL_PPS, NAL_AUD) or 14 <= kind <= 18 or unit.first_slice
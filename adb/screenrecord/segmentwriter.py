@@ -0,0 +1,75 @@
+import os
+from typing import Any, List
+
+from .h264 import AccessUnit, NalUnit
+
+
+class SegmentWriter:
+    """
+    Writes access units into Annex B `.h264` files, starting a new segment at
+    the first keyframe after `duration` seconds.
+
+    `screenrecord` sends SPS/PPS only once at the start, so the last seen
+    parameter sets are repeated at the head of every new segment to keep
+    each file decodable on its own.
+    """
+
+    def __init__(self, directory: str, duration: float = 60.0, prefix: str = 'screenrecord'):
+        """
+        Initialize a SegmentWriter.
+
+        Args:
+            directory (str): Directory for the segments, created if needed.
+            duration (float): Target segment length in seconds.
+            prefix (str): File name prefix.
+        """
+        self.directory = directory
+        self.duration = duration
+        self.prefix = prefix
+        self.segments: List[str] = []
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._started = 0.0
+        self._config: List[NalUnit] = []
+
+    def write(self, access_unit: AccessUnit) -> None:
+        """
+        Append an access unit.
+
+        Args:
+            access_unit (AccessUnit): The access unit to write.
+        """
+        config = access_unit.config
+        if config:
+            self._config = config
+        if self._file is None or (access_unit.keyframe and access_unit.time - self._started >= self.duration):
+            self._open(access_unit)
+        self._file.write(access_unit.to_annexb())
+
+    async def consume(self, reader: Any) -> None:
+        """
+        Write every access unit of a reader until it ends.
+
+        Args:
+            reader (Any): An async iterable of access units.
+        """
+        try:
+            async for access_unit in reader:
+                self.write(access_unit)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Close the current segment."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self, access_unit: AccessUnit) -> None:
+        self.close()
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.segments):05d}.h264")
+        self._file = open(path, 'wb')
+        self._started = access_unit.time
+        self.segments.append(path)
+        if self._config and not access_unit.config:
+            self._file.write(b''.join(b'\x00\x00\x00\x01' + unit.data for unit in self._config))
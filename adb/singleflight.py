@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    While a call for a key is in flight, further calls with the same key
+    await the same future instead of starting their own. With a TTL, the
+    result is also reused for that many seconds after it arrived. Results
+    are shared between all callers, so they must not be mutated.
+
+    Every key with calls in flight has a generation, bumped by `forget()`.
+    A call that finishes in a later generation than it started in is not
+    cached, and callers arriving after `forget()` start a new call.
+    """
+
+    def __init__(self, ttl: float = 0.0):
+        """
+        Initialize a SingleFlight.
+
+        Args:
+            ttl (float): Default number of seconds to reuse a result for.
+        """
+        self.ttl = ttl
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        # key -> [generation, calls in flight]
+        self._generations: Dict[Hashable, List[int]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """
+        Run `fn`, unless a call with the same key is in flight or cached.
+
+        Args:
+            key (Hashable): Identifies the call, e.g. (serial, command, args).
+            fn (Callable[[], Awaitable[Any]]): Starts the actual call.
+            ttl (Optional[float]): Overrides the default TTL for this result.
+
+        Returns:
+            Any: The shared result. Errors are shared as well, but never cached.
+        """
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                return cached[1]
+            del self._results[key]
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            generation = self._generations.setdefault(key, [0, 0])
+            generation[1] += 1
+            started = generation[0]
+            future.add_done_callback(lambda done: self._done(key, done, self.ttl if ttl is None else ttl, started))
+        # One caller being cancelled must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future, ttl: float, started: int):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        generation = self._generations[key]
+        current = generation[0] == started
+        generation[1] -= 1
+        if not generation[1]:
+            del self._generations[key]
+        if current and ttl > 0 and not future.cancelled() and future.exception() is None:
+            self._results[key] = (time.monotonic() + ttl, future.result())
+
+    def forget(self, *prefix: Any):
+        """
+        Drop cached results and detach calls in flight, whose results will
+        then be returned to their current callers but not cached.
+
+        Args:
+            *prefix: Only drop tuple keys starting with these values; drops
+                everything when empty.
+        """
+        size = len(prefix)
+
+        def matches(key):
+            return not prefix or isinstance(key, tuple) and key[:size] == prefix
+
+        for key in [key for key in self._results if matches(key)]:
+            del self._results[key]
+        for key in [key for key in self._generations if matches(key)]:
+            self._generations[key][0] += 1
+            self._calls.pop(key, None)
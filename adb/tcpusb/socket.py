@@ -170,6 +170,7 @@ class Socket:
 
     async def _device_id(self):
         logger.debug("Loading device properties to form a standard device ID")
-        properties = await self.client.get_properties(self.serial)
-        id_str = ''.join([f"{prop}={properties[prop]};" for prop in ['ro.product.name', 'ro.product.model', 'ro.product.device']])
+        keys = ['ro.product.name', 'ro.product.model', 'ro.product.device']
+        properties = await self.client.get_properties(self.serial, keys)
+        id_str = ''.join([f"{prop}={properties[prop]};" for prop in keys])
         return f"device::{id_str}\0".encode()
@@ -1,40 +1,135 @@
 import asyncio
-from typing import List, Dict, Any
-from .parser import Parser
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .parser import PrematureEOFError
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceEvent:
+    """
+    A change in the device list reported by a Tracker.
+
+    `kind` is one of ADD, REMOVE or CHANGE. `device` is the device as it is
+    now (or was, for REMOVE) and `old` the previous version for CHANGE.
+    """
+
+    ADD = 'add'
+    REMOVE = 'remove'
+    CHANGE = 'change'
+
+    __slots__ = ('kind', 'device', 'old')
+
+    def __init__(self, kind: str, device: Dict[str, Any], old: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.device = device
+        self.old = old
+
+    @property
+    def id(self) -> str:
+        return self.device['id']
+
+    @property
+    def type(self) -> str:
+        return self.device['type']
+
+    def __repr__(self) -> str:
+        return f"DeviceEvent({self.kind!r}, {self.device!r})"
+
 
 class Tracker(asyncio.Event):
-    def __init__(self, command):
+    """
+    Follows `host:track-devices` and turns device list updates into events.
+
+    Every update is diffed against the previous list and the resulting
+    DeviceEvents are put on a single queue, consumed with `async for`.
+    When `connect` is given, a dropped connection is re-established with
+    exponential backoff; the first list after reconnecting is diffed
+    against the last known one, so devices that came or went in between
+    are still reported. The event is set when tracking ends.
+
+    The queue holds at most `max_events` events, so a Tracker used only for
+    `device_list` never grows without bound; once full, the oldest events
+    are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, command=None, connect: Optional[Callable[[], Awaitable[Any]]] = None,
+                 reconnect: bool = True, backoff: float = 0.5, max_backoff: float = 10.0,
+                 max_events: int = 1024):
+        """
+        Initialize a Tracker.
+
+        Args:
+            command: A command already in tracking mode, or None to open one with `connect`.
+            connect (Optional[Callable[[], Awaitable[Any]]]): Opens a new command in
+                tracking mode.
+            reconnect (bool): Whether to use `connect` again after the connection drops.
+            backoff (float): Initial reconnect delay in seconds.
+            max_backoff (float): Maximum reconnect delay in seconds.
+            max_events (int): Maximum number of events waiting to be consumed.
+        """
         super().__init__()
         self.command = command
+        self.connect = connect
+        self.reconnect = reconnect
+        self.backoff = backoff
+        self.max_backoff = max_backoff
         self.device_list: List[Dict[str, Any]] = []
         self.device_map: Dict[str, Dict[str, Any]] = {}
+        self.reconnects = 0
+        self.dropped = 0
+        self.error: Optional[BaseException] = None
         self.reader_task = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_events)
+
+    def __await__(self):
+        return self._open().__await__()
+
+    async def _open(self) -> 'Tracker':
+        if self.command is None:
+            self.command = await self.connect()
+        await self.start()
+        return self
 
     async def start(self):
-        self.reader_task = asyncio.create_task(self.read())
+        if self.reader_task is None:
+            self.reader_task = asyncio.create_task(self.read())
+
+    async def read(self):
+        attempt = 0
         try:
-            await self.reader_task
+            while True:
+                try:
+                    if self.command is None:
+                        self.command = await self.connect()
+                        attempt = 0
+                    while True:
+                        self.update(await self.command._read_devices())
+                except (PrematureEOFError, asyncio.IncompleteReadError, OSError) as err:
+                    await self._close()
+                    if self.connect is None or not self.reconnect:
+                        raise ConnectionError('Connection closed') from err
+                    delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+                    attempt += 1
+                    self.reconnects += 1
+                    logger.debug(f"Device tracking interrupted ({err!r}), reconnecting in {delay:.1f}s")
+                    await asyncio.sleep(delay)
         except asyncio.CancelledError:
             pass
-        except Parser.PrematureEOFError:
-            raise ConnectionError('Connection closed')
         except Exception as err:
-            self.set()  # Set the event to notify listeners of an error
-            raise err
+            self.error = err
         finally:
-            await self.command.parser.end()
-            self.set()  # Set the event to notify listeners that tracking has ended
+            await self._close()
+            self._put(None)
+            self.set()
 
-    async def read(self):
-        while True:
-            try:
-                device_list = await self.command._read_devices()
-                self.update(device_list)
-                await asyncio.sleep(0)  # Yield control to allow other coroutines to run
-            except asyncio.CancelledError:
-                break
-
-    def update(self, new_list: List[Dict[str, Any]]):
+    async def _close(self):
+        if self.command is not None:
+            await self.command.connection.close()
+            self.command = None
+
+    def update(self, new_list: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         change_set = {
             'removed': [],
             'changed': [],
@@ -45,31 +140,49 @@ class Tracker(asyncio.Event):
         for device in new_list:
             old_device = self.device_map.get(device['id'])
             if old_device:
-                if old_device['type'] != device['type']:
+                if old_device != device:
                     change_set['changed'].append(device)
-                    asyncio.create_task(self.notify_listeners('change', device, old_device))
+                    self._emit(DeviceEvent(DeviceEvent.CHANGE, device, old_device))
             else:
                 change_set['added'].append(device)
-                asyncio.create_task(self.notify_listeners('add', device))
+                self._emit(DeviceEvent(DeviceEvent.ADD, device))
             new_map[device['id']] = device
 
         for device in self.device_list:
             if device['id'] not in new_map:
                 change_set['removed'].append(device)
-                asyncio.create_task(self.notify_listeners('remove', device))
+                self._emit(DeviceEvent(DeviceEvent.REMOVE, device))
 
-        asyncio.create_task(self.notify_listeners('change_set', change_set))
         self.device_list = new_list
         self.device_map = new_map
+        return change_set
+
+    def _emit(self, event: DeviceEvent):
+        self._put(event)
+
+    def _put(self, item: Optional[DeviceEvent]):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def __aiter__(self):
+        return self
 
-    async def notify_listeners(self, event_type: str, *args):
-        # This method would be used to notify listeners of events
-        # In a real implementation, you might use a callback mechanism or another event system
-        pass
+    async def __anext__(self) -> DeviceEvent:
+        await self.start()
+        event = await self._queue.get()
+        if event is None:
+            # Leave the sentinel for any other consumer
+            self._put(None)
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        return event
 
     def end(self):
         if self.reader_task:
             self.reader_task.cancel()
 
 # Ensure this is at the end of the file
-__all__ = ['Tracker']
+__all__ = ['DeviceEvent', 'Tracker']
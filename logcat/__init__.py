@@ -0,0 +1,29 @@
+from .archive import ArchiveReader, ArchiveSink, ArchiveWriter
+from .batch import BatchParser, BatchReader, EntryBatch
+from .entry import Entry
+from .merge import MergedReader
+from .parser import BinaryParser
+from .priority import Priority
+from .reader import Reader, read_stream
+from .resilient import Gap, ResilientReader
+from .watcher import Match, Rule, Watcher
+
+__all__ = [
+    'ArchiveReader',
+    'ArchiveSink',
+    'ArchiveWriter',
+    'BatchParser',
+    'BatchReader',
+    'BinaryParser',
+    'EntryBatch',
+    'Entry',
+    'Gap',
+    'Match',
+    'MergedReader',
+    'Priority',
+    'Reader',
+    'ResilientReader',
+    'Rule',
+    'Watcher',
+    'read_stream'
+]
@@ -0,0 +1,334 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+from .entry import Entry
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveWriter:
+    """
+    Writes entries into rotating segments of independently compressed blocks.
+
+    Every segment `<start_ns>.seg` has a sidecar `<start_ns>.idx` with one JSON
+    line per block, holding its offset, length, time range, pids and tags.
+    Readers use the index to decompress only the blocks they need. A block
+    that was not indexed yet, e.g. after a crash, is simply ignored.
+    """
+
+    RECORD = struct.Struct('<iiiiBHI')
+    MAX_TAG_LENGTH = 0xffff
+    SEGMENT_SUFFIX = '.seg'
+    INDEX_SUFFIX = '.idx'
+
+    def __init__(self, directory: str, block_size: int = 65536,
+                 segment_size: int = 64 * 1024 * 1024, segment_duration: float = 3600.0,
+                 level: int = 6):
+        """
+        Initialize an ArchiveWriter.
+
+        Args:
+            directory (str): Directory holding the segments, created if needed.
+            block_size (int): Uncompressed bytes per block.
+            segment_size (int): Compressed bytes after which a segment is rotated.
+            segment_duration (float): Seconds of entry time after which a
+                segment is rotated.
+            level (int): zlib compression level.
+        """
+        self.directory = directory
+        self.block_size = block_size
+        self.segment_size = segment_size
+        self.segment_duration_ns = int(segment_duration * 1e9)
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+        self._segment = None
+        self._index = None
+        self._segment_start_ns = 0
+        self._offset = 0
+        self._block = bytearray()
+        self._block_meta = self._empty_block_meta()
+        self.pending_since: Optional[float] = None
+
+    def write(self, entry: Entry) -> None:
+        """
+        Append an entry.
+
+        Args:
+            entry (Entry): The entry to archive.
+        """
+        time_ns = entry.time_ns
+        if self._segment is None:
+            self._open_segment(time_ns)
+        elif time_ns - self._segment_start_ns >= self.segment_duration_ns:
+            self._rotate(time_ns)
+        tag = entry.tag.encode('utf-8')
+        tag_name = entry.tag
+        if len(tag) > self.MAX_TAG_LENGTH:
+            # The record only has 16 bits for the tag length
+            tag = tag[:self.MAX_TAG_LENGTH]
+            tag_name = tag.decode('utf-8', 'replace')
+        message = entry.message.encode('utf-8')
+        self._block += self.RECORD.pack(entry.sec, entry.nsec, entry.pid, entry.tid,
+                                        entry.priority, len(tag), len(message))
+        self._block += tag
+        self._block += message
+        if self.pending_since is None:
+            self.pending_since = time.monotonic()
+        meta = self._block_meta
+        if not meta['count'] or time_ns < meta['start_ns']:
+            meta['start_ns'] = time_ns
+        if time_ns > meta['end_ns']:
+            meta['end_ns'] = time_ns
+        meta['count'] += 1
+        meta['pids'].add(entry.pid)
+        meta['tags'].add(tag_name)
+        if len(self._block) >= self.block_size:
+            self._flush_block()
+            if self._offset >= self.segment_size:
+                self._close_segment()
+
+    def flush(self) -> None:
+        """Compress and index the current partial block."""
+        self._flush_block()
+
+    def close(self) -> None:
+        """Flush pending entries and close the current segment."""
+        self._close_segment()
+
+    def _open_segment(self, time_ns: int) -> None:
+        name = os.path.join(self.directory, f"{time_ns:020d}")
+        self._segment = open(name + self.SEGMENT_SUFFIX, 'ab')
+        self._index = open(name + self.INDEX_SUFFIX, 'a')
+        self._segment_start_ns = time_ns
+        self._offset = self._segment.tell()
+
+    def _rotate(self, time_ns: int) -> None:
+        self._close_segment()
+        self._open_segment(time_ns)
+
+    def _close_segment(self) -> None:
+        if self._segment is None:
+            return
+        self._flush_block()
+        self._segment.close()
+        self._index.close()
+        self._segment = None
+        self._index = None
+
+    def _flush_block(self) -> None:
+        if not self._block or self._segment is None:
+            return
+        data = zlib.compress(bytes(self._block), self.level)
+        self._segment.write(data)
+        self._segment.flush()
+        meta = self._block_meta
+        self._index.write(json.dumps({
+            'offset': self._offset,
+            'length': len(data),
+            'count': meta['count'],
+            'start_ns': meta['start_ns'],
+            'end_ns': meta['end_ns'],
+            'pids': sorted(meta['pids']),
+            'tags': sorted(meta['tags']),
+        }) + '\n')
+        self._index.flush()
+        self._offset += len(data)
+        self._block = bytearray()
+        self._block_meta = self._empty_block_meta()
+        self.pending_since = None
+
+    @staticmethod
+    def _empty_block_meta() -> Dict[str, Any]:
+        return {'count': 0, 'start_ns': 0, 'end_ns': 0, 'pids': set(), 'tags': set()}
+
+
+class ArchiveSink:
+    """
+    Feeds entries to an ArchiveWriter running in a background thread, so
+    compression and disk writes never block the event loop.
+
+    Blocks are only cut when they are full or when their oldest entry has
+    waited `flush_interval` seconds, so a slow stream still compresses well.
+    """
+
+    def __init__(self, directory: str, batch_size: int = 512, max_pending: int = 64,
+                 flush_interval: float = 5.0, **options):
+        """
+        Initialize an ArchiveSink.
+
+        Args:
+            directory (str): Directory holding the segments.
+            batch_size (int): Entries handed to the writer thread at once.
+            max_pending (int): Batches that may wait for the writer thread
+                before `write()` starts waiting too.
+            flush_interval (float): Seconds after which a partial block is
+                written anyway.
+            **options: Passed to ArchiveWriter.
+        """
+        self.writer = ArchiveWriter(directory, **options)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._batch: List[Entry] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='logcat-archive', daemon=True)
+        self._thread.start()
+
+    async def write(self, entry: Entry) -> None:
+        """
+        Queue an entry for archiving.
+
+        Args:
+            entry (Entry): The entry to archive.
+        """
+        self._batch.append(entry)
+        if len(self._batch) >= self.batch_size:
+            await self._hand_off()
+
+    async def consume(self, reader: Any) -> None:
+        """
+        Archive every entry of a reader until it ends.
+
+        Args:
+            reader (Any): An async iterable of entries.
+        """
+        async for entry in reader:
+            if isinstance(entry, Entry):
+                await self.write(entry)
+        await self._hand_off()
+
+    async def close(self) -> None:
+        """Archive pending entries and stop the writer thread."""
+        await self._hand_off()
+        await self._put(None)
+        await asyncio.get_event_loop().run_in_executor(None, self._thread.join)
+
+    async def _hand_off(self) -> None:
+        if self._batch:
+            batch, self._batch = self._batch, []
+            await self._put(batch)
+
+    async def _put(self, item: Optional[List[Entry]]) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            await asyncio.get_event_loop().run_in_executor(None, self._queue.put, item)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                batch = []
+            if batch is None:
+                break
+            try:
+                for entry in batch:
+                    self.writer.write(entry)
+                pending_since = self.writer.pending_since
+                if pending_since is not None and time.monotonic() - pending_since >= self.flush_interval:
+                    self.writer.flush()
+            except Exception as err:
+                logger.error(f"Unable to archive logcat entries: {err}")
+        self.writer.close()
+
+
+class ArchiveReader:
+    """
+    Reads entries back from an archive directory, decompressing only the
+    blocks whose index says they can contain matching entries.
+    """
+
+    def __init__(self, directory: str, serial: Optional[str] = None):
+        """
+        Initialize an ArchiveReader.
+
+        Args:
+            directory (str): Directory holding the segments.
+            serial (Optional[str]): Serial to tag the entries with.
+        """
+        self.directory = directory
+        self.serial = serial
+
+    def segments(self) -> List[str]:
+        """List the segment base paths, oldest first."""
+        names = sorted(name[:-len(ArchiveWriter.SEGMENT_SUFFIX)] for name in os.listdir(self.directory)
+                       if name.endswith(ArchiveWriter.SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def read(self, since_ns: Optional[int] = None, until_ns: Optional[int] = None,
+             pid: Optional[int] = None, tag: Optional[str] = None) -> Iterator[Entry]:
+        """
+        Iterate over archived entries matching all of the given filters.
+
+        Args:
+            since_ns (Optional[int]): Only entries at or after this timestamp.
+            until_ns (Optional[int]): Only entries at or before this timestamp.
+            pid (Optional[int]): Only entries from this process.
+            tag (Optional[str]): Only entries with this tag.
+
+        Yields:
+            Entry: Matching entries in archive order.
+        """
+        # Entry time is not monotonic (clock changes, reordering by the
+        # device), so segments are never skipped by their names; the block
+        # index holds the actual time range of every block.
+        for base in self.segments():
+            blocks = [block for block in self._read_index(base)
+                      if (since_ns is None or block['end_ns'] >= since_ns)
+                      and (until_ns is None or block['start_ns'] <= until_ns)
+                      and (pid is None or pid in block['pids'])
+                      and (tag is None or tag in block['tags'])]
+            if not blocks:
+                continue
+            with open(base + ArchiveWriter.SEGMENT_SUFFIX, 'rb') as segment:
+                for block in blocks:
+                    segment.seek(block['offset'])
+                    data = zlib.decompress(segment.read(block['length']))
+                    for entry in self._decode(data):
+                        time_ns = entry.time_ns
+                        if since_ns is not None and time_ns < since_ns:
+                            continue
+                        if until_ns is not None and time_ns > until_ns:
+                            continue
+                        if pid is not None and entry.pid != pid:
+                            continue
+                        if tag is not None and entry.tag != tag:
+                            continue
+                        yield entry
+
+    def _read_index(self, base: str) -> List[Dict[str, Any]]:
+        blocks = []
+        try:
+            with open(base + ArchiveWriter.INDEX_SUFFIX) as index:
+                for line in index:
+                    try:
+                        block = json.loads(line)
+                    except ValueError:
+                        break
+                    block['pids'] = set(block['pids'])
+                    block['tags'] = set(block['tags'])
+                    blocks.append(block)
+        except FileNotFoundError:
+            pass
+        return blocks
+
+    def _decode(self, data: bytes) -> Iterator[Entry]:
+        record = ArchiveWriter.RECORD
+        cursor = 0
+        length = len(data)
+        while cursor < length:
+            sec, nsec, pid, tid, priority, tag_length, message_length = record.unpack_from(data, cursor)
+            cursor += record.size
+            tag = data[cursor:cursor + tag_length].decode('utf-8', 'replace')
+            cursor += tag_length
+            message = data[cursor:cursor + message_length].decode('utf-8', 'replace')
+            cursor += message_length
+            yield Entry(sec, nsec, pid, tid, priority, tag, message, self.serial)
@@ -0,0 +1,210 @@
+import struct
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .parser import BinaryParser
+from .priority import Priority
+from .reader import Reader
+
+
+class EntryBatch:
+    """
+    A batch of logcat entries stored as columns.
+
+    Timestamps, pids, tids and priorities are NumPy arrays. Tags are
+    dictionary-encoded into `tag_id`, indexing `tags`. Messages are not
+    copied: `message_start` and `message_end` point into `buffer`, the raw
+    data the batch was parsed from.
+    """
+
+    def __init__(self, time_ns: np.ndarray, pid: np.ndarray, tid: np.ndarray, priority: np.ndarray,
+                 tag_id: np.ndarray, tags: List[str], message_start: np.ndarray,
+                 message_end: np.ndarray, buffer: bytes, serial: Optional[str] = None):
+        self.time_ns = time_ns
+        self.pid = pid
+        self.tid = tid
+        self.priority = priority
+        self.tag_id = tag_id
+        self.tags = tags
+        self.message_start = message_start
+        self.message_end = message_end
+        self.buffer = buffer
+        self.serial = serial
+
+    def __len__(self) -> int:
+        return len(self.time_ns)
+
+    def message(self, i: int) -> str:
+        """Decode the message of the i-th entry."""
+        return self.buffer[self.message_start[i]:self.message_end[i]].decode('utf-8', 'replace')
+
+    def tag(self, i: int) -> str:
+        """Get the tag of the i-th entry."""
+        return self.tags[self.tag_id[i]]
+
+    def tag_counts(self) -> Dict[str, int]:
+        """
+        Count entries per tag.
+
+        Returns:
+            Dict[str, int]: Entry counts keyed by tag.
+        """
+        counts = np.bincount(self.tag_id, minlength=len(self.tags))
+        return {self.tags[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def tag_rates(self) -> Dict[str, float]:
+        """
+        Compute entries per second per tag over the time span of the batch.
+
+        Returns:
+            Dict[str, float]: Rates keyed by tag.
+        """
+        if not len(self):
+            return {}
+        span = max((int(self.time_ns.max()) - int(self.time_ns.min())) / 1e9, 1e-9)
+        return {tag: count / span for tag, count in self.tag_counts().items()}
+
+    def error_bursts(self, window: float = 1.0, threshold: int = 10,
+                     min_priority: int = Priority.ERROR) -> List[Tuple[int, int]]:
+        """
+        Find windows with many high-priority entries.
+
+        Args:
+            window (float): Window length in seconds.
+            threshold (int): Minimum number of entries in a window.
+            min_priority (int): Lowest priority counted.
+
+        Returns:
+            List[Tuple[int, int]]: (start_ns, count) for every entry that
+            starts a window reaching the threshold, with overlapping windows
+            collapsed into the first one.
+        """
+        times = np.sort(self.time_ns[self.priority >= min_priority])
+        if len(times) < threshold:
+            return []
+        counts = np.searchsorted(times, times + int(window * 1e9), side='left') - np.arange(len(times))
+        bursts = []
+        last_end = None
+        for i in np.flatnonzero(counts >= threshold):
+            start = int(times[i])
+            if last_end is not None and start < last_end:
+                continue
+            bursts.append((start, int(counts[i])))
+            last_end = start + int(window * 1e9)
+        return bursts
+
+
+class BatchParser:
+    """
+    Parses binary logcat data straight into EntryBatch columns.
+
+    Only the record boundaries are walked in Python; header fields, tag and
+    message bounds are then gathered with vectorized indexing.
+    """
+
+    LENGTHS = struct.Struct('<HH')
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.tags: List[str] = []
+        self._tag_ids: Dict[bytes, int] = {}
+
+    def parse(self, chunk: bytes) -> Optional[EntryBatch]:
+        """
+        Feed a chunk of data and return a batch of the completed entries.
+
+        Args:
+            chunk (bytes): Raw data read from the logcat stream.
+
+        Returns:
+            Optional[EntryBatch]: The completed entries, or None if there are none.
+        """
+        self._buffer.extend(chunk)
+        buffer = self._buffer
+        length = len(buffer)
+        header_min = BinaryParser.HEADER_V1_SIZE
+        starts = []
+        payloads = []
+        ends = []
+        cursor = 0
+        while length - cursor >= header_min:
+            payload_length, header_size = self.LENGTHS.unpack_from(buffer, cursor)
+            if header_size < header_min:
+                header_size = header_min
+            end = cursor + header_size + payload_length
+            if end > length:
+                break
+            starts.append(cursor)
+            payloads.append(cursor + header_size)
+            ends.append(end)
+            cursor = end
+        if not starts:
+            return None
+        data = bytes(buffer[:cursor])
+        del buffer[:cursor]
+        return self._columns(data, np.array(starts, dtype=np.int64),
+                             np.array(payloads, dtype=np.int64), np.array(ends, dtype=np.int64))
+
+    def _columns(self, data: bytes, starts: np.ndarray, payloads: np.ndarray, ends: np.ndarray) -> EntryBatch:
+        raw = np.frombuffer(data, dtype=np.uint8)
+        fields = raw[(starts[:, None] + np.arange(4, 20))].copy().view('<i4')
+        pid, tid, sec, nsec = fields[:, 0], fields[:, 1], fields[:, 2], fields[:, 3]
+        time_ns = sec.astype(np.int64) * 1000000000 + nsec
+        has_payload = ends > payloads
+        priority = np.where(has_payload, raw[np.minimum(payloads, len(raw) - 1)], Priority.UNKNOWN).astype(np.uint8)
+        zeros = np.flatnonzero(raw == 0)
+        index = np.searchsorted(zeros, payloads + 1)
+        found = index < len(zeros)
+        tag_end = np.where(found, zeros[np.minimum(index, max(len(zeros) - 1, 0))] if len(zeros) else ends, ends)
+        tag_end = np.where((tag_end < ends) & has_payload, tag_end, ends)
+        message_start = np.minimum(tag_end + 1, ends)
+        message_end = ends.copy()
+        # Same as BinaryParser: all trailing NULs, then all trailing CR and LF
+        for strip in ((0,), (0x0a, 0x0d)):
+            while True:
+                trailing = (message_end > message_start) & np.isin(raw[np.maximum(message_end - 1, 0)], strip)
+                if not trailing.any():
+                    break
+                message_end -= trailing
+        tag_id = np.empty(len(starts), dtype=np.int32)
+        tag_ids = self._tag_ids
+        for i, (a, b) in enumerate(zip((payloads + 1).tolist(), tag_end.tolist())):
+            key = data[a:b] if b > a else b''
+            index = tag_ids.get(key)
+            if index is None:
+                index = tag_ids[key] = len(self.tags)
+                self.tags.append(key.decode('utf-8', 'replace'))
+            tag_id[i] = index
+        return EntryBatch(time_ns, pid.copy(), tid.copy(), priority, tag_id, self.tags,
+                          message_start, message_end, data)
+
+
+class BatchReader(Reader):
+    """
+    Async iterator over EntryBatch objects instead of single entries. Each
+    batch holds the entries completed by one read from the stream.
+    """
+
+    def __init__(self, stream: Any, fix_line_feeds: bool = True, serial: Optional[str] = None,
+                 connection: Any = None):
+        super().__init__(stream, fix_line_feeds=fix_line_feeds, connection=connection)
+        self.parser = BatchParser()
+        self.serial = serial
+
+    def __aiter__(self) -> AsyncIterator[EntryBatch]:
+        return self
+
+    async def __anext__(self) -> EntryBatch:
+        while not self.ended:
+            chunk = await self.stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                self.ended = True
+                break
+            if self.fix_line_feeds:
+                chunk = self._fix_line_feeds(chunk)
+            batch = self.parser.parse(chunk)
+            if batch is not None:
+                batch.serial = self.serial
+                return batch
+        raise StopAsyncIteration
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Optional
+
+from .priority import Priority
+
+
+class Entry:
+    """
+    A single decoded logcat entry.
+    """
+
+    __slots__ = ('sec', 'nsec', 'pid', 'tid', 'priority', 'tag', 'message', 'serial')
+
+    def __init__(self, sec: int = 0, nsec: int = 0, pid: int = -1, tid: int = -1,
+                 priority: int = Priority.UNKNOWN, tag: str = '', message: str = '',
+                 serial: Optional[str] = None):
+        """
+        Initialize an Entry object.
+
+        Args:
+            sec (int): Seconds since the epoch, as recorded by the device.
+            nsec (int): Nanosecond part of the timestamp.
+            pid (int): Process ID of the writer.
+            tid (int): Thread ID of the writer.
+            priority (int): One of the Priority values.
+            tag (str): Log tag.
+            message (str): Log message.
+            serial (Optional[str]): Serial of the device the entry came from, if known.
+        """
+        self.sec = sec
+        self.nsec = nsec
+        self.pid = pid
+        self.tid = tid
+        self.priority = priority
+        self.tag = tag
+        self.message = message
+        self.serial = serial
+
+    @property
+    def time_ns(self) -> int:
+        """The entry timestamp in nanoseconds since the epoch."""
+        return self.sec * 1000000000 + self.nsec
+
+    @property
+    def date(self) -> datetime:
+        """The entry timestamp as a datetime."""
+        return datetime.fromtimestamp(self.sec + self.nsec / 1e9)
+
+    def __repr__(self) -> str:
+        return (f"Entry(serial={self.serial!r}, time={self.sec}.{self.nsec:09d}, pid={self.pid}, "
+                f"tid={self.tid}, priority={Priority.to_letter(self.priority)}, tag={self.tag!r}, "
+                f"message={self.message!r})")
@@ -0,0 +1,130 @@
+import asyncio
+import heapq
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .entry import Entry
+
+logger = logging.getLogger(__name__)
+
+
+class MergedReader:
+    """
+    Merges the entry streams of several devices into one stream ordered by
+    entry timestamp.
+
+    Entries are held in a heap until they are older than the newest timestamp
+    seen on any device minus the lateness window, so a device that falls
+    silent does not stall the others. The heap never holds more than
+    `max_buffer` entries and each device can only run `queue_size` entries
+    ahead of the consumer.
+    """
+
+    def __init__(self, readers: Dict[str, Any], lateness: float = 0.5,
+                 max_buffer: int = 10000, queue_size: int = 1024):
+        """
+        Initialize a MergedReader.
+
+        Args:
+            readers (Dict[str, Any]): Entry readers keyed by device serial.
+            lateness (float): How long, in seconds of entry time, to wait for
+                entries from slower devices before releasing newer ones.
+            max_buffer (int): Maximum number of entries held for reordering.
+            queue_size (int): Maximum number of unmerged entries in flight.
+        """
+        self.readers = readers
+        self.lateness = lateness
+        self.max_buffer = max_buffer
+        self.errors: Dict[str, Exception] = {}
+        self.late = 0
+        self._lateness_ns = int(lateness * 1e9)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._heap: List[Tuple[int, int, Entry]] = []
+        self._seq = 0
+        self._watermark = 0
+        self._flush_until = 0
+        self._last_released = 0
+        self._active = len(readers)
+        self._tasks: List[asyncio.Task] = []
+
+    def __aiter__(self) -> AsyncIterator[Entry]:
+        return self
+
+    async def __anext__(self) -> Entry:
+        if not self._tasks and self._active:
+            self._start()
+        while True:
+            entry = self._release()
+            if entry is not None:
+                return entry
+            if not self._active and self._queue.empty():
+                raise StopAsyncIteration
+            try:
+                item = await asyncio.wait_for(self._queue.get(), self.lateness or None)
+            except asyncio.TimeoutError:
+                # Nothing arrived within the window; whatever we hold now
+                # cannot be overtaken by an on-time entry anymore.
+                self._flush_until = self._watermark
+                continue
+            self._push(item)
+
+    async def read_entry(self) -> Optional[Entry]:
+        """
+        Read the next merged entry.
+
+        Returns:
+            Optional[Entry]: The next entry, or None once every stream has ended.
+        """
+        try:
+            return await self.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def end(self) -> None:
+        """Stop all device streams."""
+        for task in self._tasks:
+            task.cancel()
+        for reader in self.readers.values():
+            reader.end()
+        self._active = 0
+        self._heap = []
+
+    def _start(self) -> None:
+        for serial, reader in self.readers.items():
+            self._tasks.append(asyncio.ensure_future(self._pump(serial, reader)))
+
+    async def _pump(self, serial: str, reader: Any) -> None:
+        try:
+            async for entry in reader:
+                entry.serial = serial
+                await self._queue.put(entry)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            logger.debug(f"Logcat stream of '{serial}' failed: {err}")
+            self.errors[serial] = err
+        await self._queue.put(serial)
+
+    def _push(self, item: Any) -> None:
+        if isinstance(item, str):
+            self._active -= 1
+            return
+        time_ns = item.time_ns
+        if time_ns < self._last_released:
+            self.late += 1
+        if time_ns > self._watermark:
+            self._watermark = time_ns
+        heapq.heappush(self._heap, (time_ns, self._seq, item))
+        self._seq += 1
+
+    def _release(self) -> Optional[Entry]:
+        if not self._heap:
+            return None
+        time_ns = self._heap[0][0]
+        if (not self._active
+                or len(self._heap) > self.max_buffer
+                or time_ns <= self._flush_until
+                or time_ns <= self._watermark - self._lateness_ns):
+            self._last_released = max(self._last_released, time_ns)
+            return heapq.heappop(self._heap)[2]
+        return None
@@ -0,0 +1,62 @@
+import struct
+from typing import List
+
+from .entry import Entry
+
+
+class BinaryParser:
+    """
+    Incremental parser for the binary output of `logcat -B`.
+
+    Each record is a `logger_entry` header followed by a payload made of the
+    priority byte, a NUL-terminated tag and a NUL-terminated message. Version 1
+    headers are 20 bytes long; later versions store their size in the header.
+    """
+
+    HEADER = struct.Struct('<HHiiii')
+    HEADER_V1_SIZE = 20
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def parse(self, chunk: bytes) -> List[Entry]:
+        """
+        Feed a chunk of data and return every entry completed by it.
+
+        Args:
+            chunk (bytes): Raw data read from the logcat stream.
+
+        Returns:
+            List[Entry]: The entries that could be fully decoded.
+        """
+        buffer = self._buffer
+        buffer.extend(chunk)
+        entries = []
+        cursor = 0
+        length = len(buffer)
+        while length - cursor >= self.HEADER_V1_SIZE:
+            payload_length, header_size, pid, tid, sec, nsec = self.HEADER.unpack_from(buffer, cursor)
+            if header_size < self.HEADER_V1_SIZE:
+                header_size = self.HEADER_V1_SIZE
+            end = cursor + header_size + payload_length
+            if end > length:
+                break
+            entries.append(self._parse_payload(buffer, cursor + header_size, end, pid, tid, sec, nsec))
+            cursor = end
+        if cursor:
+            del buffer[:cursor]
+        return entries
+
+    def _parse_payload(self, buffer: bytearray, start: int, end: int,
+                       pid: int, tid: int, sec: int, nsec: int) -> Entry:
+        entry = Entry(sec, nsec, pid, tid)
+        if end <= start:
+            return entry
+        entry.priority = buffer[start]
+        tag_end = buffer.find(b'\0', start + 1, end)
+        if tag_end == -1:
+            tag_end = end
+        entry.tag = buffer[start + 1:tag_end].decode('utf-8', 'replace')
+        message = bytes(buffer[tag_end + 1:end]).rstrip(b'\0').rstrip(b'\r\n')
+        entry.message = message.decode('utf-8', 'replace')
+        return entry
@@ -0,0 +1,58 @@
+from typing import Optional
+
+
+class Priority:
+    """
+    Android log priorities, as written by liblog.
+    """
+
+    UNKNOWN = 0
+    DEFAULT = 1
+    VERBOSE = 2
+    DEBUG = 3
+    INFO = 4
+    WARN = 5
+    ERROR = 6
+    FATAL = 7
+    SILENT = 8
+
+    NAMES = {
+        'unknown': UNKNOWN,
+        'default': DEFAULT,
+        'verbose': VERBOSE,
+        'debug': DEBUG,
+        'info': INFO,
+        'warn': WARN,
+        'error': ERROR,
+        'fatal': FATAL,
+        'silent': SILENT,
+    }
+
+    LETTERS = {
+        '?': UNKNOWN,
+        'V': VERBOSE,
+        'D': DEBUG,
+        'I': INFO,
+        'W': WARN,
+        'E': ERROR,
+        'F': FATAL,
+        'S': SILENT,
+    }
+
+    @classmethod
+    def from_name(cls, name: str) -> Optional[int]:
+        """Get the priority for a name such as 'error'."""
+        return cls.NAMES.get(name.lower())
+
+    @classmethod
+    def from_letter(cls, letter: str) -> Optional[int]:
+        """Get the priority for a letter such as 'E'."""
+        return cls.LETTERS.get(letter.upper())
+
+    @classmethod
+    def to_letter(cls, value: int) -> str:
+        """Get the letter for a priority value."""
+        for letter, priority in cls.LETTERS.items():
+            if priority == value:
+                return letter
+        return '?'
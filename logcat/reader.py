@@ -0,0 +1,105 @@
+import asyncio
+from typing import Any, AsyncIterator, List, Optional
+
+from .entry import Entry
+from .parser import BinaryParser
+
+
+class Reader:
+    """
+    Async iterator over the entries of a binary logcat stream.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, stream: Any, fix_line_feeds: bool = True, connection: Any = None):
+        """
+        Initialize a Reader.
+
+        Args:
+            stream (Any): A stream with an async `read(n)` method, usually the
+                result of `LogcatCommand.execute()`.
+            fix_line_feeds (bool): Whether to turn CRLF back into LF before
+                parsing. Needed when the stream went through a PTY.
+            connection (Any): The connection the stream belongs to, closed
+                by `end()` so the device-side logcat process exits.
+        """
+        self.stream = stream
+        self.connection = connection
+        self._closing = None
+        self.fix_line_feeds = fix_line_feeds
+        self.parser = BinaryParser()
+        self.ended = False
+        self._pending: List[Entry] = []
+        self._saved_r = False
+
+    def __aiter__(self) -> AsyncIterator[Entry]:
+        return self
+
+    async def __anext__(self) -> Entry:
+        while not self._pending:
+            if self.ended:
+                raise StopAsyncIteration
+            chunk = await self.stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                self.ended = True
+                raise StopAsyncIteration
+            if self.fix_line_feeds:
+                chunk = self._fix_line_feeds(chunk)
+            self._pending = self.parser.parse(chunk)
+            self._pending.reverse()
+        return self._pending.pop()
+
+    async def read_entry(self) -> Optional[Entry]:
+        """
+        Read the next entry.
+
+        Returns:
+            Optional[Entry]: The next entry, or None once the stream has ended.
+        """
+        try:
+            return await self.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def end(self) -> None:
+        """Stop reading and close the connection, if the reader was given one."""
+        self.ended = True
+        self._pending = []
+        if self.connection is not None and self._closing is None:
+            self._closing = asyncio.ensure_future(self.connection.close())
+
+    async def close(self) -> None:
+        """Like `end()`, but waits until the connection is closed."""
+        self.end()
+        if self._closing is not None:
+            await self._closing
+
+    def _fix_line_feeds(self, chunk: bytes) -> bytes:
+        if self._saved_r:
+            chunk = b'\r' + chunk
+            self._saved_r = False
+        if chunk.endswith(b'\r'):
+            chunk = chunk[:-1]
+            self._saved_r = True
+        return chunk.replace(b'\r\n', b'\n')
+
+
+def read_stream(stream: Any, fix_line_feeds: bool = True, batch: bool = False, connection: Any = None) -> Reader:
+    """
+    Create a Reader for a logcat stream.
+
+    Args:
+        stream (Any): The logcat stream.
+        fix_line_feeds (bool): Whether to turn CRLF back into LF.
+        batch (bool): Whether to yield columnar EntryBatch objects instead
+            of single entries.
+        connection (Any): The connection to close when the reader is ended.
+
+    Returns:
+        Reader: The entry reader, or a BatchReader if `batch` is set.
+    """
+    if batch:
+        from .batch import BatchReader
+        return BatchReader(stream, fix_line_feeds=fix_line_feeds, connection=connection)
+    return Reader(stream, fix_line_feeds=fix_line_feeds, connection=connection)
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Set, Tuple, Union
+
+from .entry import Entry
+
+logger = logging.getLogger(__name__)
+
+
+class Gap:
+    """
+    Marker for entries that were lost because the device ring buffer wrapped
+    while the stream was disconnected.
+    """
+
+    __slots__ = ('serial', 'since_ns', 'until_ns')
+
+    def __init__(self, since_ns: int, until_ns: int, serial: Optional[str] = None):
+        """
+        Initialize a Gap.
+
+        Args:
+            since_ns (int): Timestamp of the last entry seen before the gap.
+            until_ns (int): Timestamp of the first entry seen after the gap.
+            serial (Optional[str]): Serial of the device, if known.
+        """
+        self.since_ns = since_ns
+        self.until_ns = until_ns
+        self.serial = serial
+
+    def __repr__(self) -> str:
+        return f"Gap(serial={self.serial!r}, since_ns={self.since_ns}, until_ns={self.until_ns})"
+
+
+class ResilientReader:
+    """
+    Entry stream that survives disconnects.
+
+    When the underlying stream ends or fails, it is reopened with backoff from
+    the timestamp of the last entry (`logcat -T`). Entries at that timestamp
+    that were already delivered are dropped. If the entry at the resume
+    timestamp is no longer on the device, the ring buffer wrapped while we
+    were away and a Gap is yielded before the next entry.
+    """
+
+    def __init__(self, open_stream: Callable[[Optional[Tuple[int, int]]], Awaitable[Any]],
+                 serial: Optional[str] = None, backoff: float = 0.5, max_backoff: float = 30.0,
+                 max_retries: Optional[int] = None):
+        """
+        Initialize a ResilientReader.
+
+        Args:
+            open_stream (Callable): Coroutine function returning a new entry
+                reader. It receives None for the first stream and then the
+                (sec, nsec) timestamp to resume from.
+            serial (Optional[str]): Serial to tag entries and gaps with.
+            backoff (float): Initial reconnect delay in seconds.
+            max_backoff (float): Maximum reconnect delay in seconds.
+            max_retries (Optional[int]): Consecutive failed reconnects after
+                which the error is raised. None retries forever.
+        """
+        self.open_stream = open_stream
+        self.serial = serial
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.reconnects = 0
+        self.ended = False
+        self._reader = None
+        self._stale = None
+        self._attempts = 0
+        self._last: Optional[Tuple[int, int]] = None
+        self._boundary: Set[Tuple[Any, ...]] = set()
+        self._resuming = False
+        self._boundary_seen = False
+        self._pending: Optional[Entry] = None
+
+    def __aiter__(self) -> AsyncIterator[Union[Entry, Gap]]:
+        return self
+
+    async def __anext__(self) -> Union[Entry, Gap]:
+        if self._pending is not None:
+            entry, self._pending = self._pending, None
+            return entry
+        while not self.ended:
+            if self._reader is None:
+                await self._connect()
+                continue
+            try:
+                entry = await self._reader.read_entry()
+            except Exception as err:
+                logger.debug(f"Logcat stream failed: {err}")
+                entry = None
+            if entry is None:
+                self._disconnect()
+                continue
+            self._attempts = 0
+            entry.serial = self.serial
+            if self._resuming:
+                gap = self._resume(entry)
+                if gap is False:
+                    continue
+                if gap is not None:
+                    self._remember(entry)
+                    self._pending = entry
+                    return gap
+            self._remember(entry)
+            return entry
+        raise StopAsyncIteration
+
+    async def read_entry(self) -> Optional[Union[Entry, Gap]]:
+        """
+        Read the next entry or gap marker.
+
+        Returns:
+            Optional[Union[Entry, Gap]]: The next item, or None once ended.
+        """
+        try:
+            return await self.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def end(self) -> None:
+        """Stop reading and close the current stream."""
+        self.ended = True
+        self._disconnect()
+
+    async def _connect(self) -> None:
+        if self._stale is not None:
+            # Make sure the old device-side logcat is gone before starting another
+            close = getattr(self._stale, 'close', None)
+            self._stale = None
+            if close is not None:
+                try:
+                    await close()
+                except Exception as err:
+                    logger.debug(f"Unable to close logcat stream: {err}")
+        if self._attempts:
+            delay = min(self.backoff * 2 ** (self._attempts - 1), self.max_backoff)
+            logger.debug(f"Reconnecting logcat in {delay}s")
+            await asyncio.sleep(delay)
+        self._attempts += 1
+        try:
+            self._reader = await self.open_stream(self._last)
+        except Exception as err:
+            if self.max_retries is not None and self._attempts > self.max_retries:
+                self.ended = True
+                raise
+            logger.debug(f"Unable to reopen logcat: {err}")
+            return
+        if self._last is not None:
+            self.reconnects += 1
+            self._resuming = True
+            self._boundary_seen = False
+
+    def _disconnect(self) -> None:
+        if self._reader is not None:
+            self._reader.end()
+            self._stale = self._reader
+            self._reader = None
+            if not self._attempts:
+                self._attempts = 1
+
+    def _resume(self, entry: Entry) -> Optional[Union[Gap, bool]]:
+        """Returns False to drop the entry, a Gap to emit first, or None."""
+        last_ns = self._last[0] * 1000000000 + self._last[1]
+        time_ns = entry.time_ns
+        if time_ns < last_ns:
+            return False
+        if time_ns == last_ns:
+            self._boundary_seen = True
+            return False if self._key(entry) in self._boundary else None
+        self._resuming = False
+        if not self._boundary_seen:
+            return Gap(last_ns, time_ns, self.serial)
+        return None
+
+    def _remember(self, entry: Entry) -> None:
+        last = (entry.sec, entry.nsec)
+        if last != self._last:
+            self._last = last
+            self._boundary = set()
+        self._boundary.add(self._key(entry))
+
+    @staticmethod
+    def _key(entry: Entry) -> Tuple[Any, ...]:
+        return (entry.pid, entry.tid, entry.priority, entry.tag, entry.message)
@@ -0,0 +1,320 @@
+import re
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Pattern
+
+try:
+    import re._parser as sre_parse
+    from re._constants import GROUPREF, GROUPREF_EXISTS, LITERAL
+except ImportError:
+    import sre_parse
+    from sre_constants import GROUPREF, GROUPREF_EXISTS, LITERAL
+
+from .entry import Entry
+from .priority import Priority
+
+
+class Rule:
+    """
+    A signature to watch for in log messages.
+    """
+
+    # Shorter literals are too common to make a useful gate
+    MIN_LITERAL = 3
+
+    def __init__(self, name: str, pattern: str, literal: bool = False, flags: int = 0,
+                 tag: Optional[str] = None, min_priority: int = Priority.UNKNOWN):
+        """
+        Initialize a Rule.
+
+        Args:
+            name (str): Name reported in matches and counters.
+            pattern (str): A regular expression, or a plain string if `literal` is set.
+            literal (bool): Whether `pattern` is a plain substring.
+            flags (int): Regular expression flags.
+            tag (Optional[str]): Only match entries with this tag.
+            min_priority (int): Only match entries with at least this priority.
+        """
+        self.name = name
+        self.pattern = pattern
+        self.literal = literal
+        self.flags = flags
+        self.tag = tag
+        self.min_priority = min_priority
+        self.regex: Optional[Pattern] = None if literal else re.compile(pattern, flags)
+        self.required = pattern if literal else self._required_literal()
+
+    def search(self, message: str) -> bool:
+        if self.literal:
+            return self.pattern in message
+        return self.regex.search(message) is not None
+
+    def _required_literal(self) -> Optional[str]:
+        """Find the longest literal every match of the pattern must contain."""
+        if self.flags & re.IGNORECASE:
+            return None
+        try:
+            parsed = sre_parse.parse(self.pattern, self.flags)
+        except re.error:
+            return None
+        if parsed.state.flags & re.IGNORECASE:
+            return None
+        best = ''
+        run = []
+        for op, arg in list(parsed) + [(None, None)]:
+            if op is LITERAL:
+                run.append(chr(arg))
+                continue
+            if len(run) > len(best):
+                best = ''.join(run)
+            run = []
+        return best if len(best) >= self.MIN_LITERAL else None
+
+
+class Match:
+    """
+    A rule match, with the entries logged around it.
+    """
+
+    __slots__ = ('rule', 'serial', 'entry', 'before', 'after')
+
+    def __init__(self, rule: Rule, serial: Optional[str], entry: Entry, before: List[Entry]):
+        self.rule = rule
+        self.serial = serial
+        self.entry = entry
+        self.before = before
+        self.after: List[Entry] = []
+
+    def __repr__(self) -> str:
+        return f"Match(rule={self.rule.name!r}, serial={self.serial!r}, entry={self.entry!r})"
+
+
+class Watcher:
+    """
+    Matches many signatures against logcat entries in few passes.
+
+    Rules with a required literal are gated by one alternation of all the
+    literals, so the common line that matches nothing costs a single regex
+    scan. Rules without one are gated by a single combined regex, each
+    alternative carrying its rule's flags in a scoped group. Rules that
+    cannot be joined that way (flags that cannot be scoped, inline global
+    flags, group references or names) are always checked on their own.
+    Only the rules behind a gate that fired are then checked one by one.
+    """
+
+    # Flags that can be applied to a single alternative as (?imsx:...)
+    SCOPED_FLAGS = {re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's', re.VERBOSE: 'x'}
+
+    def __init__(self, rules: List[Rule], context: int = 0):
+        """
+        Initialize a Watcher.
+
+        Args:
+            rules (List[Rule]): The rules to watch for.
+            context (int): Number of entries to include before and after each match.
+        """
+        self.rules = rules
+        self.context = context
+        self.hits: Dict[str, int] = {rule.name: 0 for rule in rules}
+        self._literal_rules = [rule for rule in rules if rule.required]
+        self._regex_rules = []
+        self._unjoined_rules = []
+        alternatives = []
+        for rule in rules:
+            if rule.required:
+                continue
+            alternative = self._gate_alternative(rule)
+            if alternative is None:
+                self._unjoined_rules.append(rule)
+            else:
+                self._regex_rules.append(rule)
+                alternatives.append(alternative)
+        self._literal_gate = self._compile_gate(
+            [re.escape(literal) for literal in sorted({rule.required for rule in self._literal_rules},
+                                                      key=len, reverse=True)])
+        try:
+            self._regex_gate = self._compile_gate(alternatives)
+        except re.error:
+            self._unjoined_rules.extend(self._regex_rules)
+            self._regex_rules = []
+            self._regex_gate = None
+        self._before: Dict[Optional[str], Deque[Entry]] = {}
+        self._pending: Dict[Optional[str], List[Match]] = {}
+        self._stats: Dict[Optional[str], Dict[str, Any]] = {}
+
+    def feed(self, entry: Entry, serial: Optional[str] = None) -> List[Match]:
+        """
+        Check one entry against all rules.
+
+        Args:
+            entry (Entry): The entry.
+            serial (Optional[str]): Device serial; defaults to `entry.serial`.
+
+        Returns:
+            List[Match]: Matches whose after-context is now complete.
+        """
+        if serial is None:
+            serial = entry.serial
+        started = time.perf_counter()
+        stats = self._stats.get(serial)
+        if stats is None:
+            stats = self._stats[serial] = {'lines': 0, 'matches': 0, 'bytes': 0, 'busy': 0.0,
+                                           'since': time.monotonic()}
+        message = entry.message
+        stats['lines'] += 1
+        stats['bytes'] += len(message)
+
+        done = []
+        pending = self._pending.get(serial)
+        if pending:
+            for match in pending:
+                match.after.append(entry)
+            while pending and len(pending[0].after) >= self.context:
+                done.append(pending.pop(0))
+
+        matched = self._match(entry, message)
+        if matched:
+            before = list(self._before.get(serial, ()))
+            for rule in matched:
+                self.hits[rule.name] += 1
+                match = Match(rule, serial, entry, before)
+                if self.context:
+                    self._pending.setdefault(serial, []).append(match)
+                else:
+                    done.append(match)
+            stats['matches'] += len(matched)
+
+        if self.context:
+            before = self._before.get(serial)
+            if before is None:
+                before = self._before[serial] = deque(maxlen=self.context)
+            before.append(entry)
+        stats['busy'] += time.perf_counter() - started
+        return done
+
+    def flush(self, serial: Optional[str] = None) -> List[Match]:
+        """
+        Release matches still waiting for after-context.
+
+        Args:
+            serial (Optional[str]): Device serial.
+
+        Returns:
+            List[Match]: The released matches.
+        """
+        self._before.pop(serial, None)
+        return self._pending.pop(serial, [])
+
+    async def watch(self, reader: Any, serial: Optional[str] = None) -> AsyncIterator[Match]:
+        """
+        Watch an entry reader until it ends.
+
+        Args:
+            reader (Any): An async iterable of entries, e.g. from `open_logcat()`
+                or `open_logcat_many()`.
+            serial (Optional[str]): Device serial, if the entries are not tagged.
+
+        Yields:
+            Match: Matches as their context completes.
+        """
+        serials = set()
+        async for entry in reader:
+            if not isinstance(entry, Entry):
+                continue
+            key = serial if serial is not None else entry.serial
+            serials.add(key)
+            for match in self.feed(entry, key):
+                yield match
+        for key in serials:
+            for match in self.flush(key):
+                yield match
+
+    def stats(self, serial: Optional[str] = None) -> Dict[str, float]:
+        """
+        Get throughput counters for a device.
+
+        Args:
+            serial (Optional[str]): Device serial.
+
+        Returns:
+            Dict[str, float]: Lines, matches and bytes seen, with rates per
+            second of wall time and lines per second of matching time.
+        """
+        stats = self._stats.get(serial)
+        if stats is None:
+            return {}
+        elapsed = max(time.monotonic() - stats['since'], 1e-9)
+        return {
+            'lines': stats['lines'],
+            'matches': stats['matches'],
+            'bytes': stats['bytes'],
+            'lines_per_sec': stats['lines'] / elapsed,
+            'matches_per_sec': stats['matches'] / elapsed,
+            'match_lines_per_sec': stats['lines'] / stats['busy'] if stats['busy'] else 0.0,
+        }
+
+    def _match(self, entry: Entry, message: str) -> List[Rule]:
+        candidates = []
+        if self._literal_gate is not None and self._literal_gate.search(message):
+            candidates.extend(rule for rule in self._literal_rules if rule.required in message)
+        if self._regex_gate is not None and self._regex_gate.search(message):
+            candidates.extend(self._regex_rules)
+        candidates.extend(self._unjoined_rules)
+        matched = []
+        for rule in candidates:
+            if rule.tag is not None and rule.tag != entry.tag:
+                continue
+            if entry.priority < rule.min_priority:
+                continue
+            if rule.literal or rule.search(message):
+                matched.append(rule)
+        return matched
+
+    @classmethod
+    def _gate_alternative(cls, rule: Rule) -> Optional[str]:
+        """Wrap a rule's pattern so it keeps its meaning inside a joined gate."""
+        scoped = ''
+        flags = rule.flags & ~re.UNICODE
+        for flag, letter in cls.SCOPED_FLAGS.items():
+            if flags & flag:
+                scoped += letter
+                flags &= ~flag
+        if flags:
+            return None
+        if rule.regex.groupindex or (rule.regex.flags & ~re.UNICODE) != (rule.flags & ~re.UNICODE):
+            # Named groups clash between alternatives, and inline global
+            # flags like (?i) would apply to the whole gate
+            return None
+        try:
+            parsed = sre_parse.parse(rule.pattern, rule.flags)
+        except re.error:
+            return None
+        if _has_group_reference(parsed):
+            return None
+        # A trailing comment in a verbose pattern would swallow the parenthesis
+        closing = '\n)' if rule.flags & re.VERBOSE else ')'
+        return f"(?{scoped}:{rule.pattern}{closing}"
+
+    @staticmethod
+    def _compile_gate(alternatives: List[str]) -> Optional[Pattern]:
+        if not alternatives:
+            return None
+        return re.compile('|'.join(alternatives))
+
+
+def _has_group_reference(parsed: Any) -> bool:
+    """Whether a parsed pattern refers to a group by number."""
+    for op, arg in parsed:
+        if op is GROUPREF or op is GROUPREF_EXISTS:
+            return True
+        if _has_group_reference_in(arg):
+            return True
+    return False
+
+
+def _has_group_reference_in(arg: Any) -> bool:
+    if isinstance(arg, sre_parse.SubPattern):
+        return _has_group_reference(arg)
+    if isinstance(arg, (tuple, list)):
+        return any(_has_group_reference_in(item) for item in arg)
+    return False
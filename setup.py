@@ -28,6 +28,7 @@ setup(
     python_requires=">=3.7",
     install_requires=[
         "asyncio",
+        "numpy",
     ],
     extras_require={
         "dev": [
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import os
+import struct
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from adb.apk import read_manifest, _parse_manifest
+from adb.client import Client
+from adb.parser import Parser
+
+NO_STRING = 0xffffffff
+
+
+def string_pool(strings, utf8=False):
+    data = bytearray()
+    offsets = []
+    for value in strings:
+        offsets.append(len(data))
+        if utf8:
+            encoded = value.encode('utf-8')
+            for length in (len(value), len(encoded)):
+                data += bytes([0x80 | length >> 8, length & 0xff]) if length > 0x7f else bytes([length])
+            data += encoded + b'\x00'
+        else:
+            data += struct.pack('<H', len(value)) + value.encode('utf-16-le') + b'\x00\x00'
+    data += bytes(-len(data) % 4)
+    strings_start = 28 + 4 * len(strings)
+    header = struct.pack('<HHIIIIII', 0x0001, 28, strings_start + len(data), len(strings), 0,
+                         0x100 if utf8 else 0, strings_start, 0)
+    return header + struct.pack(f'<{len(strings)}I', *offsets) + data
+
+
+def start_element(name, attributes):
+    body = struct.pack('<IIHHHHHH', NO_STRING, name, 20, 20, len(attributes), 0, 0, 0)
+    for attribute_name, raw, value_type, value in attributes:
+        body += struct.pack('<IIIHBBI', NO_STRING, attribute_name, raw, 8, 0, value_type, value)
+    return struct.pack('<HHIII', 0x0102, 16, 16 + len(body), 1, NO_STRING) + body
+
+
+def manifest(package='com.example.app', version_code=42, version_name='1.2', utf8=False, hex_code=False):
+    """Binary AndroidManifest.xml with a <manifest> start tag, as aapt writes it."""
+    strings = ['versionCode', 'versionName', 'package', 'manifest', package, version_name]
+    attributes = [
+        (0, NO_STRING, 0x11 if hex_code else 0x10, version_code),
+        (1, 5, 0x03, 5),
+        (2, 4, 0x03, 4),
+    ]
+    chunks = string_pool(strings, utf8) + start_element(3, attributes)
+    return struct.pack('<HHI', 0x0003, 8, 8 + len(chunks)) + chunks
+
+
+def apk(data=None):
+    with tempfile.NamedTemporaryFile(suffix='.apk', delete=False) as f:
+        if data is None:
+            with zipfile.ZipFile(f, 'w') as archive:
+                archive.writestr('AndroidManifest.xml', manifest())
+                archive.writestr('classes.dex', b'dex\n035\x00')
+        else:
+            f.write(data)
+    return f.name
+
+
+class TestParseManifest(unittest.TestCase):
+    def test_utf16_strings(self):
+        self.assertEqual(_parse_manifest(manifest()),
+                         {'package': 'com.example.app', 'version_code': 42, 'version_name': '1.2'})
+
+    def test_utf8_strings(self):
+        package = 'com.example.' + 'a' * 200
+        self.assertEqual(_parse_manifest(manifest(package, 7, 'ünï', utf8=True)),
+                         {'package': package, 'version_code': 7, 'version_name': 'ünï'})
+
+    def test_hex_version_code(self):
+        self.assertEqual(_parse_manifest(manifest(version_code=0x7fffffff, hex_code=True))['version_code'],
+                         0x7fffffff)
+
+    def test_not_binary_xml(self):
+        with self.assertRaisesRegex(ValueError, 'not in binary XML'):
+            _parse_manifest(b'<?xml version="1.0" encoding="utf-8"?>\n<manifest/>')
+
+    def test_read_manifest(self):
+        path = apk()
+        self.addCleanup(os.unlink, path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        expected = {'package': 'com.example.app', 'version_code': 42, 'version_name': '1.2'}
+        self.assertEqual(read_manifest(path), expected)
+        self.assertEqual(read_manifest(memoryview(data)), expected)
+
+
+class FakeConnection:
+    """A device transport that replays `data` and records what was written."""
+
+    def __init__(self, data):
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        self.parser = Parser(stream)
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def close(self):
+        pass
+
+
+def install_fleet(path, installed):
+    """Run install_fleet with `installed` mapping each serial to its InstalledApkCommand output."""
+    async def run():
+        client = Client()
+        streamed = []
+
+        async def transport(serial):
+            return FakeConnection(b'OKAY' + installed[serial])
+
+        async def get_host_features(serial):
+            return ['cmd', 'shell_v2']
+
+        async def install_streamed(serial, apk, abb=False):
+            streamed.append(serial)
+            return True
+
+        with patch.object(client, 'transport', transport), \
+                patch.object(client, 'get_host_features', get_host_features), \
+                patch.object(client, 'install_streamed', install_streamed):
+            reports = await client.install_fleet(list(installed), path)
+        return reports, streamed
+
+    return asyncio.run(run())
+
+
+class TestInstallFleet(unittest.TestCase):
+    def setUp(self):
+        self.path = apk()
+        self.addCleanup(os.unlink, self.path)
+        with open(self.path, 'rb') as f:
+            self.digest = hashlib.sha256(f.read()).hexdigest().encode()
+
+    def test_rollout(self):
+        reports, streamed = install_fleet(self.path, {
+            'same': b'path:/data/app/base.apk\n' + self.digest + b'  /data/app/base.apk\n    versionCode=42 minSdk=21\n',
+            'newer': b'path:/data/app/base.apk\n' + b'0' * 64 + b'  /data/app/base.apk\n    versionCode=50\n',
+            'older': b'path:/data/app/base.apk\n' + b'0' * 64 + b'  /data/app/base.apk\n    versionCode=41\n',
+            'missing': b'path:\n',
+        })
+        self.assertEqual({serial: report['status'] for serial, report in reports.items()},
+                         {'same': 'skipped', 'newer': 'downgrade', 'older': 'installed', 'missing': 'installed'})
+        self.assertEqual(sorted(streamed), ['missing', 'older'])
+        self.assertEqual(reports['newer']['version_code'], 50)
+        self.assertEqual(reports['newer']['local_version_code'], 42)
+        self.assertIsNone(reports['missing']['version_code'])
+
+    def test_empty_apk(self):
+        path = apk(b'')
+        self.addCleanup(os.unlink, path)
+        reports, streamed = install_fleet(path, {'a': b'', 'b': b''})
+        self.assertEqual(streamed, [])
+        for report in reports.values():
+            self.assertEqual(report['status'], 'failed')
+            self.assertIsInstance(report['error'], ValueError)
+
+    def test_not_an_apk(self):
+        path = apk(b'not a zip file')
+        self.addCleanup(os.unlink, path)
+        reports, streamed = install_fleet(path, {'a': b''})
+        self.assertEqual(streamed, [])
+        self.assertEqual(reports['a']['status'], 'failed')
+        self.assertIsInstance(reports['a']['error'], zipfile.BadZipFile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import shutil
+import tempfile
+import time
+import unittest
+
+from logcat.archive import ArchiveReader, ArchiveSink, ArchiveWriter
+from logcat.entry import Entry
+
+
+def entry(sec, nsec=0, pid=1, tid=1, priority=4, tag='Tag', message='message'):
+    return Entry(sec, nsec, pid, tid, priority, tag, message)
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, entries, **kwargs):
+        writer = ArchiveWriter(self.directory, **kwargs)
+        for item in entries:
+            writer.write(item)
+        writer.close()
+        return ArchiveReader(self.directory, serial='serial')
+
+    def test_round_trip(self):
+        entries = [entry(i, i, pid=i % 3, tag=f"Tag{i % 2}", message=f"message {i}") for i in range(100)]
+        reader = self.write(entries, block_size=256, segment_duration=20)
+        self.assertGreater(len(reader.segments()), 1)
+        read = list(reader.read())
+        self.assertEqual([(e.sec, e.nsec, e.pid, e.tag, e.message) for e in read],
+                         [(e.sec, e.nsec, e.pid, e.tag, e.message) for e in entries])
+        self.assertTrue(all(e.serial == 'serial' for e in read))
+
+    def test_filters(self):
+        entries = [entry(i, pid=i % 3, tag=f"Tag{i % 2}") for i in range(100)]
+        reader = self.write(entries, block_size=256, segment_duration=20)
+        read = list(reader.read(since_ns=30 * 10 ** 9, until_ns=60 * 10 ** 9, pid=1, tag='Tag0'))
+        self.assertEqual([e.sec for e in read], [i for i in range(30, 61) if i % 3 == 1 and i % 2 == 0])
+
+    def test_time_going_backwards(self):
+        # The clock jumping back does not rotate the segment named after 100 s
+        reader = self.write([entry(100), entry(5), entry(200), entry(50)], block_size=1, segment_duration=10)
+        self.assertEqual([e.sec for e in reader.read(until_ns=60 * 10 ** 9)], [5, 50])
+        self.assertEqual([e.sec for e in reader.read(since_ns=150 * 10 ** 9)], [200])
+
+    def test_unindexed_block_is_ignored(self):
+        writer = ArchiveWriter(self.directory)
+        writer.write(entry(1, message='indexed'))
+        writer.flush()
+        writer.write(entry(2, message='pending'))
+        self.assertEqual([e.message for e in ArchiveReader(self.directory).read()], ['indexed'])
+        writer.close()
+
+
+    def test_long_tag_is_truncated(self):
+        reader = self.write([entry(1, tag='T' * 70000), entry(2)])
+        self.assertEqual([(len(e.tag), e.sec) for e in reader.read()], [(65535, 1), (3, 2)])
+        self.assertEqual([e.sec for e in reader.read(tag='T' * 65535)], [1])
+
+
+class TestArchiveSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        return [e.sec for e in ArchiveReader(self.directory).read()]
+
+    def test_partial_block_waits_for_the_flush_interval(self):
+        async def run():
+            sink = ArchiveSink(self.directory, batch_size=1, flush_interval=0.2)
+            await sink.write(entry(1))
+            await asyncio.sleep(0.05)
+            # The queue drained, but the block is neither full nor old enough
+            self.assertEqual(self.read(), [])
+            await asyncio.sleep(0.4)
+            self.assertEqual(self.read(), [1])
+            await sink.write(entry(2))
+            await sink.close()
+            self.assertEqual(self.read(), [1, 2])
+
+        asyncio.run(run())
+
+    def test_full_blocks_are_written_at_once(self):
+        async def run():
+            # Two records fill a block, the ninth one stays pending
+            sink = ArchiveSink(self.directory, batch_size=9, flush_interval=60.0, block_size=64)
+            for sec in range(9):
+                await sink.write(entry(sec))
+            deadline = time.monotonic() + 1.0
+            while len(self.read()) < 8 and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            self.assertEqual(self.read(), list(range(8)))
+            await sink.close()
+            self.assertEqual(self.read(), list(range(9)))
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
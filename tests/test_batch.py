@@ -0,0 +1,65 @@
+import struct
+import unittest
+
+from logcat.batch import BatchParser
+from logcat.parser import BinaryParser
+
+
+def record(sec, nsec, pid, tid, priority, tag, message, header_size=20):
+    payload = bytes([priority]) + tag + b'\0' + message + b'\0'
+    header = struct.pack('<HHiiii', len(payload), 0 if header_size == 20 else header_size, pid, tid, sec, nsec)
+    return header + b'\0' * (header_size - 20) + payload
+
+
+
+class TestBatchParser(unittest.TestCase):
+    RECORDS = [
+        record(100, 1, 10, 11, 4, b'ActivityManager', b'Start proc 123'),
+        record(100, 2, 10, 12, 6, b'Tag', b'crlf\r\n'),
+        record(101, 0, 20, 20, 3, b'', b''),
+        record(101, 5, 20, 21, 5, b'Tag', b'several\n\n', header_size=24),
+        record(102, 0, 30, 31, 4, b'Unicode', 'héllo'.encode(), header_size=28),
+        struct.pack('<HHiiii', 0, 0, 40, 41, 103, 0),
+    ]
+
+    def assert_in_step(self, chunks):
+        binary = BinaryParser()
+        batch = BatchParser()
+        expected = []
+        actual = []
+        for chunk in chunks:
+            expected.extend(binary.parse(chunk))
+            parsed = batch.parse(chunk)
+            if parsed is not None:
+                actual.extend((int(parsed.time_ns[i]), int(parsed.pid[i]), int(parsed.tid[i]),
+                               int(parsed.priority[i]), parsed.tag(i), parsed.message(i))
+                              for i in range(len(parsed)))
+        self.assertEqual(actual, [(e.time_ns, e.pid, e.tid, e.priority, e.tag, e.message) for e in expected])
+        return actual
+
+    def test_matches_binary_parser(self):
+        actual = self.assert_in_step([b''.join(self.RECORDS)])
+        self.assertEqual(len(actual), len(self.RECORDS))
+
+    def test_matches_binary_parser_byte_by_byte(self):
+        data = b''.join(self.RECORDS)
+        self.assert_in_step([data[i:i + 1] for i in range(len(data))])
+
+    def test_incomplete_record(self):
+        parser = BatchParser()
+        self.assertIsNone(parser.parse(self.RECORDS[0][:-1]))
+        batch = parser.parse(self.RECORDS[0][-1:])
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch.message(0), 'Start proc 123')
+
+    def test_tags_are_shared_across_batches(self):
+        parser = BatchParser()
+        first = parser.parse(self.RECORDS[1])
+        second = parser.parse(self.RECORDS[3])
+        self.assertEqual(first.tag_id[0], second.tag_id[0])
+        self.assertEqual(parser.tags, ['Tag'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
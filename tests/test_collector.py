@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+
+from adb.proc.collector import (ProcCollector, parse_loadavg, parse_meminfo, parse_net_dev, parse_raw,
+                                parse_stat)
+
+MEMINFO = b'MemTotal:        3844548 kB\nMemFree:          123456 kB\nHugePages_Total:       0\n'
+LOADAVG = b'1.50 0.75 0.25 3/1234 5678\n'
+NET_DEV = (b'Inter-|   Receive |  Transmit\n'
+           b' face |bytes    packets errs drop fifo frame compressed multicast|bytes packets\n'
+           b'    lo:  100 2 0 0 0 0 0 0  100 2 0 0 0 0 0 0\n'
+           b' wlan0: 5000 40 1 0 0 0 0 3 7000 50 0 2 0 0 0 0\n')
+STAT = b'cpu  10 20 30 40 0 0 0 0 0 0\ncpu0 5 10 15 20 0 0 0 0 0 0\nintr 1000 1 2 3\nctxt 4242\nbtime 1700000000\n'
+
+
+class FakeClient:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.commands = []
+
+    async def exec_out(self, serial, command):
+        self.commands.append(command)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        stream = asyncio.StreamReader()
+        stream.feed_data(result)
+        stream.feed_eof()
+        return stream
+
+
+class TestParsers(unittest.TestCase):
+    def test_meminfo(self):
+        self.assertEqual(parse_meminfo(MEMINFO), {'MemTotal': 3844548, 'MemFree': 123456, 'HugePages_Total': 0})
+
+    def test_loadavg(self):
+        self.assertEqual(parse_loadavg(LOADAVG),
+                         {'1m': 1.5, '5m': 0.75, '15m': 0.25, 'running': 3, 'total': 1234, 'last_pid': 5678})
+
+    def test_net_dev(self):
+        interfaces = parse_net_dev(NET_DEV)
+        self.assertEqual(sorted(interfaces), ['lo', 'wlan0'])
+        self.assertEqual(interfaces['wlan0']['rx_bytes'], 5000)
+        self.assertEqual(interfaces['wlan0']['rx_errs'], 1)
+        self.assertEqual(interfaces['wlan0']['rx_multicast'], 3)
+        self.assertEqual(interfaces['wlan0']['tx_drop'], 2)
+
+    def test_stat(self):
+        stat = parse_stat(STAT)
+        self.assertEqual(stat['cpu'], [10, 20, 30, 40, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(stat['cpu0'][:4], [5, 10, 15, 20])
+        self.assertEqual((stat['intr'], stat['ctxt'], stat['btime']), (1000, 4242, 1700000000))
+
+    def test_raw(self):
+        self.assertEqual(parse_raw(b'1234\n'), b'1234')
+
+
+class TestProcCollector(unittest.TestCase):
+    def test_command_escapes_paths(self):
+        collector = ProcCollector(None, 'serial', ['/proc/stat', "/sys/it's here"])
+        self.assertIn("for f in '/proc/stat' '/sys/it'\"'\"'s here';", collector.command())
+
+    def test_collect(self):
+        out = (b'\x1e/proc/loadavg\n' + LOADAVG + b'\x1e/proc/meminfo\n' + MEMINFO
+               + b'\x1e/sys/missing\n' + b'\x1e/sys/temp\n42000\n')
+        collector = ProcCollector(FakeClient(out), 'serial', ['/proc/loadavg', '/proc/meminfo', '/sys/missing',
+                                                              '/sys/temp'])
+        snapshot = asyncio.run(collector.collect())
+        self.assertEqual(sorted(snapshot['files']), ['/proc/loadavg', '/proc/meminfo', '/sys/temp'])
+        self.assertEqual(snapshot['files']['/proc/loadavg']['last_pid'], 5678)
+        self.assertEqual(snapshot['files']['/sys/temp'], b'42000')
+        self.assertGreaterEqual(snapshot['duration'], 0)
+
+    def test_errors_do_not_stop_the_loop(self):
+        client = FakeClient(ConnectionError('device offline'), b'\x1e/proc/loadavg\n' + LOADAVG)
+
+        async def run():
+            collector = ProcCollector(client, 'serial', ['/proc/loadavg'])
+            collector.interval = 1
+            with self.assertLogs('adb.proc.collector', 'WARNING') as logs:
+                await collector.start()
+                while collector.snapshot is None:
+                    await asyncio.sleep(0.001)
+                await collector.end()
+            return collector, logs
+
+        collector, logs = asyncio.run(run())
+        self.assertIn('device offline', logs.output[0])
+        self.assertEqual(collector.snapshot['files']['/proc/loadavg']['1m'], 1.5)
+        self.assertEqual(len(client.commands), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
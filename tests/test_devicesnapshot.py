@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import Mock
+
+from adb.common.host_transport.devicesnapshot import DeviceSnapshotCommand
+
+
+class TestDeviceSnapshotCommand(unittest.TestCase):
+    OUTPUT = '\n'.join([
+        '\x1eproperties',
+        '[ro.product.model]: [Pixel 7]',
+        '[sys.boot_completed]: [1]',
+        '\x1efeatures',
+        'feature:android.hardware.camera',
+        'feature:android.hardware.vulkan.level=1',
+        '\x1epackages',
+        'package:/data/app/~~abc==/com.example-1/base.apk=com.example versionCode:42 uid:10123',
+        'package:/system/app/Settings/Settings.apk=com.android.settings uid:1000',
+        '\x1ebattery',
+        'Current Battery Service state:',
+        '  AC powered: false',
+        '  USB powered: true',
+        '  level: 87',
+        '  temperature: -5',
+        '  technology: Li-ion',
+        '\x1estorage',
+        'Filesystem     1K-blocks    Used Available Use% Mounted on',
+        '/dev/block/dm-5  1000  400  600  40% /data',
+        'tmpfs  -  -  -  -  /dev',
+        '',
+    ])
+
+    def test_parse_snapshot(self):
+        snapshot = DeviceSnapshotCommand(Mock())._parse_snapshot(self.OUTPUT)
+        self.assertEqual(snapshot['properties'], {'ro.product.model': 'Pixel 7', 'sys.boot_completed': '1'})
+        self.assertEqual(snapshot['features'], {'android.hardware.camera': True, 'android.hardware.vulkan.level': '1'})
+        self.assertEqual(snapshot['packages'], [
+            {'name': 'com.example', 'path': '/data/app/~~abc==/com.example-1/base.apk', 'version_code': 42,
+             'uid': 10123},
+            {'name': 'com.android.settings', 'path': '/system/app/Settings/Settings.apk', 'version_code': None,
+             'uid': 1000},
+        ])
+        self.assertEqual(snapshot['battery'], {'AC powered': False, 'USB powered': True, 'level': 87,
+                                               'temperature': -5, 'technology': 'Li-ion'})
+        self.assertEqual(snapshot['storage'], {'/data': {'filesystem': '/dev/block/dm-5', 'size': 1024000,
+                                                         'used': 409600, 'available': 614400}})
+
+    def test_missing_sections(self):
+        snapshot = DeviceSnapshotCommand(Mock())._parse_snapshot('\x1eproperties\n[a]: [b]\n')
+        self.assertEqual(snapshot, {'properties': {'a': 'b'}, 'features': {}, 'packages': [],
+                                    'battery': {}, 'storage': {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import Mock
+
+from adb.common.host.deviceswithpaths import HostDevicesWithPathsCommand
+
+
+class TestHostDevicesWithPathsCommand(unittest.TestCase):
+    def setUp(self):
+        self.command = HostDevicesWithPathsCommand(Mock())
+
+    def test_usb_device(self):
+        device = self.command._parse_device(
+            '0123456789ABCDEF       device usb:1-1 product:razor model:Nexus_7 device:flo transport_id:3')
+        self.assertEqual(device, {'id': '0123456789ABCDEF', 'type': 'device', 'path': 'usb:1-1',
+                                  'product': 'razor', 'model': 'Nexus_7', 'device': 'flo', 'transport_id': '3'})
+
+    def test_emulator_without_path(self):
+        device = self.command._parse_device(
+            'emulator-5554          device product:sdk_gphone64 model:sdk_gphone64 device:emu64xa transport_id:1')
+        self.assertIsNone(device['path'])
+        self.assertEqual((device['id'], device['type'], device['model']), ('emulator-5554', 'device', 'sdk_gphone64'))
+
+    def test_multi_word_state(self):
+        device = self.command._parse_device(
+            '0123456789ABCDEF       no permissions (user in plugdev group; are your udev rules wrong?); '
+            'see [http://developer.android.com/tools/device.html] usb:1-1.2 transport_id:2')
+        self.assertEqual(device['type'], 'no permissions (user in plugdev group; are your udev rules wrong?); '
+                                         'see [http://developer.android.com/tools/device.html]')
+        self.assertEqual((device['path'], device['transport_id']), ('usb:1-1.2', '2'))
+
+    def test_offline_device(self):
+        device = self.command._parse_device('192.168.1.2:5555       offline transport_id:5')
+        self.assertEqual(device, {'id': '192.168.1.2:5555', 'type': 'offline', 'path': None, 'transport_id': '5'})
+
+    def test_parse_devices(self):
+        devices = self.command._parse_devices(b'a device usb:1-1 transport_id:1\nb unauthorized usb:1-2\n')
+        self.assertEqual([(device['id'], device['type'], device['path']) for device in devices],
+                         [('a', 'device', 'usb:1-1'), ('b', 'unauthorized', 'usb:1-2')])
+        self.assertEqual(self.command._parse_devices(b''), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import struct
+import unittest
+import zlib
+
+import numpy as np
+
+from adb.framebuffer.encoder import PNG_SIGNATURE, encode_png
+
+
+def meta(bpp, red, green, blue, alpha=(0, 0), width=2, height=1):
+    return {
+        'bpp': bpp, 'size': width * height * bpp // 8, 'width': width, 'height': height,
+        'red_offset': red[0], 'red_length': red[1],
+        'green_offset': green[0], 'green_length': green[1],
+        'blue_offset': blue[0], 'blue_length': blue[1],
+        'alpha_offset': alpha[0], 'alpha_length': alpha[1],
+    }
+
+
+RGBA = meta(32, (0, 8), (8, 8), (16, 8), (24, 8))
+RGB565 = meta(16, (11, 5), (5, 6), (0, 5), width=3)
+
+
+def read_png(data):
+    """Decode a PNG written without filters into (header, pixel rows)."""
+    assert data.startswith(PNG_SIGNATURE)
+    offset = len(PNG_SIGNATURE)
+    chunks = {}
+    while offset < len(data):
+        length, = struct.unpack_from('>I', data, offset)
+        kind = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack_from('>I', data, offset + 8 + length)
+        assert crc == zlib.crc32(kind + body) & 0xffffffff
+        chunks[kind] = body
+        offset += 12 + length
+    width, height, depth, color, _, _, _ = struct.unpack('>IIBBBBB', chunks[b'IHDR'])
+    channels = 4 if color == 6 else 3
+    rows = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8).reshape(height, -1)
+    assert not rows[:, 0].any()
+    return (width, height, depth, color), rows[:, 1:].reshape(height, width, channels)
+
+
+class TestEncodePng(unittest.TestCase):
+    def test_rgba(self):
+        data = bytes(range(8))
+        header, pixels = read_png(encode_png(data, RGBA))
+        self.assertEqual(header, (2, 1, 8, 6))
+        self.assertEqual(pixels.tolist(), [[[0, 1, 2, 3], [4, 5, 6, 7]]])
+
+    def test_rgb565(self):
+        rgb565 = dict(RGB565, width=1, height=3)
+        data = struct.pack('<3H', 0xf800, 0x07e0, 0x001f)
+        header, pixels = read_png(encode_png(data, rgb565))
+        self.assertEqual(header, (1, 3, 8, 2))
+        self.assertEqual(pixels.tolist(), [[[255, 0, 0]], [[0, 255, 0]], [[0, 0, 255]]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import struct
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from adb.common.host_transport.framebuffer import FrameBufferCommand
+from adb.parser import Parser
+
+
+def header(bpp, width, height, size=None, red=(0, 8), blue=(16, 8), green=(8, 8), alpha=(24, 8)):
+    size = width * height * bpp // 8 if size is None else size
+    return struct.pack('<13I', 1, bpp, size, width, height, *red, *blue, *green, *alpha)
+
+
+def read_array(data):
+    async def run():
+        stream = asyncio.StreamReader()
+        stream.feed_data(b'OKAY' + data)
+        stream.feed_eof()
+        connection = Mock()
+        connection.parser = Parser(stream)
+        return await FrameBufferCommand(connection).execute('array')
+
+    return asyncio.run(run())
+
+
+class TestReadArray(unittest.TestCase):
+    def test_32_bpp(self):
+        pixels = bytes(range(24))
+        array, meta = read_array(header(32, 3, 2) + pixels)
+        self.assertEqual((array.shape, array.dtype), ((2, 3, 4), np.uint8))
+        self.assertEqual(array[1, 2].tolist(), [20, 21, 22, 23])
+        self.assertEqual(meta['format'], 'rgba')
+
+    def test_24_bpp(self):
+        pixels = bytes(range(18))
+        array, meta = read_array(header(24, 3, 2, alpha=(0, 0)) + pixels)
+        self.assertEqual((array.shape, array.dtype), ((2, 3, 3), np.uint8))
+        self.assertEqual(array[0, 1].tolist(), [3, 4, 5])
+        self.assertEqual(meta['format'], 'rgb')
+
+    def test_16_bpp(self):
+        pixels = struct.pack('<6H', 0xf800, 0x07e0, 0x001f, 1, 2, 3)
+        array, meta = read_array(header(16, 3, 2, red=(11, 5), blue=(0, 5), green=(5, 6), alpha=(0, 0)) + pixels)
+        self.assertEqual((array.shape, array.dtype), ((2, 3), np.dtype('<u2')))
+        self.assertEqual(array.tolist(), [[0xf800, 0x07e0, 0x001f], [1, 2, 3]])
+        self.assertEqual(meta['format'], 'rgb565')
+
+    def test_padding_after_the_pixels_is_ignored(self):
+        for bpp in (16, 24, 32):
+            size = 3 * 2 * bpp // 8
+            array, meta = read_array(header(bpp, 3, 2, size=size + 8) + bytes(size + 8))
+            self.assertEqual(array.shape[:2], (2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
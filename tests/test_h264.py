@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from adb.screenrecord.h264 import NalSplitter, ScreenrecordReader
+
+SPS = bytes([0x67, 0x42, 0x00, 0x1f])
+PPS = bytes([0x68, 0xce, 0x3c, 0x80])
+IDR = bytes([0x65, 0x88, 0x84, 0x00, 0x21])
+SLICE = bytes([0x41, 0x9a, 0x00, 0x00, 0x02])
+
+
+class TestNalSplitter(unittest.TestCase):
+    STREAM = (b'\x00\x00\x00\x01' + SPS + b'\x00\x00\x00\x01' + PPS + b'\x00\x00\x01' + IDR
+              + b'\x00\x00\x00\x01' + SLICE)
+
+    def split(self, chunks):
+        splitter = NalSplitter()
+        units = []
+        for chunk in chunks:
+            units.extend(splitter.feed(chunk))
+        return units + splitter.flush()
+
+    def test_single_chunk(self):
+        self.assertEqual(self.split([self.STREAM]), [SPS, PPS, IDR, SLICE])
+
+    def test_start_codes_across_chunks(self):
+        stream = self.STREAM
+        self.assertEqual(self.split([stream[i:i + 1] for i in range(len(stream))]), [SPS, PPS, IDR, SLICE])
+        for size in (2, 3, 5, 7):
+            self.assertEqual(self.split([stream[i:i + size] for i in range(0, len(stream), size)]),
+                             [SPS, PPS, IDR, SLICE])
+
+    def test_units_complete_on_next_start_code(self):
+        splitter = NalSplitter()
+        self.assertEqual(splitter.feed(b'\x00\x00\x00\x01' + SPS), [])
+        self.assertEqual(splitter.feed(b'\x00\x00\x01' + PPS), [SPS])
+        self.assertEqual(splitter.flush(), [PPS])
+        self.assertEqual(splitter.flush(), [])
+
+    def test_leading_garbage_is_dropped(self):
+        self.assertEqual(self.split([b'\x12\x34' + self.STREAM]), [SPS, PPS, IDR, SLICE])
+
+    def test_trailing_zeros_are_dropped(self):
+        self.assertEqual(self.split([b'\x00\x00\x01' + SPS + b'\x00\x00' + b'\x00\x00\x01' + PPS]), [SPS, PPS])
+
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class TestScreenrecordReader(unittest.TestCase):
+    def test_access_units_and_close(self):
+        async def run():
+            stream = asyncio.StreamReader()
+            stream.feed_data(TestNalSplitter.STREAM)
+            stream.feed_eof()
+            connection = FakeConnection()
+            reader = ScreenrecordReader(stream, connection=connection)
+            units = [[unit.data for unit in access_unit.units] async for access_unit in reader]
+            await reader.close()
+            return units, connection
+
+        units, connection = asyncio.run(run())
+        self.assertEqual(units, [[SPS, PPS, IDR], [SLICE]])
+        self.assertTrue(connection.closed)
+
+    def test_end_stops_reading(self):
+        async def run():
+            stream = asyncio.StreamReader()
+            connection = FakeConnection()
+            reader = ScreenrecordReader(stream, connection=connection)
+            reader.end()
+            units = [access_unit async for access_unit in reader]
+            await reader.close()
+            return units, connection
+
+        units, connection = asyncio.run(run())
+        self.assertEqual(units, [])
+        self.assertTrue(connection.closed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+from adb.common.host_transport.installedapk import InstalledApkCommand
+from adb.parser import Parser
+
+SHA256 = 'a3f1' * 16
+
+
+class FakeConnection:
+    """Replays `data` and records what was written."""
+
+    def __init__(self, data):
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        self.parser = Parser(stream)
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+
+def execute(data, package):
+    async def run():
+        connection = FakeConnection(data)
+        result = await InstalledApkCommand(connection).execute(package)
+        return result, connection.written
+
+    return asyncio.run(run())
+
+
+class TestParseInstalled(unittest.TestCase):
+    def test_installed(self):
+        output = (f"path:/data/app/~~x==/com.example-y==/base.apk\r\n"
+                  f"{SHA256}  /data/app/~~x==/com.example-y==/base.apk\r\n"
+                  f"    versionCode=1234 minSdk=21 targetSdk=34\r\n")
+        self.assertEqual(InstalledApkCommand._parse_installed(output), {
+            'path': '/data/app/~~x==/com.example-y==/base.apk',
+            'sha256': SHA256,
+            'version_code': 1234,
+        })
+
+    def test_not_installed(self):
+        self.assertIsNone(InstalledApkCommand._parse_installed('path:\n'))
+        self.assertIsNone(InstalledApkCommand._parse_installed(''))
+
+    def test_unreadable_apk(self):
+        # sha256sum fails without root on some builds, dumpsys still answers
+        self.assertEqual(InstalledApkCommand._parse_installed('path:/data/app/base.apk\n    versionCode=7\n'),
+                         {'path': '/data/app/base.apk', 'sha256': None, 'version_code': 7})
+
+
+class TestInstalledApkCommand(unittest.TestCase):
+    def test_execute(self):
+        result, written = execute(f"OKAYpath:/data/app/base.apk\n{SHA256}  /data/app/base.apk\n"
+                                  f"    versionCode=3\n".encode(), 'com.example')
+        self.assertEqual(result, {'path': '/data/app/base.apk', 'sha256': SHA256, 'version_code': 3})
+        self.assertIn(b"pm path 'com.example'", b''.join(written))
+
+    def test_fail(self):
+        with self.assertRaisesRegex(Exception, 'closed'):
+            execute(b'FAIL0006closed', 'com.example')
+
+
+if __name__ == '__main__':
+    unittest.main()
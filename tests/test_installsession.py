@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+
+from adb.common.host_transport.installabandon import InstallAbandonCommand
+from adb.common.host_transport.installcommit import InstallCommitCommand
+from adb.common.host_transport.installcreate import InstallCreateCommand
+from adb.common.host_transport.installwrite import InstallWriteCommand
+from adb.parser import Parser
+
+
+class FakeConnection:
+    """Replays `data`; writes are recorded and complete at once."""
+
+    def __init__(self, data):
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        self.parser = Parser(stream)
+        self.written = []
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        done = asyncio.get_event_loop().create_future()
+        done.set_result(None)
+        return done
+
+
+def execute(command_class, data, *args, **kwargs):
+    async def run():
+        connection = FakeConnection(data)
+        result = await command_class(connection).execute(*args, **kwargs)
+        return result, connection.written
+
+    return asyncio.run(run())
+
+
+class TestInstallCreateCommand(unittest.TestCase):
+    def test_session_id(self):
+        session, written = execute(InstallCreateCommand, b'OKAYSuccess: created install session [1234567890]\n',
+                                   300, args=('-r', '-t'))
+        self.assertEqual(session, 1234567890)
+        self.assertEqual(written, [b"0036exec:cmd package 'install-create' '-S' '300' '-r' '-t'"])
+
+    def test_abb(self):
+        session, written = execute(InstallCreateCommand, b'OKAYSuccess: created install session [7]', 300, 'abb')
+        self.assertEqual(session, 7)
+        self.assertEqual(written, [b'0029abb_exec:package\x00install-create\x00-S\x00300\x00-r'])
+
+    def test_failure(self):
+        with self.assertRaises(Exception) as caught:
+            execute(InstallCreateCommand, b'OKAYError: Unknown option -x\n', 300, args=('-x',))
+        self.assertEqual(caught.exception.code, 'Unknown option -x')
+
+    def test_missing_session_id(self):
+        with self.assertRaisesRegex(Exception, r'could not be created \[Success\]'):
+            execute(InstallCreateCommand, b'OKAYSuccess\n', 300)
+
+
+class TestInstallSessionCommands(unittest.TestCase):
+    def test_write(self):
+        result, written = execute(InstallWriteCommand, b'OKAYSuccess: streamed 3 bytes\n', 42, 'base.apk', b'APK')
+        self.assertIs(result, True)
+        self.assertEqual(written, [b"003Dexec:cmd package 'install-write' '-S' '3' '42' 'base.apk' '-'", b'APK'])
+
+    def test_write_failure(self):
+        with self.assertRaises(Exception) as caught:
+            execute(InstallWriteCommand, b'OKAYFailure [INSTALL_FAILED_INVALID_APK]\n', 42, 'split.apk', b'APK')
+        self.assertEqual(caught.exception.code, 'INSTALL_FAILED_INVALID_APK')
+        self.assertIn('split.apk', str(caught.exception))
+
+    def test_commit(self):
+        result, written = execute(InstallCommitCommand, b'OKAYSuccess\n', 42, 'abb')
+        self.assertIs(result, True)
+        self.assertEqual(written, [b'0022abb_exec:package\x00install-commit\x0042'])
+
+    def test_commit_failure(self):
+        with self.assertRaises(Exception) as caught:
+            execute(InstallCommitCommand, b'OKAYFailure [INSTALL_FAILED_VERSION_DOWNGRADE]\n', 42)
+        self.assertEqual(caught.exception.code, 'INSTALL_FAILED_VERSION_DOWNGRADE')
+
+    def test_abandon(self):
+        result, written = execute(InstallAbandonCommand, b'OKAYSuccess\n', 42)
+        self.assertIs(result, True)
+        self.assertEqual(written, [b"0027exec:cmd package 'install-abandon' '42'"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import struct
+import unittest
+from unittest.mock import patch
+
+from adb.client import Client
+from adb.parser import FailError, Parser
+
+
+def record(sec, nsec, pid, tid, priority, tag, message):
+    payload = bytes([priority]) + tag + b'\0' + message + b'\0'
+    return struct.pack('<HHiiii', len(payload), 0, pid, tid, sec, nsec) + payload
+
+
+class FakeConnection:
+    """A device transport that replays `data` and records what was written."""
+
+    def __init__(self, data):
+        self.data = data
+        self.written = []
+        self.closed = False
+        self.parser = None
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def close(self):
+        self.closed = True
+
+    def start(self):
+        stream = asyncio.StreamReader()
+        stream.feed_data(self.data)
+        stream.feed_eof()
+        self.parser = Parser(stream)
+        return self
+
+
+def open_logcat(data, options=None):
+    async def run():
+        connection = FakeConnection(data).start()
+        client = Client()
+
+        async def transport(serial):
+            return connection
+
+        with patch.object(client, 'transport', transport):
+            reader = await client.open_logcat('serial', options)
+        entries = [entry async for entry in reader]
+        await reader.close()
+        return connection, entries
+
+    return asyncio.run(run())
+
+
+class TestOpenLogcat(unittest.TestCase):
+    RECORDS = [
+        record(100, 1, 10, 11, 4, b'ActivityManager', b'Start proc 123'),
+        record(101, 2, 10, 12, 6, b'Tag', b'line\nfeed'),
+    ]
+
+    def assert_entries(self, entries):
+        self.assertEqual([(entry.sec, entry.nsec, entry.tag) for entry in entries],
+                         [(100, 1, 'ActivityManager'), (101, 2, 'Tag')])
+        self.assertEqual(entries[1].message, 'line\nfeed')
+
+    def test_reads_entries_after_the_echo_line(self):
+        connection, entries = open_logcat(b'OKAY\n' + b''.join(self.RECORDS))
+        self.assert_entries(entries)
+        self.assertEqual(connection.written, [b'0027shell:echo && logcat -B *:I 2>/dev/null'])
+        self.assertTrue(connection.closed)
+
+    def test_fixes_line_feeds_behind_a_pty(self):
+        data = b''.join(self.RECORDS).replace(b'\n', b'\r\n')
+        connection, entries = open_logcat(b'OKAY\r\n' + data)
+        self.assert_entries(entries)
+
+    def test_since(self):
+        connection, entries = open_logcat(b'OKAY\n', {'since': (100, 5)})
+        self.assertEqual(entries, [])
+        self.assertIn(b"logcat -B -T '100.000000005' *:I", connection.written[0])
+
+    def test_fail(self):
+        with self.assertRaises(FailError):
+            open_logcat(b'FAIL0006closed')
+
+
+if __name__ == '__main__':
+    unittest.main()
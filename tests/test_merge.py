@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from logcat.entry import Entry
+from logcat.merge import MergedReader
+
+
+class FakeReader:
+    """Yields entries at the given seconds; a float item sleeps that long first."""
+
+    def __init__(self, *items, error=None):
+        self.items = list(items)
+        self.error = error
+        self.ended = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self.items:
+            if isinstance(item, float):
+                await asyncio.sleep(item)
+            else:
+                yield Entry(item, 0, message=f"{item}")
+        if self.error is not None:
+            raise self.error
+
+    def end(self):
+        self.ended = True
+
+
+def read(merged, count=None, timeout=5.0):
+    async def run():
+        entries = []
+        while count is None or len(entries) < count:
+            entry = await asyncio.wait_for(merged.read_entry(), timeout)
+            if entry is None:
+                break
+            entries.append(entry)
+        merged.end()
+        return entries
+
+    return asyncio.run(run())
+
+
+class TestMergedReader(unittest.TestCase):
+    def test_orders_entries_across_devices(self):
+        merged = MergedReader({'a': FakeReader(1, 3, 5), 'b': FakeReader(2, 4, 6)}, lateness=10.0)
+        entries = read(merged)
+        self.assertEqual([entry.sec for entry in entries], [1, 2, 3, 4, 5, 6])
+        self.assertEqual([entry.serial for entry in entries], ['a', 'b', 'a', 'b', 'a', 'b'])
+        self.assertEqual(merged.late, 0)
+
+    def test_releases_entries_older_than_the_watermark(self):
+        # 'a' is still connected but silent; 'b' moving past the lateness
+        # window must release the older entries without waiting for 'a'
+        merged = MergedReader({'a': FakeReader(1, 60.0), 'b': FakeReader(2, 100, 60.0)}, lateness=5.0)
+        self.assertEqual([entry.sec for entry in read(merged, 2, timeout=1.0)], [1, 2])
+
+    def test_flushes_after_a_quiet_lateness_window(self):
+        merged = MergedReader({'a': FakeReader(5, 60.0), 'b': FakeReader(60.0)}, lateness=0.05)
+        self.assertEqual([entry.sec for entry in read(merged, 1, timeout=1.0)], [5])
+
+    def test_counts_late_entries(self):
+        merged = MergedReader({'a': FakeReader(5), 'b': FakeReader(0.3, 1)}, lateness=0.05)
+        self.assertEqual([entry.sec for entry in read(merged)], [5, 1])
+        self.assertEqual(merged.late, 1)
+
+    def test_drains_held_entries_at_end_of_stream(self):
+        merged = MergedReader({'a': FakeReader(3, 1), 'b': FakeReader(2)}, lateness=60.0)
+        self.assertEqual([entry.sec for entry in read(merged, timeout=1.0)], [1, 2, 3])
+
+    def test_max_buffer(self):
+        merged = MergedReader({'a': FakeReader(3, 2, 1, 60.0)}, lateness=60.0, max_buffer=2)
+        self.assertEqual([entry.sec for entry in read(merged, 1, timeout=1.0)], [1])
+
+    def test_failed_device_does_not_stop_the_others(self):
+        error = ConnectionError('gone')
+        merged = MergedReader({'a': FakeReader(1, error=error), 'b': FakeReader(2, 3)})
+        self.assertEqual([entry.sec for entry in read(merged)], [1, 2, 3])
+        self.assertEqual(merged.errors, {'a': error})
+
+    def test_end_stops_every_reader(self):
+        readers = {'a': FakeReader(1, 60.0), 'b': FakeReader(60.0)}
+        read(MergedReader(readers, lateness=0.01), 1)
+        self.assertTrue(all(reader.ended for reader in readers.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
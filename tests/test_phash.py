@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from adb.framebuffer.phash import HASHES, GoldenIndex, downsample, hamming, phash
+
+
+def frame(shift=0):
+    y, x = np.mgrid[0:64, 0:96]
+    return np.stack([(x * 2 + shift) % 256, (y * 3) % 256, ((x + y) * 5) % 256], axis=2).astype(np.uint8)
+
+
+class TestHashes(unittest.TestCase):
+    def test_known_hashes(self):
+        # Pinned values: a change here invalidates every stored golden index
+        self.assertEqual({kind: hash(frame()) for kind, hash in HASHES.items()}, {
+            'ahash': 0x2071fbfffff,
+            'dhash': 0x810216342840810,
+            'phash': 0xa270a70ffa08fd0d,
+        })
+
+    def test_stable_under_noise(self):
+        noisy = frame().astype(np.int16) + np.random.default_rng(1).integers(-3, 4, (64, 96, 3))
+        noisy = np.clip(noisy, 0, 255).astype(np.uint8)
+        for kind, hash in HASHES.items():
+            self.assertLessEqual(hamming(hash(frame()), hash(noisy)), 2, kind)
+
+    def test_frame_smaller_than_the_hash(self):
+        with self.assertRaises(ValueError):
+            phash(np.zeros((16, 16, 3), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            downsample(np.zeros((4, 20), dtype=np.float32), 8, 8)
+
+
+class TestGoldenIndex(unittest.TestCase):
+    def test_nearest(self):
+        index = GoldenIndex()
+        index.add('zero', 0)
+        index.add('ones', (1 << 64) - 1)
+        index.add('low', 0xff)
+        self.assertEqual(index.nearest(0x0f), [('zero', 4)])
+        self.assertEqual(index.nearest(0x0f, k=2), [('zero', 4), ('low', 4)])
+        self.assertEqual(index.nearest(1 << 63, k=3, max_distance=9), [('zero', 1), ('low', 9)])
+
+    def test_nearest_frame(self):
+        index = GoldenIndex()
+        index.add_frame('a', frame())
+        index.add_frame('b', frame(shift=128))
+        self.assertEqual(index.nearest(index.hash(frame()))[0], ('a', 0))
+
+    def test_grows_and_removes(self):
+        index = GoldenIndex()
+        for i in range(100):
+            index.add(i, i)
+        index.remove(0)
+        index.remove(50)
+        self.assertEqual(len(index), 98)
+        self.assertEqual(index.nearest(50, k=2), [(18, 1), (34, 1)])
+        self.assertEqual(index.distances(99)[-1], 0)
+
+    def test_rejects_wide_hashes(self):
+        index = GoldenIndex()
+        with self.assertRaises(ValueError):
+            index.add('wide', 1 << 64)
+        with self.assertRaises(ValueError):
+            index.add('wide', phash(frame(), size=16))
+        self.assertEqual(len(index), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
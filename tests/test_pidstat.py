@@ -0,0 +1,81 @@
+import unittest
+
+from adb.proc.pidstat import PidStat
+
+
+def stat_line(pid, comm, ppid=1, utime=0, stime=0, threads=1, starttime=100, vsize=4096, extra=29):
+    tail = ['S', ppid] + [0] * 9 + [utime, stime, 0, 0, 20, 0, threads, 0, starttime, vsize] + [0] * extra
+    return f"{pid} ({comm}) {' '.join(map(str, tail))}"
+
+
+def pidstat_output(total, stat_lines, statm_lines):
+    cpu = f"cpu {total} 0 0 0 0 0 0\ncpu0 0 0 0 0\ncpu1 0 0 0 0\n"
+    return (cpu + '\x1e' + '\n'.join(stat_lines) + '\n\x1e' + '\n'.join(statm_lines) + '\n').encode()
+
+
+class TestPidStat(unittest.TestCase):
+    def setUp(self):
+        self.pidstat = PidStat(None, 'serial', page_size=4096)
+
+    def test_parse(self):
+        table = self.pidstat._parse(pidstat_output(1000, [
+            stat_line(1, 'init', ppid=0, utime=5, stime=3, threads=2, vsize=8192),
+            stat_line(42, 'com.example) (x', ppid=1, threads=30, starttime=500),
+        ], [
+            '/proc/1/statm:100 20 10 1 0 5 0',
+            '/proc/42/statm:2000 300 100 1 0 50 0',
+        ]), 10.0)
+        self.assertEqual(table.pid.tolist(), [1, 42])
+        self.assertEqual(table.comm, ['init', 'com.example) (x'])
+        self.assertEqual(table.ppid.tolist(), [0, 1])
+        self.assertEqual(table.state.tolist(), [b'S', b'S'])
+        self.assertEqual(table.threads.tolist(), [2, 30])
+        self.assertEqual(table.ticks.tolist(), [8, 0])
+        self.assertEqual(table.vsize.tolist(), [8192, 4096])
+        self.assertEqual(table.rss.tolist(), [20 * 4096, 300 * 4096])
+        self.assertEqual(table.ncpu, 2)
+        self.assertEqual(table.cpu.tolist(), [0, 0])
+
+    def test_uneven_lines(self):
+        # Token counts add up to a multiple of the process count, but the
+        # lines differ; every row must still be read on its own
+        table = self.pidstat._parse(pidstat_output(1000, [
+            stat_line(1, 'short', utime=7, threads=3, extra=28),
+            stat_line(2, 'long', utime=9, threads=4, extra=30),
+        ], []), 10.0)
+        self.assertEqual(table.threads.tolist(), [3, 4])
+        self.assertEqual(table.ticks.tolist(), [7, 9])
+        self.assertEqual(table.rss.tolist(), [0, 0])
+
+    def test_truncated_lines_are_dropped(self):
+        table = self.pidstat._parse(pidstat_output(1000, [
+            stat_line(1, 'init', utime=7),
+            '2 (exiting) S 1 0 0',
+            stat_line(3, 'other', utime=9),
+        ], ['/proc/3/statm:100 20 10 1 0 5 0']), 10.0)
+        self.assertEqual(table.pid.tolist(), [1, 3])
+        self.assertEqual(table.comm, ['init', 'other'])
+        self.assertEqual(table.ticks.tolist(), [7, 9])
+        self.assertEqual(table.rss.tolist(), [0, 20 * 4096])
+
+    def test_no_processes(self):
+        table = self.pidstat._parse(pidstat_output(1000, [], []), 10.0)
+        self.assertEqual(len(table.pid), 0)
+
+    def test_cpu_between_samples(self):
+        self.pidstat.table = self.pidstat._parse(pidstat_output(1000, [
+            stat_line(1, 'init', utime=10),
+            stat_line(2, 'old', utime=100, starttime=200),
+        ], []), 10.0)
+        table = self.pidstat._parse(pidstat_output(1200, [
+            stat_line(1, 'init', utime=60),
+            # pid 2 was reused by a process started later
+            stat_line(2, 'new', utime=30, starttime=300),
+            stat_line(3, 'started', utime=5),
+        ], []), 11.0)
+        self.assertEqual(table.cpu.tolist(), [50.0, 30.0, 5.0])
+        self.assertEqual([row['pid'] for row in table.top(2)], [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import struct
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from unittest.mock import patch
+
+from adb.framebuffer import pipeline
+from adb.framebuffer.encoder import PNG_SIGNATURE
+from adb.framebuffer.pipeline import CapturePipeline, _attach
+from adb.parser import Parser
+
+
+def framebuffer(width, height):
+    header = struct.pack('<13I', 1, 32, width * height * 4, width, height, 0, 8, 16, 8, 8, 8, 24, 8)
+    return b'OKAY' + header + bytes(range(256)) * (width * height * 4 // 256)
+
+
+class FakeConnection:
+    def __init__(self, data):
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        self.parser = Parser(stream)
+        self.closed = False
+
+    def write(self, data):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, sizes):
+        self.sizes = sizes
+
+    async def transport(self, serial):
+        return FakeConnection(framebuffer(*self.sizes[serial]))
+
+
+class TestCapturePipeline(unittest.TestCase):
+    def run_pipeline(self, sizes, rounds=1):
+        images = []
+        created = []
+        create = shared_memory.SharedMemory
+
+        def counting(*args, **kwargs):
+            shm = create(*args, **kwargs)
+            if kwargs.get('create'):
+                created.append(shm.name)
+            return shm
+
+        async def sink(serial, data, meta):
+            images.append((serial, data[:8], meta['width']))
+
+        async def run():
+            with ThreadPoolExecutor(2) as executor:
+                capture = CapturePipeline(FakeClient(sizes), sink, workers=2, readers=2, executor=executor)
+                errors = []
+                for _ in range(rounds):
+                    errors += await capture.run(list(sizes))
+                await capture.close()
+                return errors
+
+        with patch.object(pipeline.shared_memory, 'SharedMemory', counting):
+            errors = asyncio.run(run())
+        self.assertEqual(errors, [])
+        return images, created
+
+    def test_reuses_shared_memory(self):
+        images, created = self.run_pipeline({'a': (16, 16), 'b': (16, 16)}, rounds=5)
+        self.assertEqual(len(images), 10)
+        self.assertTrue(all(data == PNG_SIGNATURE for _, data, _ in images))
+        self.assertLessEqual(len(created), 4)
+
+    def test_closing_unlinks_every_block(self):
+        images, created = self.run_pipeline({'a': (32, 16), 'b': (16, 16)}, rounds=2)
+        self.assertEqual(sorted(width for _, _, width in images), [16, 16, 32, 32])
+        for name in created:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_small_block_is_not_reused_for_a_larger_frame(self):
+        capture = CapturePipeline(FakeClient({}), None, workers=1)
+        capture._tasks = [None]
+        small = capture._acquire(16)
+        capture._release(small)
+        large = capture._acquire(1 << 16)
+        self.assertNotEqual(small.name, large.name)
+        self.assertIs(capture._acquire(8), small)
+        capture._tasks = []
+        capture._release(small)
+        capture._release(large)
+
+
+class TestAttach(unittest.TestCase):
+    def test_workers_do_not_track_the_segment(self):
+        shm = shared_memory.SharedMemory(create=True, size=16)
+        try:
+            with patch.object(resource_tracker._resource_tracker, '_send') as send:
+                attached = _attach(shm.name)
+                attached.close()
+            self.assertNotIn('REGISTER', [call.args[0] for call in send.call_args_list])
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import unittest
+
+from adb.propertycache import PropertyCache
+
+
+class FakeDevice:
+    def __init__(self, **properties):
+        self.properties = properties
+        self.fetches = 0
+        self.boot_checks = 0
+
+    async def fetch(self, serial):
+        self.fetches += 1
+        return dict(self.properties)
+
+    async def boot_id(self, serial):
+        self.boot_checks += 1
+        return self.properties.get('ro.runtime.firstboot')
+
+    def reboot(self, **properties):
+        self.properties.update(properties)
+        self.properties['ro.runtime.firstboot'] = str(int(self.properties['ro.runtime.firstboot']) + 1)
+
+
+class TestPropertyCache(unittest.TestCase):
+    def setUp(self):
+        self.device = FakeDevice(**{
+            'ro.serialno': 'ABC',
+            'ro.runtime.firstboot': '1000',
+            'sys.boot_completed': '1',
+            'dhcp.wlan0.ipaddress': '10.0.0.2',
+        })
+
+    def get(self, cache, keys=None):
+        return asyncio.run(cache.get('serial', keys))
+
+    def test_static_keys_are_kept(self):
+        cache = PropertyCache(self.device.fetch, ttl=60)
+        self.assertEqual(self.get(cache)['ro.serialno'], 'ABC')
+        self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'ABC'})
+        self.assertEqual(self.get(cache, ['dhcp.wlan0.ipaddress', 'unset']), {'dhcp.wlan0.ipaddress': '10.0.0.2'})
+        self.assertEqual(self.device.fetches, 1)
+
+    def test_dynamic_keys_are_refreshed(self):
+        cache = PropertyCache(self.device.fetch, ttl=0)
+        self.get(cache)
+        self.device.properties['dhcp.wlan0.ipaddress'] = '10.0.0.3'
+        self.assertEqual(self.get(cache, ['dhcp.wlan0.ipaddress']), {'dhcp.wlan0.ipaddress': '10.0.0.3'})
+        self.assertEqual(self.device.fetches, 2)
+
+    def test_static_keys_during_boot(self):
+        self.device.properties['sys.boot_completed'] = '0'
+        cache = PropertyCache(self.device.fetch, ttl=60)
+        self.get(cache)
+        self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'ABC'})
+        self.assertEqual(self.get(cache)['ro.serialno'], 'ABC')
+        self.assertEqual(self.device.fetches, 1)
+
+    def test_reboot_detected_by_boot_id(self):
+        cache = PropertyCache(self.device.fetch, ttl=0, boot_id=self.device.boot_id, verify_interval=0)
+        self.get(cache)
+        self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'ABC'})
+        self.assertEqual((self.device.fetches, self.device.boot_checks), (1, 1))
+        self.device.reboot(**{'ro.serialno': 'DEF'})
+        self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'DEF'})
+        self.assertEqual((self.device.fetches, self.device.boot_checks), (2, 2))
+
+    def test_boot_check_is_reused(self):
+        cache = PropertyCache(self.device.fetch, ttl=0, boot_id=self.device.boot_id)
+        self.get(cache)
+        self.get(cache, ['ro.serialno'])
+        self.assertEqual((self.device.fetches, self.device.boot_checks), (1, 1))
+        # A second read-only lookup runs no command at all
+        self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'ABC'})
+        self.assertEqual((self.device.fetches, self.device.boot_checks), (1, 1))
+
+    def test_unchanged_transport_skips_boot_check(self):
+        keys = {'serial': 1}
+        cache = PropertyCache(self.device.fetch, ttl=0, device_key=keys.get, boot_id=self.device.boot_id,
+                              verify_interval=0)
+        self.get(cache)
+        for _ in range(3):
+            self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'ABC'})
+        self.assertEqual((self.device.fetches, self.device.boot_checks), (1, 0))
+        # Without a known transport it falls back to checking the boot id
+        del keys['serial']
+        self.get(cache, ['ro.serialno'])
+        self.assertEqual(self.device.boot_checks, 1)
+
+    def test_reboot_detected_without_boot_id(self):
+        cache = PropertyCache(self.device.fetch, ttl=0)
+        self.get(cache)
+        self.device.reboot(**{'ro.serialno': 'DEF'})
+        self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'DEF'})
+
+    def test_reconnect_invalidates(self):
+        keys = {'serial': 1}
+        cache = PropertyCache(self.device.fetch, ttl=60, device_key=keys.get)
+        self.get(cache)
+        keys['serial'] = 2
+        self.device.reboot(**{'ro.serialno': 'DEF'})
+        self.assertEqual(self.get(cache, ['ro.serialno']), {'ro.serialno': 'DEF'})
+        self.assertEqual(self.device.fetches, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from adb.parser import FailError, PrematureEOFError
+from adb.registry import DeviceRegistry
+
+
+def device(serial, type='device', transport_id='1'):
+    return {'id': serial, 'type': type, 'product': 'sdk', 'model': 'Pixel', 'device': 'generic',
+            'transport_id': transport_id}
+
+
+class FakeConnection:
+    async def close(self):
+        pass
+
+
+class FakeCommand:
+    def __init__(self, lists):
+        self.lists = lists
+        self.connection = FakeConnection()
+
+    async def _read_devices(self):
+        if not self.lists:
+            raise PrematureEOFError(4)
+        item = self.lists.pop(0)
+        if isinstance(item, asyncio.Event):
+            await item.wait()
+            return await self._read_devices()
+        return item
+
+
+class TestDeviceRegistry(unittest.TestCase):
+    def test_add_and_remove(self):
+        registry = DeviceRegistry(None)
+        self.assertFalse(registry.synced)
+        registry.update([device('a'), device('b', 'offline', '2')])
+        self.assertTrue(registry.synced)
+        self.assertEqual(registry.list_devices(), [{'id': 'a', 'type': 'device'}, {'id': 'b', 'type': 'offline'}])
+        self.assertEqual(registry.list_devices_with_paths()[1], device('b', 'offline', '2'))
+        self.assertTrue(registry.is_online('a'))
+        self.assertFalse(registry.is_online('b'))
+        registry.update([device('b', 'device', '2')])
+        self.assertEqual(registry.get_state('b'), 'device')
+        with self.assertRaises(FailError):
+            registry.get_state('a')
+        self.assertFalse(registry.is_online('a'))
+
+    def test_transport_id_follows_reconnected_devices(self):
+        registry = DeviceRegistry(None)
+        registry.update([device('a', transport_id='1')])
+        # Unplugged and plugged back in between two lists: same serial, new transport
+        change_set = registry.update([device('a', transport_id='7')])
+        self.assertEqual(change_set['changed'], [device('a', transport_id='7')])
+        self.assertEqual(registry.device_map['a']['transport_id'], '7')
+
+    def test_does_not_queue_events(self):
+        registry = DeviceRegistry(None)
+        for i in range(2000):
+            registry.update([device(str(i))])
+        self.assertTrue(registry._queue.empty())
+
+    def test_wait_for_and_live(self):
+        async def run():
+            plugged = asyncio.Event()
+            command = FakeCommand([[device('a', 'offline')], plugged, [device('a')]])
+
+            async def connect():
+                return command
+
+            registry = DeviceRegistry(connect, reconnect=False)
+            await registry.wait_synced(timeout=1)
+            self.assertTrue(registry.live)
+            waiting = asyncio.ensure_future(registry.wait_for('a', timeout=1))
+            await asyncio.sleep(0)
+            self.assertFalse(waiting.done())
+            plugged.set()
+            self.assertEqual(await waiting, device('a'))
+            # The connection then drops and the registry stops being live
+            await registry.wait()
+            self.assertFalse(registry.live)
+            self.assertIsInstance(registry.error, ConnectionError)
+            with self.assertRaises(ConnectionError):
+                await registry.wait_for('b', timeout=1)
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from logcat.entry import Entry
+from logcat.resilient import Gap, ResilientReader
+
+
+def entry(sec, nsec=0, pid=1, tid=1, priority=4, tag='Tag', message='message'):
+    return Entry(sec, nsec, pid, tid, priority, tag, message)
+
+
+class TestResilientReaderResume(unittest.TestCase):
+    def setUp(self):
+        self.reader = ResilientReader(None, serial='serial')
+        for item in (entry(10, 5, message='a'), entry(10, 5, message='b')):
+            self.reader._remember(item)
+        self.reader._resuming = True
+
+    def test_drops_older_entries(self):
+        self.assertIs(self.reader._resume(entry(10, 4, message='old')), False)
+        self.assertTrue(self.reader._resuming)
+
+    def test_drops_entries_already_delivered(self):
+        self.assertIs(self.reader._resume(entry(10, 5, message='a')), False)
+        self.assertIs(self.reader._resume(entry(10, 5, message='b')), False)
+
+    def test_keeps_new_entries_at_the_boundary(self):
+        self.assertIsNone(self.reader._resume(entry(10, 5, message='c')))
+
+    def test_no_gap_after_boundary(self):
+        self.reader._resume(entry(10, 5, message='a'))
+        self.assertIsNone(self.reader._resume(entry(11, message='next')))
+        self.assertFalse(self.reader._resuming)
+
+    def test_gap_when_boundary_was_lost(self):
+        gap = self.reader._resume(entry(12, message='next'))
+        self.assertIsInstance(gap, Gap)
+        self.assertEqual((gap.since_ns, gap.until_ns, gap.serial), (10000000005, 12000000000, 'serial'))
+        self.assertFalse(self.reader._resuming)
+
+
+class FakeStream:
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.ended = False
+        self.closed = False
+
+    async def read_entry(self):
+        if self.ended or not self.entries:
+            return None
+        return self.entries.pop(0)
+
+    def end(self):
+        self.ended = True
+
+    async def close(self):
+        self.closed = True
+
+
+class TestResilientReader(unittest.TestCase):
+    def test_resumes_and_closes_dropped_streams(self):
+        streams = [
+            FakeStream([entry(1, message='a'), entry(2, message='b')]),
+            FakeStream([entry(2, message='b'), entry(3, message='c')]),
+        ]
+        opened = []
+
+        async def open_stream(since):
+            opened.append(since)
+            return streams[len(opened) - 1]
+
+        async def read():
+            reader = ResilientReader(open_stream, backoff=0)
+            items = [await reader.read_entry() for _ in range(3)]
+            reader.end()
+            return items
+
+        items = asyncio.run(read())
+        self.assertEqual([item.message for item in items], ['a', 'b', 'c'])
+        self.assertEqual(opened, [None, (2, 0)])
+        self.assertTrue(streams[0].closed)
+
+
+
+
+if __name__ == '__main__':
+    unittest.main()
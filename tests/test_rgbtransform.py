@@ -0,0 +1,47 @@
+import struct
+import unittest
+
+from adb.framebuffer.rgbtransform import to_rgb
+
+
+def meta(bpp, red, green, blue, alpha=(0, 0), width=2, height=1):
+    return {
+        'bpp': bpp, 'size': width * height * bpp // 8, 'width': width, 'height': height,
+        'red_offset': red[0], 'red_length': red[1],
+        'green_offset': green[0], 'green_length': green[1],
+        'blue_offset': blue[0], 'blue_length': blue[1],
+        'alpha_offset': alpha[0], 'alpha_length': alpha[1],
+    }
+
+
+RGBA = meta(32, (0, 8), (8, 8), (16, 8), (24, 8))
+BGRA = meta(32, (16, 8), (8, 8), (0, 8), (24, 8))
+RGBX = meta(32, (0, 8), (8, 8), (16, 8))
+RGB565 = meta(16, (11, 5), (5, 6), (0, 5), width=3)
+
+
+class TestToRgb(unittest.TestCase):
+    def test_rgba(self):
+        data = bytes([1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(to_rgb(data, RGBA).tolist(), [[1, 2, 3], [5, 6, 7]])
+        self.assertEqual(to_rgb(data, RGBA, alpha=True).tolist(), [[1, 2, 3, 4], [5, 6, 7, 8]])
+
+    def test_bgra(self):
+        data = bytes([1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(to_rgb(data, BGRA, alpha=True).tolist(), [[3, 2, 1, 4], [7, 6, 5, 8]])
+
+    def test_opaque_alpha_without_alpha_channel(self):
+        data = bytes([1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(to_rgb(data, RGBX, alpha=True).tolist(), [[1, 2, 3, 255], [5, 6, 7, 255]])
+
+    def test_rgb565(self):
+        data = struct.pack('<3H', 0xf800, 0x07e0, 0x001f)
+        self.assertEqual(to_rgb(data, RGB565).tolist(), [[255, 0, 0], [0, 255, 0], [0, 0, 255]])
+        self.assertEqual(to_rgb(struct.pack('<H', 0x8410), RGB565).tolist(), [[132, 130, 132]])
+
+    def test_partial_pixel_is_ignored(self):
+        self.assertEqual(to_rgb(bytes([1, 2, 3, 4, 5]), RGBA).tolist(), [[1, 2, 3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+import numpy as np
+
+from adb.proc.sampler import CpuSampler
+
+
+def proc_stat(ticks, cores):
+    lines = [f"cpu {ticks * len(cores)} 0 0 {ticks * len(cores)} 0 0 0 0 0 0"]
+    lines += [f"{core} {ticks} 0 0 {ticks} 0 0 0 0 0 0" for core in cores]
+    return '\n'.join(lines).encode()
+
+
+class TestCpuSampler(unittest.TestCase):
+    def sample(self, sampler, samples):
+        async def run():
+            for ticks, cores in samples:
+                await sampler._parse(proc_stat(ticks, cores))
+        asyncio.run(run())
+
+    def test_loads(self):
+        sampler = CpuSampler(None, capacity=4)
+        self.sample(sampler, [(100 * i, ['cpu0', 'cpu1']) for i in range(1, 7)])
+        self.assertEqual(len(sampler), 4)
+        self.assertEqual(sampler.cpus, ['cpu', 'cpu0', 'cpu1'])
+        self.assertEqual(sampler.loads()[:, 0].tolist(), [50.0, 50.0, 50.0])
+        self.assertEqual(sampler.intervals().shape, (3, 3, len(CpuSampler.FIELDS)))
+        self.assertEqual(sampler.load['cpu1']['idle'], 50.0)
+
+    def test_history_survives_hotplug(self):
+        sampler = CpuSampler(None, capacity=8)
+        self.sample(sampler, [
+            (100, ['cpu0', 'cpu1']),
+            (200, ['cpu0']),
+            (300, ['cpu0', 'cpu1', 'cpu2']),
+            (400, ['cpu0', 'cpu1', 'cpu2']),
+        ])
+        self.assertEqual(len(sampler), 4)
+        self.assertEqual(sampler.cpus, ['cpu', 'cpu0', 'cpu1', 'cpu2'])
+        user = sampler.intervals()[..., 0]
+        self.assertEqual(user[:, 1].tolist(), [50.0, 50.0, 50.0])
+        self.assertTrue(np.isnan(user[:2, 2]).all())
+        self.assertEqual(user[2, 2], 50.0)
+        self.assertTrue(np.isnan(user[:2, 3]).all())
+        self.assertEqual(sampler.percentiles(q=[50])['load'][0, 2], 50.0)
+        self.assertEqual(sorted(sampler.load), ['cpu', 'cpu0', 'cpu1', 'cpu2'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
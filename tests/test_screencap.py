@@ -0,0 +1,56 @@
+import asyncio
+import struct
+import unittest
+from unittest.mock import Mock
+
+from adb.common.host_transport.screencap import ScreencapCommand
+from adb.parser import Parser
+
+
+def screencap(data):
+    async def run():
+        stream = asyncio.StreamReader()
+        stream.feed_data(b'OKAY' + data)
+        stream.feed_eof()
+        connection = Mock()
+        connection.parser = Parser(stream)
+        command = ScreencapCommand(connection)
+        pixels, meta = await command.execute(raw=True)
+        return bytes(pixels), meta, connection.write.call_args[0][0]
+
+    return asyncio.run(run())
+
+
+class TestScreencap(unittest.TestCase):
+    PIXELS = bytes(range(16))
+
+    def test_header_without_colorspace(self):
+        pixels, meta, sent = screencap(struct.pack('<III', 2, 2, 1) + self.PIXELS)
+        self.assertEqual(sent, b'001Aexec:screencap 2>/dev/null')
+        self.assertEqual(pixels, self.PIXELS)
+        self.assertEqual((meta['width'], meta['height'], meta['bpp'], meta['size']), (2, 2, 32, 16))
+
+    def test_header_with_colorspace(self):
+        pixels, meta, sent = screencap(struct.pack('<IIII', 2, 2, 1, 143261696) + self.PIXELS)
+        self.assertEqual(pixels, self.PIXELS)
+        self.assertEqual(meta['format'], 'rgba')
+
+    def test_parse_header(self):
+        command = ScreencapCommand(Mock())
+        meta = command._parse_header(struct.pack('<III', 4, 3, 4))
+        self.assertEqual(meta['format'], 'rgb565')
+        self.assertEqual((meta['bpp'], meta['size']), (16, 24))
+        self.assertEqual((meta['red_offset'], meta['red_length']), (11, 5))
+        self.assertEqual((meta['green_offset'], meta['green_length']), (5, 6))
+        meta = command._parse_header(struct.pack('<III', 1, 1, 5))
+        self.assertEqual((meta['format'], meta['blue_offset'], meta['alpha_length']), ('bgra', 0, 8))
+        meta = command._parse_header(struct.pack('<III', 1, 1, 2))
+        self.assertEqual((meta['format'], meta['alpha_length']), ('rgbx', 0))
+
+    def test_unsupported_pixel_format(self):
+        with self.assertRaisesRegex(Exception, 'pixel format 42'):
+            ScreencapCommand(Mock())._parse_header(struct.pack('<III', 1, 1, 42))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import asyncio
+import unittest
+
+from adb.singleflight import SingleFlight
+
+
+class Call:
+    """Counts invocations; every call waits until `release` is set."""
+
+    def __init__(self, result='result'):
+        self.result = result
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        number = self.calls
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return f"{self.result} {number}"
+
+
+def run(test):
+    async def main():
+        return await test()
+    return asyncio.run(main())
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_coalesces_concurrent_calls(self):
+        async def test():
+            flights = SingleFlight()
+            call = Call()
+            call.release = asyncio.Event()
+            waiting = [asyncio.ensure_future(flights.do('key', call)) for _ in range(3)]
+            await asyncio.sleep(0)
+            call.release.set()
+            self.assertEqual(await asyncio.gather(*waiting), ['result 1'] * 3)
+            # Without a TTL nothing is cached
+            self.assertEqual(await flights.do('key', call), 'result 2')
+        run(test)
+
+    def test_ttl(self):
+        async def test():
+            flights = SingleFlight(ttl=60.0)
+            call = Call()
+            call.release = asyncio.Event()
+            call.release.set()
+            self.assertEqual(await flights.do('key', call), 'result 1')
+            self.assertEqual(await flights.do('key', call), 'result 1')
+            self.assertEqual(await flights.do('key', call, ttl=0.0), 'result 1')
+            self.assertEqual(await flights.do('other', call, ttl=0.0), 'result 2')
+        run(test)
+
+    def test_errors_are_shared_but_not_cached(self):
+        async def test():
+            flights = SingleFlight(ttl=60.0)
+            call = Call(ConnectionError('offline'))
+            call.release = asyncio.Event()
+            waiting = [asyncio.ensure_future(flights.do('key', call)) for _ in range(2)]
+            await asyncio.sleep(0)
+            call.release.set()
+            results = await asyncio.gather(*waiting, return_exceptions=True)
+            self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+            self.assertEqual(call.calls, 1)
+            with self.assertRaises(ConnectionError):
+                await flights.do('key', call)
+            self.assertEqual(call.calls, 2)
+        run(test)
+
+    def test_cancelled_caller_does_not_cancel_the_call(self):
+        async def test():
+            flights = SingleFlight()
+            call = Call()
+            call.release = asyncio.Event()
+            first = asyncio.ensure_future(flights.do('key', call))
+            second = asyncio.ensure_future(flights.do('key', call))
+            await asyncio.sleep(0)
+            first.cancel()
+            call.release.set()
+            self.assertEqual(await second, 'result 1')
+        run(test)
+
+    def test_forget_by_prefix(self):
+        async def test():
+            flights = SingleFlight(ttl=60.0)
+            call = Call()
+            call.release = asyncio.Event()
+            call.release.set()
+            await flights.do(('a', 'x'), call)
+            await flights.do(('b', 'x'), call)
+            flights.forget('a')
+            self.assertEqual(await flights.do(('a', 'x'), call), 'result 3')
+            self.assertEqual(await flights.do(('b', 'x'), call), 'result 2')
+            flights.forget()
+            self.assertEqual(await flights.do(('b', 'x'), call), 'result 4')
+        run(test)
+
+    def test_forget_during_flight(self):
+        async def test():
+            flights = SingleFlight(ttl=60.0)
+            call = Call()
+            call.release = asyncio.Event()
+            stale = asyncio.ensure_future(flights.do(('serial', 'prop'), call))
+            await asyncio.sleep(0)
+            # e.g. the device rebooted while the call was running
+            flights.forget('serial')
+            fresh = asyncio.ensure_future(flights.do(('serial', 'prop'), call))
+            for _ in range(3):
+                await asyncio.sleep(0)
+            self.assertEqual(call.calls, 2)
+            call.release.set()
+            self.assertEqual(await stale, 'result 1')
+            self.assertEqual(await fresh, 'result 2')
+            # Only the call started after forget() is cached
+            self.assertEqual(await flights.do(('serial', 'prop'), call), 'result 2')
+            self.assertEqual(flights._generations, {})
+        run(test)
+
+    def test_stale_call_finishing_last_is_not_cached(self):
+        async def test():
+            flights = SingleFlight(ttl=60.0)
+            slow = Call('slow')
+            slow.release = asyncio.Event()
+            fast = Call('fast')
+            fast.release = asyncio.Event()
+            fast.release.set()
+            stale = asyncio.ensure_future(flights.do('key', slow))
+            await asyncio.sleep(0)
+            flights.forget()
+            self.assertEqual(await flights.do('key', fast), 'fast 1')
+            slow.release.set()
+            self.assertEqual(await stale, 'slow 1')
+            self.assertEqual(await flights.do('key', slow), 'fast 1')
+        run(test)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+
+from adb.common.host_transport.install import InstallCommand
+from adb.common.host_transport.streaminstall import StreamInstallCommand
+from adb.parser import Parser
+
+
+class FakeConnection:
+    """Replays `data`; writes are recorded and complete at once."""
+
+    def __init__(self, data):
+        stream = asyncio.StreamReader()
+        stream.feed_data(data)
+        stream.feed_eof()
+        self.parser = Parser(stream)
+        self.written = []
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        done = asyncio.get_event_loop().create_future()
+        done.set_result(None)
+        return done
+
+
+def install(command_class, data, *args, **kwargs):
+    async def run():
+        connection = FakeConnection(data)
+        result = await command_class(connection).execute(*args, **kwargs)
+        return result, connection.written
+
+    return asyncio.run(run())
+
+
+class TestStreamInstallCommand(unittest.TestCase):
+    APK = b'PK\x03\x04' + bytes(100000)
+
+    def test_exec_framing(self):
+        result, written = install(StreamInstallCommand, b'OKAYSuccess\n', self.APK)
+        self.assertIs(result, True)
+        self.assertEqual(written[0], b"002Dexec:cmd package 'install' '-S' '100004' '-r'")
+        self.assertEqual(b''.join(written[1:]), self.APK)
+        self.assertEqual([len(chunk) for chunk in written[1:]], [65536, 100004 - 65536])
+
+    def test_abb_framing(self):
+        _, written = install(StreamInstallCommand, b'OKAYSuccess\n', self.APK, abb=True, args=('-r', '-d'))
+        self.assertEqual(written[0], b'0028abb_exec:package\x00install\x00-S\x00100004\x00-r\x00-d')
+
+    def test_failure(self):
+        with self.assertRaises(Exception) as caught:
+            install(StreamInstallCommand, b'OKAYFailure [INSTALL_FAILED_VERSION_DOWNGRADE: Downgrade detected]\n',
+                    self.APK)
+        self.assertEqual(caught.exception.code, 'INSTALL_FAILED_VERSION_DOWNGRADE: Downgrade detected')
+        self.assertIn('APK could not be installed', str(caught.exception))
+
+    def test_fail_reply(self):
+        with self.assertRaisesRegex(Exception, 'closed'):
+            install(StreamInstallCommand, b'FAIL0006closed', self.APK)
+
+
+class TestInstallResult(unittest.TestCase):
+    def result(self, output):
+        return install(InstallCommand, b'OKAY' + output, '/data/local/tmp/app.apk')[0]
+
+    def code(self, output):
+        with self.assertRaises(Exception) as caught:
+            self.result(output)
+        return caught.exception.code
+
+    def test_success(self):
+        self.assertIs(self.result(b'\tpkg: /data/local/tmp/app.apk\r\nSuccess\r\n'), True)
+        self.assertIs(self.result(b'Success: streamed 4 bytes\n'), True)
+
+    def test_failure(self):
+        self.assertEqual(self.code(b'Failure [INSTALL_FAILED_INVALID_APK: Split null was defined multiple times]\r\n'),
+                         'INSTALL_FAILED_INVALID_APK: Split null was defined multiple times')
+
+    def test_error_line(self):
+        self.assertEqual(self.code(b'Error: Unable to open file: /data/local/tmp/app.apk\r\n'),
+                         'Unable to open file: /data/local/tmp/app.apk')
+
+    def test_unexpected_output(self):
+        self.assertEqual(self.code(b'Exception occurred while executing:\njava.lang.NullPointerException\n'),
+                         'Exception occurred while executing:\njava.lang.NullPointerException')
+        self.assertEqual(self.code(b''), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+
+from adb.framebuffer.tiles import TileTracker
+
+
+class TestTileTracker(unittest.TestCase):
+    def assert_single_change(self, tile, frame):
+        tracker = TileTracker(tile)
+        self.assertEqual(len(tracker.update(frame)), -(-frame.shape[0] // tile))
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            y, x = rng.integers(frame.shape[0]), rng.integers(frame.shape[1])
+            changed = frame.copy()
+            changed[y, x] += 1
+            rects = tracker.update(changed)
+            self.assertEqual(rects, [((x // tile) * tile, (y // tile) * tile,
+                                      min(tile, frame.shape[1] - (x // tile) * tile),
+                                      min(tile, frame.shape[0] - (y // tile) * tile))])
+            self.assertEqual(len(tracker.update(frame)), 1)
+
+    def test_aligned_tiles(self):
+        self.assert_single_change(32, np.zeros((64, 128, 4), dtype=np.uint8))
+
+    def test_tiles_not_aligned_to_words(self):
+        self.assert_single_change(30, np.zeros((100, 130), dtype=np.uint16))
+        self.assert_single_change(7, np.zeros((20, 23, 3), dtype=np.uint8))
+
+    def test_unchanged_frame(self):
+        tracker = TileTracker(16)
+        frame = np.arange(32 * 48, dtype=np.uint16).reshape(32, 48)
+        tracker.update(frame)
+        self.assertEqual(tracker.update(frame.copy()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
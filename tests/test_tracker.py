@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from adb.parser import PrematureEOFError
+from adb.tracker import DeviceEvent, Tracker
+
+
+def device(serial, type='device'):
+    return {'id': serial, 'type': type}
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeCommand:
+    """Returns the given device lists, then drops the connection or hangs."""
+
+    def __init__(self, *lists, hang=False):
+        self.lists = list(lists)
+        self.hang = hang
+        self.connection = FakeConnection()
+
+    async def _read_devices(self):
+        if not self.lists:
+            if self.hang:
+                await asyncio.Event().wait()
+            raise PrematureEOFError(4)
+        return self.lists.pop(0)
+
+
+def events(tracker, count):
+    async def run():
+        result = []
+        async for event in tracker:
+            result.append((event.kind, event.id, event.type))
+            if len(result) == count:
+                break
+        tracker.end()
+        await tracker.wait()
+        return result
+
+    return asyncio.run(run())
+
+
+class TestTracker(unittest.TestCase):
+    def test_update_diffs_against_the_previous_list(self):
+        tracker = Tracker()
+        self.assertEqual(tracker.update([device('a'), device('b', 'offline')])['added'],
+                         [device('a'), device('b', 'offline')])
+        change_set = tracker.update([device('b'), device('c')])
+        self.assertEqual(change_set, {'removed': [device('a')], 'changed': [device('b')], 'added': [device('c')]})
+        self.assertEqual(sorted(tracker.device_map), ['b', 'c'])
+
+    def test_events(self):
+        tracker = Tracker(FakeCommand([device('a')], [device('a', 'offline'), device('b')], []), reconnect=False)
+        self.assertEqual(events(tracker, 5), [
+            (DeviceEvent.ADD, 'a', 'device'),
+            (DeviceEvent.CHANGE, 'a', 'offline'),
+            (DeviceEvent.ADD, 'b', 'device'),
+            (DeviceEvent.REMOVE, 'a', 'offline'),
+            (DeviceEvent.REMOVE, 'b', 'device'),
+        ])
+
+    def test_connection_closed_without_reconnect(self):
+        command = FakeCommand([device('a')])
+        tracker = Tracker(command)
+
+        async def run():
+            result = [event.id async for event in tracker]
+            self.assertEqual(result, ['a'])
+
+        with self.assertRaises(ConnectionError):
+            asyncio.run(run())
+        self.assertTrue(command.connection.closed)
+
+    def test_reconnects_with_backoff_and_resyncs(self):
+        commands = [
+            FakeCommand([device('a'), device('b')]),
+            None,
+            FakeCommand([device('b'), device('c')], hang=True),
+        ]
+        first = commands[0]
+        delays = []
+        sleep = asyncio.sleep
+
+        async def connect():
+            command = commands.pop(0)
+            if command is None:
+                raise ConnectionRefusedError()
+            return command
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+            await sleep(0)
+
+        tracker = Tracker(connect=connect, backoff=0.5, max_backoff=0.75)
+        with patch.object(asyncio, 'sleep', fake_sleep):
+            result = events(tracker, 4)
+        # The list after reconnecting is diffed against the last known one
+        self.assertEqual(result, [
+            (DeviceEvent.ADD, 'a', 'device'),
+            (DeviceEvent.ADD, 'b', 'device'),
+            (DeviceEvent.ADD, 'c', 'device'),
+            (DeviceEvent.REMOVE, 'a', 'device'),
+        ])
+        self.assertEqual(delays, [0.5, 0.75])
+        self.assertEqual(tracker.reconnects, 2)
+        self.assertTrue(first.connection.closed)
+
+    def test_queue_is_bounded(self):
+        tracker = Tracker(max_events=3)
+        for i in range(10):
+            tracker.update([device(str(i))])
+        self.assertEqual(tracker._queue.qsize(), 3)
+        self.assertEqual(tracker.dropped, 16)
+        self.assertEqual(tracker.device_list, [device('9')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import re
+import unittest
+
+from logcat.entry import Entry
+from logcat.watcher import Rule, Watcher
+
+
+def entry(sec, nsec=0, pid=1, tid=1, priority=4, tag='Tag', message='message'):
+    return Entry(sec, nsec, pid, tid, priority, tag, message)
+
+
+class TestWatcher(unittest.TestCase):
+    def feed(self, watcher, message):
+        return [match.rule.name for match in watcher.feed(entry(1, message=message))]
+
+    def test_flags_are_scoped_to_their_rule(self):
+        watcher = Watcher([
+            Rule('verbose', r'a \s b  # comment', flags=re.VERBOSE),
+            Rule('plain', r'x y$'),
+            Rule('ignorecase', r'^b.d$', flags=re.IGNORECASE),
+        ])
+        self.assertEqual(self.feed(watcher, 'a b'), ['verbose'])
+        self.assertEqual(self.feed(watcher, 'xy'), [])
+        self.assertEqual(self.feed(watcher, 'x y'), ['plain'])
+        self.assertEqual(self.feed(watcher, 'BXD'), ['ignorecase'])
+        self.assertEqual(self.feed(watcher, 'X Y'), [])
+
+    def test_unjoinable_rules_are_checked_on_their_own(self):
+        watcher = Watcher([
+            Rule('backreference', r'(\w)x\1'),
+            Rule('global', r'(?i)^z.y'),
+            Rule('named', r'(?P<digit>\d)-(?P=digit)'),
+            Rule('ascii', r'^\w$', flags=re.ASCII),
+        ])
+        self.assertEqual(watcher._regex_rules, [])
+        self.assertEqual(self.feed(watcher, 'axa'), ['backreference'])
+        self.assertEqual(self.feed(watcher, 'axb'), [])
+        self.assertEqual(self.feed(watcher, 'Z1Y'), ['global'])
+        self.assertEqual(self.feed(watcher, '1-1'), ['named'])
+        self.assertEqual(self.feed(watcher, 'é'), [])
+        self.assertEqual(self.feed(watcher, 'e'), ['ascii'])
+
+    def test_required_literal(self):
+        self.assertEqual(Rule('rule', r'FATAL EXCEPTION: \w+').required, 'FATAL EXCEPTION: ')
+        self.assertEqual(Rule('rule', r'ab.*cd').required, None)
+        self.assertEqual(Rule('rule', r'abc', flags=re.IGNORECASE).required, None)
+        self.assertEqual(Rule('rule', 'x', literal=True).required, 'x')
+
+    def test_literal_and_regex_rules(self):
+        watcher = Watcher([
+            Rule('anr', 'ANR in', literal=True),
+            Rule('crash', r'FATAL EXCEPTION: (main|\w+)'),
+            Rule('short', r'ab.*cd'),
+        ])
+        self.assertEqual(self.feed(watcher, 'ANR in com.example'), ['anr'])
+        self.assertEqual(self.feed(watcher, 'FATAL EXCEPTION: main'), ['crash'])
+        self.assertEqual(self.feed(watcher, 'ab--cd'), ['short'])
+        self.assertEqual(self.feed(watcher, 'nothing'), [])
+        self.assertEqual(watcher.hits, {'anr': 1, 'crash': 1, 'short': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()